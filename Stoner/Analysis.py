@@ -17,12 +17,18 @@ from .tools import isNone, isiterable, all_type, istuple
 from .core.exceptions import assertion
 from .analysis.utils import (
     outlier as _outlier,
+    poly_outlier as _poly_outlier,
+    outlier_windows as _outlier_windows,
+    poly_outlier_windows as _poly_outlier_windows,
+    BinAccumulator,
     threshold as _threshold,
     _twoD_fit,
     ApplyAffineTransform,
     GetAffineTransform,
 )
+from .core.utils import window_offsets
 from copy import deepcopy as copy
+from itertools import islice
 
 # from matplotlib.pylab import * #Surely not?
 from inspect import getfullargspec
@@ -213,7 +219,7 @@ class AnalysisMixin(object):
             self.add_column(err_data, header=err_header, index=a + 1, replace=False)
         return self
 
-    def apply(self, func, col=None, replace=True, header=None, **kargs):
+    def apply(self, func, col=None, replace=True, header=None, vectorized=False, batch_size=None, **kargs):
         """Applies the given function to each row in the data set and adds to the data set.
 
         Args:
@@ -227,6 +233,11 @@ class AnalysisMixin(object):
                 Either replace the existing column/complete data or create a new column or data file.
             header (string or None):
                 The new column header(s) (defaults to the name of the function func
+            vectorized (bool):
+                If True, pass *func* a 2D block of rows at a time instead of one row (see below). Default False.
+            batch_size (int or None):
+                The number of rows in each block if *vectorized* is True - the default None passes all the data in
+                one block. Setting *batch_size* implies *vectorized*.
 
         Note:
             If any extra keyword arguments are supplied then these are passed to the function directly. If
@@ -244,6 +255,12 @@ class AnalysisMixin(object):
             a new datafile, leaving the original unchanged. The *headers* parameter can give the complete column headers for
             the new data file.
 
+            In vectorized mode *func* is given a :py:class:`Stoner.core.array.DataArray` view of a block of rows
+            (with the same setas and with *i* giving the row numbers) and should return a 1D array with one value for
+            each row or a 2D array with one row for each row. Functions written with numpy ufuncs then run at array
+            speed. If *func* raises an exception or returns something of the wrong shape for a block, the rest of the
+            data is processed one row at a time instead.
+
         Returns:
             (:py:class:`Stoner.Data`):
                 The newly modified Data object.
@@ -252,21 +269,35 @@ class AnalysisMixin(object):
             col = self.setas.get("y", [0])[0]
         col = self.find_col(col)
         kargs.update(kargs.pop("_extra", dict()))
-        # Check the dimension of the output
-        ret = func(next(self.rows()), **kargs)
-        try:
-            next(self.rows(reset=True))
-        except (RuntimeError, StopIteration):
-            pass
-        if isiterable(ret):
-            nc = _np_.zeros((len(self), len(ret)))
-        else:
-            nc = _np_.zeros(len(self))
-        # Evaluate the data row by row
-        for ix, r in enumerate(self.rows()):
+        nc = None
+        done = 0
+        if vectorized or batch_size:  # Evaluate the data a block of rows at a time
+            step = max(int(batch_size), 1) if batch_size else len(self)
+            for start in range(0, len(self), step):
+                block = self.data[start : start + step]
+                block.i = start
+                try:
+                    ret = _np_.ma.asarray(func(block, **kargs))
+                except Exception:  # pylint: disable=broad-except
+                    break  # func can't handle blocks of rows, so fall back to one row at a time
+                if (
+                    ret.ndim not in (1, 2)
+                    or len(ret) != len(block)
+                    or (nc is not None and ret.shape[1:] != nc.shape[1:])
+                ):
+                    break
+                if nc is None:
+                    nc = _np_.zeros((len(self),) + ret.shape[1:])
+                nc[start : start + len(block)] = ret
+                done = start + len(block)
+        # Evaluate any remaining data row by row
+        rows = islice(self.rows(), done, None) if done < len(self) else []
+        for ix, r in enumerate(rows, start=done):
             ret = func(r, **kargs)
             if isiterable(ret) and not isinstance(ret, _np_.ndarray):
                 ret = _np_.ma.MaskedArray(ret)
+            if nc is None:  # Check the dimension of the output
+                nc = _np_.zeros((len(self), len(ret))) if isiterable(ret) else _np_.zeros(len(self))
             nc[ix] = ret
         # Work out how to handle the result
         if nc.ndim == 1:
@@ -318,6 +349,10 @@ class AnalysisMixin(object):
             Algorithm inspired by MatLab code wbin,    Copyright (c) 2012:
             Michael Lindholm Nielsen
 
+            The data is sorted on x once and all the bins are filled in a single pass with
+            :py:class:`Stoner.analysis.utils.BinAccumulator`, which can also be used directly to bin data a chunk at
+            a time or across several files. Rows with nan or masked x or y values are left out.
+
 
         See Also:
             User Guide section :ref:`binning_guide`
@@ -338,49 +373,15 @@ class AnalysisMixin(object):
 
         bin_left, bin_right, bin_centres = self.make_bins(xcol, bins, mode, **kargs)
 
-        ycol = self.find_col(ycol)
+        ycol = self.find_col(ycol, force_list=True)
         if yerr is not None:
-            yerr = self.find_col(yerr)
-
-        ybin = _np_.zeros((len(bin_left), len(ycol)))
-        ebin = _np_.zeros((len(bin_left), len(ycol)))
-        nbins = _np_.zeros((len(bin_left), len(ycol)))
+            yerr = self.find_col(yerr, force_list=True)
         xcol = self.find_col(xcol)
-        i = 0
-
-        for limits in zip(bin_left, bin_right):
-            data = self.search(xcol, limits)
-            if len(data) > 1:
-                ok = _np_.logical_not(_np_.isnan(data.y))
-                data = data[ok]
-            elif len(data) == 1 and _np_.isnan(data.y):
-                shape = list(data.shape)
-                shape[0] = 0
-                data = _np_.zeros(shape)
-            if yerr is not None:
-                w = 1.0 / data[:, yerr] ** 2
-                W = _np_.sum(w, axis=0)
-                if data.shape[0] > 3:
-                    e = max(
-                        _np_.std(data[:, ycol], axis=0) / _np_.sqrt(data.shape[0]),
-                        (1.0 / _np_.sqrt(W)) / data.shape[0],
-                    )
-                else:
-                    e = 1.0 / _np_.sqrt(W)
-            else:
-                w = _np_.ones((data.shape[0], len(ycol)))
-                W = data.shape[0]
-                if data[:, ycol].size > 1:
-                    e = _np_.std(data[:, ycol], axis=0) / _np_.sqrt(W)
-                else:
-                    e = _np_.nan
-            if data.shape[0] == 0:
-                warn("Empty bin at {}".format(limits))
-            y = _np_.sum(data[:, ycol] * (w / W), axis=0)
-            ybin[i, :] = y
-            ebin[i, :] = e
-            nbins[i, :] = data.shape[0]
-            i += 1
+
+        accumulator = BinAccumulator(bin_left, bin_right, bin_centres, weighted=yerr is not None)
+        bin_centres, ybin, ebin, nbins = accumulator.add_data(self, xcol, ycol, yerr).result()
+        for limits in zip(bin_left[nbins[:, 0] == 0], bin_right[nbins[:, 0] == 0]):
+            warn("Empty bin at {}".format(limits))
         if clone:
             ret = self.clone
             ret.data = _np_.atleast_2d(bin_centres).T
@@ -1210,6 +1211,10 @@ class AnalysisMixin(object):
 
         In all cases the indices of the outlier rows are added to the ;outlier' metadata.
 
+        With the default detector, or :py:func:`Stoner.analysis.utils.poly_outlier`, every row with a complete window
+        is tested at once with the vectorised equivalent from :py:mod:`Stoner.analysis.utils` and only the rows at the
+        ends of the data are tested one at a time. Outliers are then masked or deleted in one go.
+
         Example:
             .. plot:: samples/outlier.py
                 :include-source:
@@ -1226,23 +1231,29 @@ class AnalysisMixin(object):
 
         if action not in ["delete", "mask", "mask row"] and not callable(action):
             raise ValueError("Do'n know what to do with action={}".format(action))
-        index = []
-        for i, t in enumerate(self.rolling_window(window, wrap=False, exclude_centre=width)):
-            if func(self.data[i], t, metric=certainty, **kargs):
-                index.append(i)
+        offsets = window_offsets(window, width)
+        hw = int((window - 1) / 2)
+        vectorised = {_outlier: _outlier_windows, _poly_outlier: _poly_outlier_windows}.get(func, None)
+        found = _np_.zeros(len(self), dtype=bool)
+        if vectorised is not None and len(self) >= window:
+            found[hw : len(self) - hw] = vectorised(self.data, window, width, metric=certainty, **kargs)
+            rows = list(range(hw)) + list(range(len(self) - hw, len(self)))
+        else:
+            rows = range(len(self))
+        for i in rows:  # Windows that are cut short by the ends of the data
+            window_rows = offsets + i
+            window_rows = window_rows[(window_rows >= 0) & (window_rows < len(self))]
+            found[i] = bool(func(self.data[i], self.data[window_rows], metric=certainty, **kargs))
+        index = _np_.nonzero(found)[0].tolist()
         self["outliers"] = index  # add outlier indecies to metadata
-        index.reverse()  # Always reverse the index in case we're deleting rows in sucession
-        if action == "mask" or action == "mask row":
-            for i in index:
-                if action == "mask":
-                    self.mask[i, column] = True
-                else:
-                    self.mask[i, :] = True
+        if action == "mask":
+            self.mask[index, column] = True
+        elif action == "mask row":
+            self.mask[index, :] = True
         elif action == "delete":
-            for i in index:
-                self.del_rows(i)
+            self.del_rows(index)
         elif callable(action):  # this will call the action function with each row in turn from back to start
-            for i in index:
+            for i in reversed(index):
                 action(i, column, self.data[i])
         return self
 
@@ -1967,6 +1978,9 @@ class AnalysisMixin(object):
                 have been done via the setas attribute
             all_vals (bool):
                 Return all values that match the criteria, or just the first in the file.
+            interpolate (bool):
+                Refine the crossing points with a local cubic interpolation (default True), or use a straight line
+                between the two points either side of the crossing.
 
         Returns:
             (float):
@@ -1976,6 +1990,9 @@ class AnalysisMixin(object):
             If you don't sepcify a col value or set it to None, then the assigned columns via the
             :py:attr:`DataFile.setas` attribute will be used.
 
+            If *threshold* is a list, all of the thresholds are found in one pass over the data and the first
+            crossing of each is returned - with nan if a threshold is never crossed.
+
         Warning:
             There has been an API change. Versions prior to 0.1.9 placed the column before the threshold in the positional
             argument list. In order to support the use of assigned columns, this has been swapped to the present order.
@@ -1991,17 +2008,25 @@ class AnalysisMixin(object):
         rising = kargs.pop("rising", True)
         falling = kargs.pop("falling", False)
         all_vals = kargs.pop("all_vals", False)
+        interpolate = kargs.pop("interpolate", True)
 
         current = self.column(col)
 
-        # Recursively call if we've got an iterable threshold
+        # Find the first crossing of every threshold in one go if we've got an iterable threshold
         if isiterable(threshold):
+            found = _threshold(threshold, current, rising=rising, falling=falling, interpolate=interpolate)
+            index = _np_.array([roots[0] if len(roots) else _np_.nan for roots in found])
+            ok = _np_.logical_not(_np_.isnan(index))
             if isinstance(xcol, bool) and not xcol:
-                ret = _np_.zeros((len(threshold), self.shape[1]))
+                ret = _np_.full((len(index), self.shape[1]), _np_.nan).view(type=DataArray)
+                if ok.any():
+                    ret[ok] = self.interpolate(index[ok], xcol=False)
+            elif xcol is not None:
+                ret = _np_.full(len(index), _np_.nan).view(type=DataArray)
+                if ok.any():
+                    ret[ok] = self.interpolate(index[ok], xcol=False)[:, self.find_col(xcol)]
             else:
-                ret = _np_.zeros_like(threshold).view(type=DataArray)
-            for ix, th in enumerate(threshold):
-                ret[ix] = self.threshold(th, col=col, xcol=xcol, rising=rising, falling=falling, all_vals=all_vals)
+                ret = index.view(type=DataArray)
             # Now we have to clean up the  retujrn list into a DataArray
             if isinstance(xcol, bool) and not xcol:  # if xcol was False we got a complete row back
                 ch = self.column_headers
@@ -2020,7 +2045,7 @@ class AnalysisMixin(object):
                     ret.isrow = False
             return ret
         else:
-            ret = _threshold(threshold, current, rising=rising, falling=falling)
+            ret = _threshold(threshold, current, rising=rising, falling=falling, interpolate=interpolate)
             if not all_vals:
                 ret = [ret[0]] if _np_.any(ret) else []
 
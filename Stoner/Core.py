@@ -34,10 +34,16 @@ from .tools import all_type, operator, isiterable, islike_list, get_option
 from .core.exceptions import StonerLoadError, StonerSetasError, StonerUnrecognisedFormat
 from .core import _setas, regexpDict, typeHintedDict, metadataObject
 from .core.array import DataArray
+from .core.cache import load_cached, save_cached
 from .core.utils import (
     copy_into,
     itersubclasses,
     tab_delimited,
+    header_lines,
+    window_offsets,
+    sorted_spans,
+    spans_mask,
+    operator_limits,
     add_core as __add_core__,
     and_core as __and_core__,
     sub_core as __sub_core__,
@@ -72,6 +78,32 @@ try:
 except ImportError:
     pd = None
 
+# A nan written in a data cell of a TDI file, as opposed to an empty cell. Data cells always follow a tab, so a
+# nan in the metadata column doesn't match.
+_nan_token = re.compile(r"\t *[-+]?nan *(?=[\t\r\n])", re.IGNORECASE)
+
+
+def _has_nan_cell(filename, chunk=1 << 20):
+    """Scan a TDI file in chunks for a data cell that holds a literal nan.
+
+    Args:
+        filename (str): The file to scan.
+
+    Keyword Arguments:
+        chunk (int): The number of characters to read at a time.
+
+    Returns:
+        (bool): True if any data cell holds a nan.
+    """
+    tail = ""
+    with io.open(filename, "r", encoding="utf-8", errors="ignore") as datafile:
+        for text in iter(lambda: datafile.read(chunk), ""):
+            text = tail + text
+            if _nan_token.search(text):
+                return True
+            tail = text[-16:]  # Long enough to hold a nan token split across two chunks
+    return _nan_token.search(tail + "\n") is not None  # A nan in the last cell of a file without a final newline
+
 
 class DataFile(metadataObject):
 
@@ -153,6 +185,12 @@ class DataFile(metadataObject):
     # mimetypes we match
     mime_type = ["text/plain"]
 
+    #: _probe_size (int): Number of bytes read from the start of a file to pass to :py:meth:`DataFile.probe`.
+    _probe_size = 4096
+
+    #: _metadata_only (bool): True if only the metadata and column headers were read when the file was loaded.
+    _metadata_only = False
+
     _conv_string = _np_.vectorize(str)
     _conv_float = _np_.vectorize(float)
 
@@ -171,6 +209,7 @@ class DataFile(metadataObject):
         self._public_attrs_real = {}
         object.__setattr__(self, "_data", DataArray([]))
         self._baseclass = DataFile
+        self._load_stats = {"probes": 0, "loads": 0}
         return self
 
     def __init__(self, *args, **kargs):
@@ -334,7 +373,7 @@ class DataFile(metadataObject):
             self._init_many(*arg, **kargs)
         else:
             raise SyntaxError("No constructor for {}".format(type(arg)))
-        self.data._setas.cols.update(self.setas._get_cols())
+        self._data._setas.cols.update(self.setas._get_cols())
 
     def _init_double(self, *args, **kargs):
         """Two argument constructors handled here. Called form __init__"""
@@ -501,6 +540,11 @@ class DataFile(metadataObject):
         ret = tabulate(outp, tablefmt=fmt, numalign="decimal", stralign="center")
         return ret
 
+    @property
+    def load_stats(self):
+        """Return a dictionary of the number of format probes, full loads and cache hits made loading this file."""
+        return dict(self._load_stats)
+
     @property
     def mask(self):
         """Returns the mask of the data array."""
@@ -1297,7 +1341,11 @@ class DataFile(metadataObject):
                     metaDataArray += 1
                     self.metadata.import_key(row[0])
         # End of metadata reading, close filke and reopen to read data
-        if still_data:  # data extends beyond metada - read with genfromtxt
+        if kargs.get("metadata_only", False):
+            self._header_only(col_headers_tmp, cols - 1)
+        elif data_array > 0 and self.__read_tdi_block(cols, None if still_data else data_array):
+            pass
+        elif still_data:  # data extends beyond metada - read with genfromtxt
             self.data = DataArray(
                 _np_.genfromtxt(
                     self.filename,
@@ -1328,6 +1376,77 @@ class DataFile(metadataObject):
             self.column_headers = col_headers_tmp
         self["TDI Format"] = fmt
 
+    def _header_only(self, column_headers, cols=None):
+        """Finish a metadata only load by setting an empty data array with the right column headers.
+
+        Args:
+            column_headers (list of str): The column headers read from the file.
+
+        Keyword Arguments:
+            cols (int or None): The number of columns of data, if known to be more than the number of column headers.
+
+        Notes:
+            *_load* methods that can stop once they have read the metadata should check for a *metadata_only* keyword
+            argument and call this method instead of reading the data.
+        """
+        column_headers = list(column_headers)
+        if cols is not None and cols > len(column_headers):
+            column_headers.extend(["Column {}".format(i) for i in range(len(column_headers), cols)])
+        self.data = DataArray(_np_.zeros((0, len(column_headers))))
+        self.column_headers = column_headers
+        self._metadata_only = True
+
+    def __read_tdi_block(self, cols, rows=None):
+        """Read the numeric block of a TDI file in bulk with the pandas C parser.
+
+        Args:
+            cols (int): The number of columns in the file, including the metadata column.
+
+        Keyword Arguments:
+            rows (int or None): The number of rows of data to read, or None to read to the end of the file.
+
+        Returns:
+            (bool): True if the data was read, False if pandas is not available or couldn't parse the file, in which
+            case the slower :py:func:`numpy.genfromtxt` reader should be used instead.
+
+        Notes:
+            Empty cells are masked, as they are with :py:func:`numpy.genfromtxt`. The file is streamed to the parser
+            rather than read into memory. The columns with missing values are only parsed a second time, as text, if a
+            data cell contains a literal nan that must be told apart from an empty cell.
+        """
+        if pd is None or cols < 2:
+            return False
+        args = {
+            "sep": "\t",
+            "header": None,
+            "skiprows": 1,
+            "nrows": rows,
+            "quoting": csv.QUOTE_NONE,
+            "engine": "c",
+        }
+        try:
+            with io.open(self.filename, "r", encoding="utf-8", errors="ignore") as datafile:
+                frame = pd.read_csv(
+                    datafile,
+                    usecols=range(1, cols),
+                    dtype=_np_.float64,
+                    keep_default_na=False,
+                    na_values=[""],
+                    float_precision="round_trip",
+                    **args
+                )
+            values = frame.values
+            mask = _np_.isnan(values)
+            nan_cols = _np_.nonzero(mask.any(axis=0))[0]
+            if nan_cols.size and _has_nan_cell(self.filename):  # Only empty cells are missing values, not a nan
+                with io.open(self.filename, "r", encoding="utf-8", errors="ignore") as datafile:
+                    text = pd.read_csv(datafile, usecols=nan_cols + 1, dtype=str, na_filter=False, **args)
+                mask[:, nan_cols] = _np_.char.strip(text.values.astype(str)) == ""
+        except (ValueError, TypeError, IndexError, pd.errors.ParserError):
+            return False
+        self.data = DataArray(_np_.ma.MaskedArray(values, mask=mask))
+        return True
+
     def __parse_metadata(self, key, value):
         """Parse the metadata string, removing the type hints into a separate dictionary from the metadata.
 
@@ -1344,6 +1463,35 @@ class DataFile(metadataObject):
         """
         self.metadata[key] = value
 
+    def __probe_subclasses(self, mimetype=None):
+        """Read the start of the file once and rank the subclasses of :py:class:`DataFile` that might load it.
+
+        Keyword Arguments:
+            mimetype (str or None): If filemagic is available, the mime-type of the file.
+
+        Returns:
+            (list of classes): Subclasses that positively identified the file followed by those that could not tell,
+            each group in priority order. Subclasses that rule the file out are dropped.
+        """
+        with io.open(self.filename, "rb") as sniff:
+            header = sniff.read(self._probe_size)
+        positive = []
+        unknown = []
+        for cls in self.subclasses.values():  # pylint: disable=no-member
+            if filemagic is not None and mimetype not in cls.mime_type:  # short circuit for non-=matching mime-types
+                if self.debug:
+                    print("Skipping {} due to mismatcb mime type {}".format(cls.__name__, cls.mime_type))
+                continue
+            self._load_stats["probes"] += 1
+            result = cls._sniff(header, self.filename)
+            if self.debug:
+                print("Probed {}: {}".format(cls.__name__, result))
+            if result is None:
+                unknown.append(cls)
+            elif result:
+                positive.append(cls)
+        return positive + unknown
+
     def __read_iterable(self, reader):
         """Internal method to read a string representation of py:class:`DataFile` in line by line."""
         if isiterable(reader):
@@ -1367,7 +1515,7 @@ class DataFile(metadataObject):
         col_headers_tmp = [x.strip() for x in row[1:]]
         cols = len(col_headers_tmp)
         self._data._setas = _setas("." * cols)
-        self.data = DataArray([], setas=self._data._setas)
+        data = []
         for r in reader:
             if r.strip() == "":  # Blank line
                 continue
@@ -1386,8 +1534,8 @@ class DataFile(metadataObject):
                     self.metadata[md[0].strip()] = self.metadata.string_to_type(md[1].strip())
             if len(row) < 2:
                 continue
-            self.data = _np_.append(self.data, self._conv_float(row[1:]))
-        self.data = _np_.reshape(self.data, (-1, cols))
+            data.extend(float(x) for x in row[1:])
+        self.data = _np_.reshape(_np_.array(data, dtype=float), (-1, cols))
         self.column_headers = ["Column {}".format(i) for i in range(cols)]
         for i, head_temp in enumerate(col_headers_tmp):
             self.column_headers[i] = head_temp
@@ -1498,6 +1646,24 @@ class DataFile(metadataObject):
     def __search_index(self, xcol, value, accuracy):
         """Helper for the search method that returns an array of booleans for indexing matching rows."""
         x = self.find_col(xcol)
+        numbers = _np_.asarray(value) if isinstance(value, (list, _np_.ndarray)) else None
+        if numbers is not None and (numbers.ndim != 1 or numbers.dtype.kind not in "iuf"):
+            numbers = None
+        if isinstance(value, (int_types, float)):
+            limits = (value - accuracy, value + accuracy, True)
+        elif isinstance(value, tuple) and len(value) == 2:
+            limits = (min(value) - accuracy, max(value) + accuracy, False)
+        elif numbers is not None:
+            limits = (numbers - accuracy, numbers + accuracy, True)
+        else:
+            limits = None
+        if limits is not None and get_option("search_index") and isinstance(x, int_types):
+            index = self.data._sorted_column(x)
+            if index is not None:  # Look the limits up in the sorted column
+                order, values = index
+                ix = _np_.zeros(len(order), dtype=bool)
+                ix[order] = spans_mask(*sorted_spans(values, *limits), size=len(order))
+                return ix
         if isinstance(value, (int_types, float)):
             ix = _np_.less_equal(_np_.abs(self.data[:, x] - value), accuracy)
         elif isinstance(value, tuple) and len(value) == 2:
@@ -1508,6 +1674,15 @@ class DataFile(metadataObject):
             low = _np_.ones_like(v) * low
             u = _np_.ones_like(v) * u
             ix = _np_.logical_and(v > low, v <= u)
+        elif numbers is not None:  # Compare each row with the nearest of the sorted values
+            numbers = _np_.sort(numbers)
+            if numbers.size == 0:
+                return _np_.zeros(len(self), dtype=bool)
+            v = self.data[:, x]
+            pos = _np_.searchsorted(numbers, v)
+            below = numbers[_np_.clip(pos - 1, 0, numbers.size - 1)]
+            above = numbers[_np_.clip(pos, 0, numbers.size - 1)]
+            ix = _np_.less_equal(_np_.minimum(_np_.abs(v - below), _np_.abs(v - above)), accuracy)
         elif isinstance(value, (list, _np_.ndarray)):
             ix = _np_.zeros(len(self), dtype=bool)
             for v in value:
@@ -1603,6 +1778,32 @@ class DataFile(metadataObject):
             typ = "a {}".format(type(self._public_attrs[k]))
         raise TypeError("{} should be {}".format(k, typ))
 
+    @classmethod
+    def _sniff(cls, header, filename):
+        """Call :py:meth:`DataFile.probe` if it can be trusted to describe this class's *_load* method.
+
+        Args:
+            header (bytes): The first few kB of the file.
+            filename (str): The name of the file being loaded.
+
+        Returns:
+            (bool or None): The result of the probe, or None if the probe was inherited from a class that
+            implements a different *_load* or the probe failed.
+
+        Notes:
+            A subclass that overrides *_load* but not *probe* would otherwise inherit a probe for somebody else's
+            file format and reject files that it could actually read.
+        """
+        owners = {}
+        for name in ("probe", "_load"):
+            owners[name] = [klass for klass in cls.__mro__ if name in klass.__dict__][0]
+        if not issubclass(owners["probe"], owners["_load"]):
+            return None
+        try:
+            return cls.probe(header, filename)
+        except Exception:  # pylint: disable=broad-except
+            return None
+
     # ============================================================================================================================
     ############################              Public Methods                ####################################################
     # ============================================================================================================================
@@ -1764,8 +1965,22 @@ class DataFile(metadataObject):
             ndarray: A single row of data as a :py:class:`Stoner.Core.DataArray`.
 
         Notes: To find which row it is that has been returned, use the :py:attr:`Stoner.Core.DataArray.i` index attribute.
+            If the *search_index* option is set, the row is found from a sorted copy of the column.
         """
         _ = self._col_args(xcol=xcol)
+        index = None
+        if get_option("search_index") and isinstance(_.xcol, int_types) and not _np_.isnan(value):
+            index = self.data._sorted_column(_.xcol)
+        if index is not None:
+            order, values = index
+            n = _np_.searchsorted(values, _np_.inf, side="right")  # Leave out the nans at the end
+            pos = int(_np_.searchsorted(values[:n], value))
+            candidates = [pos] if pos < n else []
+            if pos > 0:  # The first row of the next smallest value
+                candidates.append(int(_np_.searchsorted(values, values[pos - 1])))
+            if candidates:
+                best = min(candidates, key=lambda p: (abs(values[p] - value), order[p]))
+                return self[int(order[best])]
         xdata = _np_.abs(self // _.xcol - value)
         i = int(xdata.argmin())
         return self[i]
@@ -1957,9 +2172,11 @@ class DataFile(metadataObject):
                 self.data = self.data[col]
                 return self
             if isiterable(col) and all_type(col, int_types) and val is None and not invert:
-                col.sort(reverse=True)
-                for c in col:
-                    self.del_rows(c)
+                tmp_mask = self.mask  # Delete all the rows in one go
+                tmp_setas = self.data._setas.clone
+                self.data = _np_.delete(self.data, _np_.array(col, dtype=int), 0)
+                self.data.mask = _np_.delete(tmp_mask, _np_.array(col, dtype=int), 0)
+                self.data._setas = tmp_setas
             elif isinstance(col, list) and all_type(col, int_types) and val is None and invert:
                 for i in range(len(self) - 1, -1, -1):
                     if i not in col:
@@ -2128,6 +2345,8 @@ class DataFile(metadataObject):
         Keyword Arguments:
             auto_load (bool): If True (default) then the load routine tries all the subclasses of :py:class:`DataFile` in turn to load the file
             filetype (:py:class:`DataFile`, str): If not none then tries using filetype as the loader.
+            metadata_only (bool): If True, ask the loader to stop once it has read the metadata and column headers.
+                Loaders that can't do this will load the data as well. (default False)
 
         Returns:
             DataFile: A copy of the loaded :py:data:`DataFile` instance
@@ -2144,12 +2363,27 @@ class DataFile(metadataObject):
             make an early positive determination that a file has the correct format can have higher priority levels. Classes should return
             a suitable expcetion if they fail to load the file.
 
+            Before any subclass is asked to load the file, the first few kB are read once and passed to each
+            subclass's :py:meth:`DataFile.probe`. Subclasses that positively identify the file are tried first, those
+            that can't tell are tried next and those that rule the file out are skipped. The number of probes and full
+            loads made is recorded in :py:attr:`DataFile.load_stats`.
+
+            If *metadata_only* is set and the loader supports it, then the :py:attr:`DataFile.data` will have no rows,
+            but the :py:attr:`DataFile.column_headers` will be set.
+
+            If the *load_cache* option is set (see :py:func:`Stoner.set_option`), then a binary copy of the loaded file
+            is kept in the cache directory and later loads of the same, unchanged, file memory map the copy instead of
+            parsing the file again - see :py:mod:`Stoner.core.cache`. Files loaded with different loader arguments are
+            cached separately.
+
             If not class can load a file successfully then a RunttimeError exception is raised.
         """
         filename = args[0] if len(args) > 0 else None
         filename = kargs.pop("filename", filename)
         filetype = kargs.pop("filetype", None)
         auto_load = kargs.pop("auto_load", filetype is None)
+        if kargs.pop("metadata_only", False):
+            kargs["metadata_only"] = True
 
         if isinstance(filetype, string_types):  # We can specify filetype as part of name
             try:
@@ -2170,6 +2404,7 @@ class DataFile(metadataObject):
             self.filename = filename
         if not path.exists(self.filename):
             raise IOError("Cannot find {} to load".format(self.filename))
+        mimetype = None
         if filemagic is not None:
             with filemagic(flags=MAGIC_MIME_TYPE) as m:
                 mimetype = m.id_filename(filename)
@@ -2177,21 +2412,33 @@ class DataFile(metadataObject):
                 print("Mimetype:{}".format(mimetype))
         cls = self.__class__
         failed = True
-        if auto_load:  # We're going to try every subclass we canA
-            for cls in self.subclasses.values():
+        self._load_stats = {"probes": 0, "loads": 0, "cached": 0}
+        use_cache = get_option("load_cache") and not kargs.get("metadata_only", False)
+        if auto_load:
+            cache_type = None
+        elif filetype is None:
+            cache_type = cls.__name__
+        else:
+            cache_type = getattr(filetype, "__name__", type(filetype).__name__)
+        load_kargs = dict(kargs)  # The loader may replace kargs, but the cache entry depends on what was passed in
+        cached = load_cached(self.filename, cache_type, args, load_kargs) if use_cache else None
+        if cached is not None:  # Unchanged since it was last loaded, so use the copy in the cache
+            self._load_stats["cached"] += 1
+            self.data = cached["data"]
+            self.metadata.update(cached["metadata"])
+            self.column_headers = cached["column_headers"]
+            self.setas = cached["setas"]
+            failed = False
+        elif auto_load:  # We're going to try every subclass that doesn't rule the file out
+            for cls in self.__probe_subclasses(mimetype):
                 if self.debug:
                     print(cls.__name__)
                 try:
-                    if (
-                        filemagic is not None and mimetype not in cls.mime_type
-                    ):  # short circuit for non-=matching mime-types
-                        if self.debug:
-                            print("Skipping {} due to mismatcb mime type {}".format(cls.__name__, cls.mime_type))
-                        continue
                     test = cls()
                     if self.debug and filemagic is not None:
                         print("Trying: {} =mimetype {}".format(cls.__name__, test.mime_type))
 
+                    self._load_stats["loads"] += 1
                     test._load(self.filename, auto_load=False, *args, **kargs)
                     try:
                         kargs = test._kargs
@@ -2206,6 +2453,7 @@ class DataFile(metadataObject):
                     if self.debug:
                         print("Test matadata: {}".format(test.metadata))
                     copy_into(test, self)
+                    self._metadata_only = test._metadata_only
                     if self.debug:
                         print("Self matadata: {}".format(self.metadata))
 
@@ -2224,41 +2472,70 @@ class DataFile(metadataObject):
                     )
                 )
         else:
+            self._load_stats["loads"] += 1
             if filetype is None:
                 test = cls()
                 test._load(self.filename, *args, **kargs)
                 kargs = getattr(test, "_kargs", kargs)
-                self["Loaded as"] = cls.__name__
                 self.data = test.data
                 self.metadata.update(test.metadata)
+                self["Loaded as"] = cls.__name__
+                self._metadata_only = test._metadata_only
                 failed = False
             elif issubclass(filetype, DataFile):
                 test = filetype()
                 test._load(self.filename, *args, **kargs)
                 kargs = getattr(test, "_kargs", kargs)
-                self["Loaded as"] = filetype.__name__
                 self.data = test.data
                 self.metadata.update(test.metadata)
+                self["Loaded as"] = filetype.__name__
                 self.column_headers = test.column_headers
+                self._metadata_only = test._metadata_only
                 failed = False
             elif isinstance(filetype, DataFile):
                 test = filetype.clone
                 test._load(self.filename, *args, **kargs)
                 kargs = getattr(test, "_kargs", kargs)
-                self["Loaded as"] = filetype.__name__
                 self.data = test.data
                 self.metadata.update(test.metadata)
+                self["Loaded as"] = filetype.__name__
                 self.column_headers = test.column_headers
+                self._metadata_only = test._metadata_only
                 failed = False
 
         if failed:
             raise SyntaxError("Failed to load file")
+        if use_cache and cached is None and not self._metadata_only:
+            save_cached(self.filename, self, cache_type, args, load_kargs)
+        kargs.pop("metadata_only", None)
         for k, i in kargs.items():
             if not callable(getattr(self, k, lambda x: False)):
                 setattr(self, k, i)
         self._kargs = kargs
         return self
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Cheaply check whether a file might be in the format read by this class's *_load* method.
+
+        Args:
+            header (bytes): The first few kB of the file.
+            filename (str): The name of the file.
+
+        Returns:
+            (bool or None): True if the file is positively identified, False if it definitely cannot be loaded by
+            this class and None if it isn't possible to tell without trying to load the file.
+
+        Notes:
+            This base class version checks for the TDI format header line. Subclasses that override *_load* should
+            also override this method - otherwise they are always tried (in priority order) after the classes that make
+            a positive identification of the file.
+        """
+        lines = header_lines(header)
+        if not lines:
+            return False
+        return lines[0].split("\t")[0].strip() in ["TDI Format 1.5", "TDI Format=Text 1.0"]
+
     def rename(self, old_col, new_col):
         """Renames columns without changing the underlying data.
 
@@ -2315,47 +2592,25 @@ class DataFile(metadataObject):
         Yields:
             ndarray: Yields with a section of data that is window rows long, each iteration moves the marker
             one row further on.
-        """
-        if isinstance(exclude_centre, bool) and exclude_centre:
-            exclude_centre = 1
-        if isinstance(exclude_centre, int_types) and not isinstance(exclude_centre, bool):
-            if exclude_centre % 2 == 0:
-                raise ValueError("If excluding the centre of the window, this must be an odd number of rows.")
-            elif window - exclude_centre < 2 or window < 3 or window % 2 == 0:
-                raise ValueError(
-                    "Window must be at least two bigger than the number of rows exluded from the centre, bigger than 3 and odd"
-                )
 
+        Note:
+            The windows are views of (or, when wrapping or excluding the centre, indexed copies of just those rows
+            of) the data. To work on all the windows at once use :py:func:`Stoner.core.utils.sliding_window`.
+        """
+        offsets = window_offsets(window, exclude_centre)
         hw = int((window - 1) / 2)
-        if exclude_centre:
-            hc = int((exclude_centre - 1) / 2)
-
-        for i in range(len(self)):
-            if i < hw:
-                pre_data = self.data[i - hw :]
-            else:
-                pre_data = _np_.zeros((0, self.shape[1]))
-            if i + 1 > len(self) - hw:
-                post_data = self.data[0 : hw - (len(self) - i - 1)]
-            else:
-                post_data = _np_.zeros((0, self.shape[1]))
-            starti = max(i - hw, 0)
-            stopi = min(len(self), i + hw + 1)
-            if exclude_centre:  # hacked to stop problems with DataArray concatenation
-                tmp = self.clone  # copy all properties
-                data = _np_.row_stack((self.data[starti : i - hc], self.data[i + 1 + hc : stopi]))
-                tmp.data = _np_.array(data)  # guarantee an ndarray
-                data = tmp.data  # get the DataArray
-            else:
-                data = self.data[starti:stopi]
-            if wrap:
-                tmp = self.clone  # copy all properties
-                ret = _np_.row_stack((pre_data, data, post_data))
-                tmp.data = _np_.array(ret)  # guarantee an ndarray
-                ret = tmp.data  # get the DataArray
+        data = self.data
+        length = len(self)
+        for i in range(length):
+            if wrap or exclude_centre:  # Index just the rows in the window rather than copying the whole DataFile
+                index = offsets + i
+                if wrap:
+                    index %= length
+                else:
+                    index = index[(index >= 0) & (index < length)]
+                yield data[index]
             else:
-                ret = data
-            yield ret
+                yield data[max(i - hw, 0) : i + hw + 1]
 
     def rows(self, not_masked=False, reset=False):
         """Generator method that will iterate over rows of data
@@ -2466,6 +2721,9 @@ class DataFile(metadataObject):
             - a tuple should contain a (min,max) value.
             - A callable object should have accept a float and an array representing the value of
               the search col for the the current row and the entire row.
+
+            If the *search_index* option is set, floats, tuples and lists of numbers are looked up in a sorted copy
+            of the search column, which is kept until the data is changed.
         """
         ix = self.__search_index(xcol, value, accuracy)
         if columns is None:  # Get the whole slice
@@ -2570,6 +2828,9 @@ class DataFile(metadataObject):
 
             There is a "magic" column name "_i" which is interpreted as the row numbers of the data.
 
+            If the *search_index* option is set, comparisons of a column with a number or a 2-tuple of numbers are
+            looked up in a sorted copy of the column and all such tests on the same column are combined into one mask.
+
         Example
             .. plot:: samples/select_example.py
                 :include-source:
@@ -2582,6 +2843,7 @@ class DataFile(metadataObject):
                 kargs.update(args[0])
         result = self.clone
         res = _np_.zeros(len(self), dtype=bool)
+        spans = {}  # Ranges of rows in each sorted column that are selected
         for arg in kargs:
             parts = arg.split("__")
             if parts == ["", ""]:
@@ -2600,7 +2862,24 @@ class DataFile(metadataObject):
                 res = _np_.logical_or(res, _np_.logical_xor(negate, operator[parts[-1]](self.data.i, kargs[arg])))
             else:
                 col = "__".join(parts[:end])
-                res = _np_.logical_or(res, _np_.logical_xor(negate, operator[parts[-1]](self.column(col), kargs[arg])))
+                limits = operator_limits(parts[-1], kargs[arg]) if get_option("search_index") else None
+                index = None
+                if limits is not None and isinstance(self.find_col(col), int_types):
+                    index = self.data._sorted_column(self.find_col(col))
+                if index is None:
+                    res = _np_.logical_or(
+                        res, _np_.logical_xor(negate, operator[parts[-1]](self.column(col), kargs[arg]))
+                    )
+                    continue
+                lo, hi = sorted_spans(index[1], *limits)
+                if negate:  # The rows before and after the range
+                    lo, hi = _np_.append(0, hi), _np_.append(lo, len(self))
+                los, his = spans.setdefault(self.find_col(col), ([], []))
+                los.append(lo)
+                his.append(hi)
+        for col, (los, his) in spans.items():
+            order = self.data._sorted_column(col)[0]
+            res[order] |= spans_mask(_np_.concatenate(los), _np_.concatenate(his), len(order))
         result.data = self.data[res, :]
         return result
 
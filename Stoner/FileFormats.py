@@ -46,6 +46,7 @@ from Stoner.formats.generic import CSVFile, KermitPNGFile, TDMSFile, HyperSpyFil
 from Stoner.formats.rigs import BigBlueFile, BirgeIVFile, MokeFile, FmokeFile
 from .core.exceptions import assertion
 from .core.base import string_to_type
+from .core.utils import header_lines
 import re
 import numpy as _np_
 import csv
@@ -72,6 +73,16 @@ class GenXFile(_SC_.DataFile):
     # the file load/save dialog boxes.
     patterns = ["*.dat"]  # Recognised filename patterns
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the GenX export line."""
+        lines = header_lines(header)
+        if not lines:
+            return False
+        pattern = re.compile(r'# Dataset "([^\"]*)" exported from GenX on (.*)$')
+        pattern2 = re.compile(r"#\sFile\sexported\sfrom\sGenX\'s\sReflectivity\splugin")
+        return pattern.match(lines[0]) is not None or pattern2.match(lines[0]) is not None
+
     def _load(self, filename=None, *args, **kargs):
         """Load function. File format has space delimited columns from row 3 onwards."""
         if filename is None or not filename:
@@ -176,6 +187,12 @@ class OVFFile(_SC_.DataFile):
             raise _SC_.StonerLoadError("Unknow OVF Format {}".format(fmt))
         return uvwdata
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the OOMMF banner line."""
+        lines = header_lines(header)
+        return bool(lines) and "OOMMF: rectangular mesh" in lines[0]
+
     def _load(self, filename=None, *args, **kargs):
         """Load function. File format has space delimited columns from row 3 onwards."""
         if filename is None or not filename:
@@ -247,6 +264,11 @@ class EasyPlotFile(_SC_.DataFile):
     #      file type before attempting to read data.
     priority = 32  # Fairly generic, but can do some explicit testing
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the EasyPlot banner near the start of the file."""
+        return "******** EasyPlot save file ********" in "".join(header_lines(header))[:1024]
+
     def _load(self, filename, *args, **kargs):
         """Private loader method."""
         if filename is None or not filename:
@@ -346,6 +368,12 @@ class PinkLibFile(_SC_.DataFile):
     # the file load/save dialog boxes.
     patterns = ["*.dat"]  # Recognised filename patterns
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for PINKlibrary on the first line."""
+        lines = header_lines(header)
+        return bool(lines) and "PINKlibrary" in lines[0]
+
     def _load(self, filename=None, *args, **kargs):
         """File loader for PinkLib.
 
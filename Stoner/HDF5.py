@@ -10,7 +10,8 @@ to :py:class:`Stoner.Core.Data`.
 
 """
 __all__ = ["HDF5File", "HDF5Folder", "HGXFile", "SLS_STXMFile", "STXMImage"]
-from .compat import string_types, bytes2str, get_filedialog
+import atexit
+from .compat import string_types, int_types, bytes2str, get_filedialog
 import h5py
 import numpy as _np_
 from .Core import StonerLoadError, metadataObject, DataFile
@@ -18,6 +19,114 @@ from . import Data, DataFolder
 from .Image.core import ImageFile
 import os.path as path
 import os
+import time
+from functools import partial
+
+_handles = dict()  # Read-only h5py.File objects shared between everything reading from the same file
+_ints = int_types + (_np_.integer,)
+
+
+def _shared_file(filename):
+    """Return a read-only h5py.File for *filename* that is shared by everything that reads from the file.
+
+    Args:
+        filename (str): The name of the HDF5 file.
+
+    Returns:
+        (h5py.File): The open file - this should not be closed by the caller.
+    """
+    filename = path.realpath(filename)
+    handle = _handles.get(filename, None)
+    if handle is None or not handle.id.valid:
+        handle = h5py.File(filename, "r")
+        _handles[filename] = handle
+    return handle
+
+
+def _close_shared(filename=None):
+    """Close the shared read-only h5py.File for *filename*, or all of them if *filename* is None.
+
+    This needs to be done before the file is opened for writing.
+    """
+    names = list(_handles.keys()) if filename is None else [path.realpath(filename)]
+    for name in names:
+        handle = _handles.pop(name, None)
+        if handle is not None and handle.id.valid:
+            handle.close()
+
+
+atexit.register(_close_shared)
+
+
+def _memmap(dataset):
+    """Memory map an h5py.Dataset if it is stored uncompressed in a single block of the file.
+
+    Args:
+        dataset (h5py.Dataset): The dataset to map.
+
+    Returns:
+        (numpy.memmap or None): A copy-on-write map of the dataset, or None if the dataset is chunked, compressed or
+        otherwise can't be mapped.
+    """
+    if dataset.chunks is not None or dataset.compression is not None or dataset.external or dataset.dtype.hasobject:
+        return None
+    offset = dataset.id.get_offset()
+    if offset is None or dataset.size == 0:
+        return None
+    return _np_.memmap(dataset.file.filename, mode="c", dtype=dataset.dtype, shape=dataset.shape, offset=offset)
+
+
+def _h5_index(index):
+    """Return True if *index* is an int or a forward slice that h5py can select directly from a dataset."""
+    if isinstance(index, slice):
+        return index.step is None or index.step > 0
+    return isinstance(index, _ints)
+
+
+class _LazyDataset(object):
+
+    """Read parts of a 2D h5py.Dataset on demand through the shared read-only file handle.
+
+    Only the file name and path of the dataset are kept, so the file can be closed and reopened (see
+    :py:func:`_shared_file`) and the object can be copied and pickled.
+    """
+
+    def __init__(self, dataset):
+        self.filename = path.realpath(dataset.file.filename)
+        self.name = dataset.name
+        self.shape = dataset.shape
+        self.dtype = dataset.dtype
+
+    @property
+    def dataset(self):
+        """The h5py.Dataset, opened via the shared file handle."""
+        return _shared_file(self.filename)[self.name]
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        """Read the rows and columns selected by *index* from the file.
+
+        Integers and forward slices are passed to h5py so that only the chunks of the dataset that are needed are read.
+        Other indices (lists, arrays or reversed slices) are applied with numpy after reading the whole of that axis.
+        """
+        if not isinstance(index, tuple):
+            index = (index,)
+        index = tuple(index) + (slice(None),) * (2 - len(index))
+        index = tuple(ix + self.shape[i] if isinstance(ix, _ints) and ix < 0 else ix for i, ix in enumerate(index))
+        selection = tuple(ix if _h5_index(ix) else slice(None) for ix in index)
+        ret = self.dataset[selection]
+        rest = tuple(slice(None) if _h5_index(ix) else ix for ix in index if not isinstance(ix, _ints))
+        if all(isinstance(ix, slice) and ix == slice(None) for ix in rest):
+            return ret
+        if len(rest) == 2 and not isinstance(rest[0], slice) and not isinstance(rest[1], slice):
+            rest = _np_.ix_(*rest)
+        return ret[rest]
+
+    def read(self):
+        """Read the whole dataset."""
+        return self.dataset[...]
 
 
 def _raise_error(f, message="Not a valid hdf5 file."):
@@ -29,6 +138,25 @@ def _raise_error(f, message="Not a valid hdf5 file."):
         raise StonerLoadError(message)
 
 
+def _probe_signature(header, probe_size):
+    """Look for the HDF5 format signature block in the bytes read from the start of a file.
+
+    Args:
+        header (bytes): The first few kB of the file.
+        probe_size (int): The number of bytes that were asked for when reading *header*.
+
+    Returns:
+        (bool or None): True if the signature is found, False if the whole file was read without finding it and None if
+        the signature might be further into the file than *header* reaches.
+    """
+    offset = 0
+    while offset + 8 <= len(header):
+        if header[offset : offset + 8] == b"\x89HDF\r\n\x1a\n":
+            return True
+        offset = 512 if offset == 0 else offset * 2
+    return None if len(header) >= probe_size else False
+
+
 def _open_filename(filename):
     """Examine a file to see if it is an HDF5 file and open it if so.
 
@@ -66,7 +194,7 @@ def _open_filename(filename):
             else:
                 raise StonerLoadError("Couldn't find the HD5 format singature block")
     try:
-        f = h5py.File(filename, "r+")
+        f = h5py.File(filename, "r")
         for grp in group.split("/"):
             if grp.strip() != "":
                 f = f[grp]
@@ -97,13 +225,31 @@ class HDF5File(DataFile):
     group name or from the hdf5 filename.
     The root has an attribute *type* that must by 'HDF5File' otherwise the load routine
     will refuse to load it. This is to try to avoid loading rubbish from random hdf files.
+
+    If the file is loaded with *lazy=True* then the data is not read in when the file is loaded. If the data was saved
+    without compression (set the *compression* attribute to None before saving) it is memory mapped from the file.
+    Otherwise :py:attr:`HDF5File.shape`, :py:meth:`HDF5File.column` and indexing rows and columns with integers,
+    slices or column names read just the parts of the dataset that are needed (and return plain numpy arrays), while
+    the whole dataset is read the first time that :py:attr:`HDF5File.data` or a column set by :py:attr:`DataFile.setas`
+    (e.g. *d.x*) is used. The file should not be changed whilst the data is in use.
+
+    Saving with *appendable=True* stores the data in a resizable dataset, chunked in blocks of :py:attr:`chunk_rows`
+    rows and compressed with the :py:attr:`compression` filter. :py:meth:`HDF5File.append_rows` can then add rows to the
+    end of the file without rewriting it, so that a measurement can stream into one file. Files saved like this can be
+    loaded and appended to later. The metadata is written to the file again by :py:meth:`HDF5File.flush`, which is
+    called at most every :py:attr:`flush_interval` seconds by :py:meth:`HDF5File.append_rows`, and by
+    :py:meth:`HDF5File.close`.
     """
 
     priority = 16
     compression = "gzip"
     compression_opts = 6
+    chunk_rows = 1024
+    flush_interval = 30.0
     patterns = ["*.hdf", "*.hf5"]
     mime_type = ["application/x-hdf"]
+    _lazy = None  # A _LazyDataset if the data is still to be read from the file
+    _flushed = 0.0  # time.time() when the metadata was last written by append_rows
 
     def __init__(self, *args, **kargs):
         """Constructor to catch initialising with an h5py.File or h5py.Group
@@ -111,11 +257,103 @@ class HDF5File(DataFile):
         if args and isinstance(args[0], (h5py.File, h5py.Group)):
             args = list(args)
             grp = args.pop(0)
+            lazy = kargs.pop("lazy", False)
         else:
             grp = None
         super(HDF5File, self).__init__(*args, **kargs)
         if grp is not None:
-            self._load(grp, **kargs)
+            self._load(grp, lazy=lazy, **kargs)
+            delattr(self, "_kargs")
+
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the HDF5 signature block."""
+        return _probe_signature(header, cls._probe_size)
+
+    @property
+    def column_headers(self):
+        """Pass through to the setas attribute without reading lazily loaded data."""
+        return self._data._setas.column_headers
+
+    @column_headers.setter
+    def column_headers(self, value):
+        """Write the column_headers attribute (delagated to the setas object)."""
+        self._data._setas.column_headers = value
+
+    @property
+    def data(self):
+        """Property Accessors for the main numerical data, reading it from the file first if it was loaded lazily."""
+        if self._lazy is not None:
+            lazy = self._lazy
+            self._lazy = None
+            DataFile.data.fset(self, lazy.read())
+        return DataFile.data.fget(self)
+
+    @data.setter
+    def data(self, value):
+        """Set the data attribute, discarding any lazily loaded data that hasn't been read yet."""
+        self._lazy = None
+        DataFile.data.fset(self, value)
+
+    @property
+    def shape(self):
+        """Pass through the numpy shape attribute of the data."""
+        if self._lazy is not None:
+            return self._lazy.shape
+        return DataFile.shape.fget(self)
+
+    def __getitem__(self, name):
+        """Read lazily loaded rows and columns straight from the file, otherwise as :py:meth:`DataFile.__getitem__`."""
+        if self._lazy is not None:
+            if isinstance(name, _ints + (slice,)):
+                return self._lazy[name]
+            if isinstance(name, tuple) and len(name) == 2 and isinstance(name[0], _ints + (slice,)):
+                cols = name[1] if isinstance(name[1], _ints + (slice,)) else self.find_col(name[1])
+                return self._lazy[name[0], cols]
+        return super(HDF5File, self).__getitem__(name)
+
+    def __len__(self):
+        """Return the number of rows of data."""
+        if self._lazy is not None:
+            return self._lazy.shape[0]
+        return super(HDF5File, self).__len__()
+
+    def column(self, col):
+        """Extracts one or more columns of data, just reading those columns from the file if loaded lazily."""
+        if self._lazy is not None:
+            return self._lazy[:, self.find_col(col)]
+        return super(HDF5File, self).column(col)
+
+    def _getattr_col(self, name):
+        """Get a column using the setas attribute, reading lazily loaded data in first."""
+        if self._lazy is not None:
+            self.data  # pylint: disable=pointless-statement
+        return super(HDF5File, self)._getattr_col(name)
+
+    def find_col(self, col, force_list=False):
+        """Indexes the column headers in order to locate a column of data - see :py:meth:`DataFile.find_col`."""
+        return self._data._setas.find_col(col, force_list)
+
+    def load(self, *args, **kargs):
+        """Load the file as :py:meth:`DataFile.load` does, but leave the data in the file if *lazy* is True.
+
+        :py:meth:`DataFile.load` loads into a new object and then copies the data across, which would read all of the
+        data, so with *lazy=True* the file is loaded directly into this object instead.
+        """
+        filename = kargs.pop("filename", args[0] if args else None)
+        if not kargs.pop("lazy", False) or not isinstance(filename, string_types):
+            return super(HDF5File, self).load(filename, *args[1:], **kargs)
+        kargs.pop("auto_load", None)
+        kargs.pop("filetype", None)
+        self._load(filename, *args[1:], lazy=True, **kargs)
+        kargs = self._kargs
+        delattr(self, "_kargs")
+        self["Loaded as"] = self.__class__.__name__
+        for k, i in kargs.items():
+            if not callable(getattr(self, k, lambda x: False)):
+                setattr(self, k, i)
+        self._kargs = kargs
+        return self
 
     def _load(self, filename, *args, **kargs):
         """Loads data from a hdf5 file
@@ -123,9 +361,14 @@ class HDF5File(DataFile):
         Args:
             h5file (string or h5py.Group): Either a string or an h5py Group object to load data from
 
+        Keyword Arguments:
+            lazy (bool): If True, memory map the data from the file if possible instead of reading it (default False).
+
         Returns:
             itself after having loaded the data
         """
+        lazy = kargs.pop("lazy", False)
+        keep = set(kargs.keys()) - set(["auto_load", "filetype", "metadata_only"])
         if filename is None or not filename:
             self.get_filename("r")
             filename = self.filename
@@ -142,7 +385,14 @@ class HDF5File(DataFile):
         ):  # Ensure that if we have a type attribute it tells us we're the right type !
             _raise_error(f, message="HDF5 group doesn't hold an HD5File")
         data = f["data"]
-        if _np_.product(_np_.array(data.shape)) > 0:
+        mapped = _memmap(data) if lazy and not kargs.get("metadata_only", False) else None
+        if kargs.get("metadata_only", False):
+            pass
+        elif mapped is not None:
+            self.data = mapped
+        elif lazy and data.ndim == 2 and data.size > 0:  # Just the columns for now, the rows are read when needed
+            self.data = _np_.zeros((0, data.shape[1]), dtype=data.dtype)
+        elif _np_.product(_np_.array(data.shape)) > 0:
             self.data = data[...]
         else:
             self.data = [[]]
@@ -152,7 +402,9 @@ class HDF5File(DataFile):
             typehints = dict()
         else:
             typehints = typehints.attrs
-        if "column_headers" in f.attrs:
+        if "column_headers" in f.attrs and kargs.get("metadata_only", False):
+            self._header_only([bytes2str(x) for x in f.attrs["column_headers"]], data.shape[-1] if data.ndim else None)
+        elif "column_headers" in f.attrs:
             self.column_headers = [x.decode("utf8") for x in f.attrs["column_headers"]]
             if isinstance(self.column_headers, string_types):
                 self.column_headers = self.metadata.string_to_type(self.column_headers)
@@ -173,8 +425,11 @@ class HDF5File(DataFile):
                 self.filename = os.path.realpath(f.file.filename)
         else:
             self.filename = os.path.realpath(f.filename)
+        if lazy and mapped is None and data.ndim == 2 and data.size > 0 and not kargs.get("metadata_only", False):
+            self._lazy = _LazyDataset(data)
         if isinstance(filename, string_types):
             f.file.close()
+        self._kargs = {k: kargs[k] for k in keep}
         return self
 
     def save(self, filename=None, **kargs):
@@ -185,9 +440,14 @@ class HDF5File(DataFile):
                 to save the file. If this is a string, the corresponding file is opened for
                 writing, written to and save again.
 
+        Keyword Arguments:
+            appendable (bool): If True, save the data in a resizable, chunked dataset so that rows can be added with
+                :py:meth:`HDF5File.append_rows`. Default is False.
+
         Returns
             A copy of the object
         """
+        appendable = kargs.pop("appendable", False)
         if filename is None:
             filename = self.filename
         if filename is None or (isinstance(filename, bool) and not filename):  # now go and ask for one
@@ -195,43 +455,160 @@ class HDF5File(DataFile):
             self.filename = filename
         if isinstance(filename, string_types):
             mode = "r+" if os.path.exists(filename) else "w"
+            _close_shared(filename)
             f = h5py.File(filename, mode)
         elif isinstance(filename, h5py.File) or isinstance(filename, h5py.Group):
             f = filename
         try:
-            f.require_dataset(
-                "data",
-                data=self.data,
-                shape=self.data.shape,
-                dtype=self.data.dtype,
-                compression=self.compression,
-                compression_opts=self.compression_opts,
-            )
-            metadata = f.require_group("metadata")
-            typehints = f.require_group("typehints")
-            for k in self.metadata:
-                try:
-                    typehints.attrs[k] = self.metadata._typehints[k]
-                    metadata.attrs[k] = self[k]
-                except TypeError:  # We get this for trying to store a bad data type - fallback to metadata export to string
-                    parts = self.metadata.export(k).split("=")
-                    metadata.attrs[k] = "=".join(parts[1:])
-            f.attrs["column_headers"] = [x.encode("utf8") for x in self.column_headers]
-            f.attrs["filename"] = self.filename
-            f.attrs["type"] = "HDF5File"
+            if self.compression is not None:
+                compression = {"compression": self.compression, "compression_opts": self.compression_opts}
+            else:
+                compression = {}
+            if appendable:
+                data = self.data
+                if data.ndim != 2 or data.shape[1] == 0:
+                    raise ValueError("Can only save 2D data with at least one column as appendable.")
+                if "data" in f:
+                    del f["data"]
+                f.create_dataset(
+                    "data",
+                    data=data,
+                    maxshape=(None, data.shape[1]),
+                    chunks=(max(int(self.chunk_rows), 1), data.shape[1]),
+                    **compression
+                )
+            else:
+                f.require_dataset("data", data=self.data, shape=self.data.shape, dtype=self.data.dtype, **compression)
+            self.__write_metadata(f)
         except Exception as e:
             if isinstance(filename, str):
                 f.file.close()
             raise e
         if isinstance(f, h5py.File):
             self.filename = f.filename
+        elif appendable and f.name != "/":  # Keep the group so that append_rows can find the dataset again
+            self.filename = os.path.join(f.file.filename, f.name.lstrip("/"))
         elif isinstance(f, h5py.Group):
             self.filename = f.file.filename
         else:
             self.filename = filename
         if isinstance(filename, string_types):
             f.file.close()
+        if appendable:
+            self._flushed = time.time()
+
+        return self
 
+    def __write_metadata(self, f):
+        """Write the metadata, type hints and column headers into the h5py.Group *f*."""
+        metadata = f.require_group("metadata")
+        typehints = f.require_group("typehints")
+        for k in self.metadata:
+            try:
+                typehints.attrs[k] = self.metadata._typehints[k]
+                metadata.attrs[k] = self[k]
+            except TypeError:  # We get this for trying to store a bad data type - fallback to metadata export to string
+                parts = self.metadata.export(k).split("=")
+                metadata.attrs[k] = "=".join(parts[1:])
+        f.attrs["column_headers"] = [x.encode("utf8") for x in self.column_headers]
+        f.attrs["filename"] = self.filename
+        f.attrs["type"] = "HDF5File"
+
+    def __append_target(self):
+        """Find the file and group that :py:attr:`HDF5File.filename` refers to.
+
+        Returns:
+            (str, str): The real path of the HDF5 file and the name of the group in it that holds the data.
+        """
+        if not isinstance(self.filename, string_types):
+            raise IOError("Save the HDF5File with appendable=True before appending rows to it.")
+        filename, group = self.filename, []
+        while filename and not path.isfile(filename):  # Strip group names off the end until we find the file
+            filename, part = path.split(filename)
+            if not part:
+                break
+            group.insert(0, part)
+        if not path.isfile(filename):
+            raise IOError("Cannot find the HDF5 file for {} to append rows to.".format(self.filename))
+        return path.realpath(filename), "/" + "/".join(group)
+
+    def __append_dataset(self):
+        """Return the resizable data set that rows are appended to, opening the file for writing if necessary.
+
+        The writable file is kept as the shared handle for the file, so lazily read data comes from the same handle.
+        """
+        filename, group = self.__append_target()
+        handle = _handles.get(filename, None)
+        if handle is None or not handle.id.valid or handle.mode != "r+":
+            _close_shared(filename)
+            handle = h5py.File(filename, "r+")
+            _handles[filename] = handle
+        try:
+            dataset = handle[group]["data"]
+            if dataset.ndim == 2 and dataset.maxshape[0] is None:
+                return dataset
+            message = "{} was not saved with appendable=True, so rows can't be appended."
+        except KeyError:
+            message = "{} doesn't contain any data to append rows to."
+        _close_shared(filename)  # Don't leave the file open for writing
+        raise IOError(message.format(self.filename))
+
+    def append_rows(self, rows):
+        """Add rows of data to the end of the file that this object was saved to with *appendable=True*.
+
+        Args:
+            rows (array): A 1D array of one row or a 2D array of rows with the same number of columns as the data.
+
+        Returns:
+            A copy of the object, whose data now includes the new rows. These are read back from the file when
+            :py:attr:`HDF5File.data` is next used.
+
+        Notes:
+            The file is kept open for writing until :py:meth:`HDF5File.close` is called, or Python exits. The
+            metadata is written to the file if it has not been written for :py:attr:`flush_interval` seconds.
+        """
+        rows = _np_.ma.getdata(rows)
+        if _np_.ndim(rows) == 1:
+            rows = _np_.atleast_2d(rows)
+        dataset = self.__append_dataset()
+        if rows.ndim != 2 or rows.shape[1] != dataset.shape[1]:
+            raise ValueError(
+                "Rows to append must have {} columns, not shape {}".format(dataset.shape[1], _np_.shape(rows))
+            )
+        start = dataset.shape[0]
+        dataset.resize(start + rows.shape[0], axis=0)
+        dataset[start:] = rows
+        self._lazy = _LazyDataset(dataset)
+        if time.time() - self._flushed >= self.flush_interval:
+            self.flush()
+        return self
+
+    def flush(self):
+        """Write the metadata to the file that rows are being appended to and flush the file to disc.
+
+        Returns:
+            A copy of the object.
+        """
+        dataset = self.__append_dataset()
+        self.__write_metadata(dataset.parent)
+        dataset.file.flush()
+        self._flushed = time.time()
+        return self
+
+    def close(self):
+        """Flush and close the file that rows are being appended to, if it is open.
+
+        Returns:
+            A copy of the object.
+        """
+        try:
+            filename = self.__append_target()[0]
+        except IOError:
+            return self
+        handle = _handles.get(filename, None)
+        if handle is not None and handle.id.valid and handle.mode == "r+":
+            self.flush()
+            _close_shared(filename)
         return self
 
 
@@ -247,6 +624,11 @@ class HGXFile(DataFile):
     pattern = ["*.hgx"]
     mime_type = ["application/x-hdf"]
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the HDF5 signature block."""
+        return _probe_signature(header, cls._probe_size)
+
     def _load(self, filename, *args, **kargs):
         """GenX HDF file loader routine.
 
@@ -335,6 +717,32 @@ class HGXFile(DataFile):
             self.column_headers = [str(ix) for ix in self.column_headers]
 
 
+def _load_hdf5_member(name, filename=None, loader=None, lazy=False):
+    """Load a group of an HDF5 file with its own read-only handle, for :py:meth:`HDF5FolderMixin._prefetch_loader`.
+
+    Args:
+        name (str): The path of the group within the file.
+
+    Keyword Arguments:
+        filename (str): The name of the HDF5 file.
+        loader (type): The folder's loader class.
+        lazy (bool): Pass *lazy=True* to an :py:class:`HDF5File` loader.
+
+    Returns:
+        (metadataObject): The loaded group.
+    """
+    with h5py.File(filename, "r") as handle:
+        if name not in handle:
+            raise IOError("Cannot find {} in {}".format(name, filename))
+        grp = handle[name]
+        if lazy and issubclass(loader, HDF5File):
+            tmp = loader(grp, lazy=True)
+        else:
+            tmp = loader(grp)
+        tmp.filename = grp.name
+    return tmp
+
+
 class HDF5FolderMixin(object):
 
     """A mixin class for :py:class:`Stoner.Folders.DataFolder` that provides a method to load and save data from a single HDF5 file with groups.
@@ -343,8 +751,18 @@ class HDF5FolderMixin(object):
 
     Datalayout consistns of sub-groups that are either instances of HDF5Files (i.e. have a type attribute that contains 'HDF5File')
     or are themsleves HDF5Folder instances (with a type attribute that reads 'HDF5Folder').
+
+    Members are read through a single read-only file handle that is kept open and shared by the folder, its groups and
+    any copies of it. The handle is closed by :py:meth:`HDF5FolderMixin.close`, when the file is saved to and when
+    Python exits.
+
+    Keyword Arguments:
+        lazy (bool): If True, pass *lazy=True* to the :py:class:`HDF5File` loader so that uncompressed data is memory
+            mapped instead of being read in. Default is False.
     """
 
+    _defaults = {"lazy": False}
+
     def __init__(self, *args, **kargs):
         """Constructor for the HDF5Folder Class."""
         self.File = None
@@ -373,27 +791,40 @@ class HDF5FolderMixin(object):
         names = list(os.path.split(name))
         if names[0] == "/":  # Prune leading ./
             names = names[1:]
-        if self.File is None:
-            closeme = True
-            self.File = h5py.File(self.directory, "r+")
-        else:
-            closeme = False
-        grp = self.File
+        if (
+            self.File is not None
+            and self.File.id.valid
+            and path.realpath(self.File.filename) == path.realpath(self.directory)
+        ):
+            root = self.File
+        else:  # Use the shared handle, which may have been closed and reopened since this folder was created
+            root = _shared_file(self.directory)
+        grp = root
         while len(names) > 0:
             next_group = names.pop(0)
             if next_group not in grp:
-                raise IOError("Cannot find {} in {}".format(name, self.File.filename))
+                raise IOError("Cannot find {} in {}".format(name, root.filename))
             grp = grp[next_group]
-        tmp = self.loader(grp)
+        if self.lazy and issubclass(self.loader, HDF5File):
+            tmp = self.loader(grp, lazy=True)
+        else:
+            tmp = self.loader(grp)
         tmp.filename = grp.name
         tmp = self.on_load_process(tmp)
         tmp = self._update_from_object_attrs(tmp)
         self.__setter__(name, tmp)
-        if closeme:
-            self.File.close()
-            self.File = None
         return tmp
 
+    def _prefetch_loader(self):
+        """Return a picklable function that reads a group of the file for :py:meth:`iter_prefetch`.
+
+        The function opens the file itself rather than using the shared handle. None is returned if the folder has the
+        file open already, as it may be open for writing.
+        """
+        if type(self).__getter__ is not HDF5FolderMixin.__getter__ or (self.File is not None and self.File.id.valid):
+            return None
+        return partial(_load_hdf5_member, filename=path.realpath(self.directory), loader=self.loader, lazy=self.lazy)
+
     def _dialog(self, message="Select Folder", new_directory=True, mode="r+"):
         """Creates a file dialog box for working with
 
@@ -417,6 +848,7 @@ class HDF5FolderMixin(object):
         )
         if len(dlg) != 0:
             self.directory = dlg
+            _close_shared(self.directory)
             self.File = h5py.File(self.directory, mode)
             self.File.close()
             return self.directory
@@ -436,11 +868,14 @@ class HDF5FolderMixin(object):
 
     def close(self):
         """Close the cirrent hd5 file."""
+        shared = isinstance(self.directory, string_types) and path.realpath(self.directory) in _handles
         if isinstance(self.File, h5py.File):
             self.File.close()
             self.File = None
-        else:
+        elif not shared:
             raise IOError("HDF5 File not open!")
+        if shared:
+            _close_shared(self.directory)
 
     def getlist(self, recursive=None, directory=None, flatten=False):
         """Reads the HDF5 File to construct a list of file HDF5File objects"""
@@ -460,9 +895,8 @@ class HDF5FolderMixin(object):
         if isinstance(directory, string_types):
             try:
                 self.directory = directory
-                directory = h5py.File(directory, "r+")
-                self.File = directory
-                closeme = True
+                directory = _shared_file(directory)
+                closeme = False
             except OSError:
                 return super(HDF5FolderMixin, self).getlist(recursive, directory, flatten)
         elif isinstance(directory, h5py.File) or isinstance(directory, h5py.Group):  # Bug out here
@@ -491,6 +925,7 @@ class HDF5FolderMixin(object):
         if root is None and isinstance(self.File, h5py.File):
             root = self.File
         elif root is None and not isinstance(self.File, h5py.File):
+            _close_shared(self.directory)
             root = h5py.File(self.directory)
             self.File = root
             closeme = True
@@ -502,6 +937,7 @@ class HDF5FolderMixin(object):
             closeme = True
         if isinstance(root, string_types):
             mode = "r+" if path.exists(root) else "w"
+            _close_shared(root)
             root = h5py.File(root, mode)
             self.File = root
             closeme = True
@@ -545,6 +981,11 @@ class SLS_STXMFile(DataFile):
     patterns = ["*.hdf"]
     mime_type = ["application/x-hdf"]
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the HDF5 signature block."""
+        return _probe_signature(header, cls._probe_size)
+
     def _load(self, filename, *args, **kargs):
         """Loads data from a hdf5 file
 
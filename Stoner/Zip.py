@@ -12,6 +12,7 @@ import zipfile as zf
 import os.path as path
 from traceback import format_exc
 import fnmatch
+from functools import partial
 
 from .compat import string_types, bytes2str, str2bytes, get_filedialog, _pattern_type
 from .Core import DataFile, StonerLoadError
@@ -50,6 +51,23 @@ def test_is_zip(filename, member=""):
         return test_is_zip(newfile, newmember)
 
 
+def _load_zip_member(name, archive=None, typ=None):
+    """Load a member of a zip file with its own read-only handle, for :py:meth:`ZipFolderMixin._prefetch_loader`.
+
+    Args:
+        name (str): The name of the member within the zip file.
+
+    Keyword Arguments:
+        archive (str): The filename of the zip file.
+        typ (type): The folder's type to convert the :py:class:`ZippedFile` to.
+
+    Returns:
+        (metadataObject): The loaded member.
+    """
+    with zf.ZipFile(archive, "r") as handle:
+        return typ(ZippedFile(handle, name))
+
+
 class ZippedFile(DataFile):
 
     """A sub class of DataFile that sores itself in a zip file.
@@ -113,6 +131,13 @@ class ZippedFile(DataFile):
         self.filename = path.join(archive.filename, member)
         return self
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for a zip local file header - self-extracting archives may have other data first, so keep them."""
+        if header[:4] in [b"PK\x03\x04", b"PK\x05\x06"]:
+            return True
+        return None
+
     def _load(self, filename=None, *args, **kargs):
         "Load a file from the zip file, openining it as necessary"
         if filename is None or not filename:
@@ -414,6 +439,24 @@ class ZipFolderMixin(object):
         else:
             return name
 
+    def _prefetch_loader(self):
+        """Return a picklable function that loads a member of the zip file for :py:meth:`iter_prefetch`.
+
+        The function opens the zip file itself, so that the folder's own handle is only used by the calling thread.
+        """
+        if type(self).__getter__ is not ZipFolderMixin.__getter__:
+            return None
+        archive = getattr(self.File, "filename", None) or test_is_zip(self.directory)
+        if not archive:
+            return None
+        if not isinstance(archive, string_types):
+            archive = archive[0]
+        return partial(_load_zip_member, archive=archive, typ=self.type)
+
+    def _store_prefetched(self, name, tmp):
+        """Return a member loaded by :py:meth:`iter_prefetch` - like the __getter__, the member is not kept."""
+        return tmp
+
     def __lookup__(self, name):
         """Look for a given name in the ZipFolder namelist.
 
@@ -1,4 +1,4 @@
 """Provides additional functionality for doing curve fitting to data."""
-__all__ = ["odr_Model", "FittingMixin", "models"]
-from .mixins import odr_Model, FittingMixin
+__all__ = ["odr_Model", "FittingMixin", "models", "prep_lmfit_model", "prep_lmfit_p0", "lmfit_jacobian"]
+from .mixins import odr_Model, FittingMixin, prep_lmfit_model, prep_lmfit_p0, lmfit_jacobian
 from . import models
@@ -5,9 +5,13 @@ Created on Sun Mar  3 16:44:56 2019
 
 @author: phygbu
 """
-__all__ = ["odr_Model", "FittingMixin"]
+__all__ = ["odr_Model", "FittingMixin", "prep_lmfit_model", "prep_lmfit_p0", "lmfit_jacobian"]
 from inspect import isclass
 from collections import Mapping, OrderedDict
+from functools import partial
+from multiprocessing import Pool, cpu_count
+from multiprocessing.pool import ThreadPool
+from warnings import warn
 import numpy as _np_
 import numpy.ma as ma
 from distutils.version import LooseVersion
@@ -63,6 +67,9 @@ class odr_Model(odrModel):
             self.model = model
             self.func = model.func
             model = lambda beta, x, **kargs: self.model.func(x, *beta, **kargs)
+            if getattr(self.model, "jacobian", None) is not None:  # odr needs both fjacb and fjacd to use either
+                kargs.setdefault("fjacb", partial(_odr_fjacb, self.model.jacobian))
+                kargs.setdefault("fjacd", partial(_odr_fjacd, self.model.func))
             meta["param_names"] = self.model.param_names
             meta["param_hints"] = self.model.param_hints
             meta["name"] = self.model.__class__.__name__
@@ -98,7 +105,7 @@ class odr_Model(odrModel):
             )
         if not isinstance(p0, lmfit.Parameters):  # This can happen if we are creating an odr_Model in advance.
             tmp_model = _attribute_store(meta)
-            p0 = _prep_lmfit_p0(tmp_model, None, None, p0, kargs)[0]
+            p0 = prep_lmfit_p0(tmp_model, None, None, p0, kargs)[0]
         p_new = list()
         meta["params"] = copy(p0)
         for p in p0.values():
@@ -167,20 +174,117 @@ class MimizerAdaptor(object):
             upper.append(u if not _np_.isinf(u) else max(limits))
             lower.append(l if not _np_.isinf(l) else min(limits))
         self.p0 = p0
-        self.bounds = [ix for ix in zip(upper, lower)]
+        self.bounds = [ix for ix in zip(lower, upper)]
+        self.vectorized = None  # Whether model.func broadcasts over a population - unknown until tried
+
+    @staticmethod
+    def _weights(x, sigma):
+        """Return the least-squares weights from the uncertainties sigma."""
+        if sigma is None:
+            sigma = _np_.ones_like(x)
+        sigma = sigma / sigma.sum()  # normalise uncertainties
+        sigma += _np_.finfo(float).eps
+        return 1.0 / sigma ** 2
+
+    def minimize_func(self, beta, x, y, sigma, *args):
+        """Function that calculates a least-squares goodness from the model functiuon."""
+        beta = tuple(beta) + tuple(args)
+        variance = ((y - self.func(x, *beta)) ** 2) * self._weights(x, sigma)
+        return _np_.sum(variance) / (len(x) - len(beta))
+
+    def population_func(self, population, x, y, sigma, *args):
+        """Calculate the least-squares goodness of a whole population of parameter vectors in one call.
+
+        Args:
+            population (2D array):
+                The parameter vectors as columns, i.e. of shape (number of parameters, S).
+
+        Returns:
+            (1D array):
+                The goodness of fit of each of the S parameter vectors.
+
+        The model function is called once with each parameter as an (S,1) column, which numpy broadcasts against x to
+        give one row of model values for each vector. The first time this is done the result is checked against an
+        evaluation for a single vector; model functions that don't broadcast like this are evaluated one vector at a
+        time instead.
+        """
+        population = _np_.reshape(population, (len(self.p0), -1))
+        weights = self._weights(x, sigma)
+        fit = None
+        if self.vectorized is not False:
+            try:
+                with _np_.errstate(all="ignore"):
+                    fit = _np_.asarray(self.func(x, *(tuple(population[:, :, None]) + tuple(args))))
+                if fit.shape != (population.shape[1], len(x)):
+                    fit = None
+                elif self.vectorized is None:
+                    single = self.func(x, *(tuple(population[:, 0]) + tuple(args)))
+                    self.vectorized = _np_.allclose(fit[0], single, equal_nan=True)
+            except Exception:  # pylint: disable=broad-except
+                fit = None
+            if fit is None:
+                self.vectorized = False
+        if not self.vectorized:
+            fit = _np_.array([self.func(x, *(tuple(beta) + tuple(args))) for beta in population.T])
+        variance = ((y - fit) ** 2) * weights
+        return _np_.sum(variance, axis=1) / (len(x) - len(self.p0) - len(args))
+
+
+def _curve_fit_jac(jacobian, x, *beta):
+    """Return a model's analytic jacobian in the (points, parameters) layout used by curve_fit."""
+    return _np_.atleast_2d(jacobian(x, *beta)).T
+
+
+def _odr_fjacb(jacobian, beta, x, **_):
+    """Return a model's analytic jacobian with the odr fjacb(beta, x) signature."""
+    return _np_.atleast_2d(jacobian(x, *beta))
+
+
+def _odr_fjacd(func, beta, x, **_):
+    """Return the derivative of func with respect to x by central differences for odr's fjacd."""
+    x = _np_.asarray(x, dtype=float)
+    h = _np_.sqrt(_np_.finfo(float).eps) * _np_.maximum(_np_.abs(x), 1.0)
+    if x.ndim == 1:
+        return (func(x + h, *beta) - func(x - h, *beta)) / (2 * h)
+    ret = _np_.zeros(x.shape)
+    for i in range(x.shape[0]):  # One row for each independent variable
+        step = _np_.zeros(x.shape)
+        step[i] = h[i]
+        ret[i] = (func(x + step, *beta) - func(x - step, *beta)) / (2 * h[i])
+    return ret
+
+
+def _lmfit_dfun(model, params, data, weights, **kargs):  # pylint: disable=unused-argument
+    """Dfun for lmfit's leastsq - the model's analytic jacobian of the residuals, one row per varying parameter."""
+    values = [params[name].value for name in model.param_names]
+    jac = _np_.atleast_2d(model.jacobian(kargs[model.independent_vars[0]], *values))
+    jac = jac[[model.param_names.index(name) for name, p in params.items() if p.vary]]
+    return jac if weights is None else jac * weights
+
+
+def lmfit_jacobian(model, params, kargs):
+    """Pass the model's analytic jacobian to lmfit's leastsq in *kargs* where it can be used.
+
+    Args:
+        model (lmfit.Model instance): The model being fitted.
+        params (lmfit.Parameters): The parameters that the fit will start from.
+        kargs (dict): The keyword arguments for the model's fit method, updated in place.
+
+    The jacobian is not used for other fitting methods, if a Dfun was already given, or if any parameter is an
+    expression or is not one of the model's own parameters.
+    """
+    if getattr(model, "jacobian", None) is None or kargs.get("method", "leastsq") != "leastsq":
+        return
+    fit_kws = dict(kargs.get("fit_kws", None) or {})
+    if "Dfun" in fit_kws or any(p.expr or name not in model.param_names for name, p in params.items()):
+        return
+    fit_kws.update(Dfun=partial(_lmfit_dfun, model), col_deriv=True)
+    kargs["fit_kws"] = fit_kws
 
-        def wrapper(beta, x, y, sigma, *args):
-            """Function that calculates a least-squares goodness from the model functiuon."""
-            beta = tuple(beta) + tuple(args)
-            if sigma is None:
-                sigma = _np_.ones_like(x)
-            sigma = sigma / sigma.sum()  # normalise uncertainties
-            sigma += _np_.finfo(float).eps
-            weights = 1.0 / sigma ** 2
-            variance = ((y - self.func(x, *beta)) ** 2) * weights
-            return _np_.sum(variance) / (len(x) - len(beta))
 
-        self.minimize_func = wrapper
+def _population_map(func, data, _, members):
+    """A map-like callable for differential_evolution's *workers* that evaluates the population in one call to func."""
+    return func(_np_.array(list(members)).T, *data)
 
 
 class _curve_fit_result(object):
@@ -371,16 +475,15 @@ def _curve_fit_p0_list(p0, model):
         return [float(x) for x in p0]
 
 
-def _prep_lmfit_model(model, kargs):
+def prep_lmfit_model(model, kargs):
     """Prepare an lmfit model instance.
 
     Arguments:
         model (lmfit Model class or instance, or callable): the model to be fitted to the data.
-        p0 (iterable or floats): The initial values of the fitting parameters.
         kargs (dict):Other keyword arguments passed to the fitting function
 
     Returns:
-        model,p0, prefix (lmfit.Model instance, iterable, str)
+        model, prefix (lmfit.Model instance, str)
 
     Converts the model parameter into an instance of lmfit.Model - either by instantiating the class or wrapping a
     callable into an lmfit.Model class and establishes a prefix string from the model if not provided in the keyword arguments.
@@ -404,7 +507,7 @@ def _prep_lmfit_model(model, kargs):
     return model, prefix
 
 
-def _prep_lmfit_p0(model, ydata, xdata, p0, kargs):
+def prep_lmfit_p0(model, ydata, xdata, p0, kargs):
     """Prepare the initial start vector for an lmfit.
 
     Arguments:
@@ -461,6 +564,64 @@ def _prep_lmfit_p0(model, ydata, xdata, p0, kargs):
     return p0, single_fit
 
 
+def _fit_pool(executor, workers=None, initializer=None, initargs=()):
+    """Start a pool of workers to run many fits.
+
+    Args:
+        executor (None, "process" or "thread"):
+            The kind of pool to start - None for no pool.
+
+    Keyword Arguments:
+        workers (int or None):
+            Number of workers, defaults to half the CPUs for processes and all but one CPU for threads.
+        initializer (callable or None):
+            Called with *initargs* in each worker process when it starts.
+        initargs (tuple):
+            Arguments for *initializer*.
+
+    Returns:
+        (Pool or None):
+            The pool, which the caller should terminate and join when it has finished.
+    """
+    if executor == "process":
+        return Pool(workers or max(cpu_count() // 2, 1), initializer=initializer, initargs=initargs)
+    if executor == "thread":
+        return ThreadPool(workers or max(cpu_count() - 1, 1))
+    if executor is None:
+        return None
+    raise ValueError("executor should be None, 'process' or 'thread' not {}".format(executor))
+
+
+_lmfit_chi2_setup = None  # The fit being mapped by a worker process, set by _lmfit_chi2_init
+
+
+def _lmfit_chi2_init(*setup):
+    """Store the fit set-up in a worker process so that it is only sent to the worker once."""
+    global _lmfit_chi2_setup
+    _lmfit_chi2_setup = setup
+
+
+def _lmfit_chi2_chunk(rows, setup=None):
+    r"""Fit a chunk of the rows of a :math:`\chi^2` map for :py:meth:`FittingMixin.lmfit`.
+
+    Args:
+        rows (list):
+            (row number, lmfit.Parameters) pairs to fit.
+
+    Keyword Arguments:
+        setup (tuple or None):
+            The object being fitted, the model, the data to fit, the prefix, the column assignments and the
+            scale_covar flag. Defaults to the set-up stored by :py:func:`_lmfit_chi2_init` in a worker process.
+
+    Returns:
+        (list):
+            (row number, row of fitted parameters and :math:`\chi^2`) for each row in the chunk.
+    """
+    fitter, model, data, prefix, columns, scale_covar = setup if setup is not None else _lmfit_chi2_setup
+    fit_one = getattr(fitter, "_FittingMixin__lmfit_one")
+    return [(i, fit_one(model, data, params, prefix, columns, scale_covar, output="row")) for i, params in rows]
+
+
 class FittingMixin(object):
 
     """A mixin calss designed to work with :py:class:`Stoner.Core.DataFile` to provide additional curve_fiotting methods."""
@@ -712,6 +873,7 @@ class FittingMixin(object):
         residuals = kargs.pop("residuals", False)
         output = kargs.pop("output", "row")
         kargs[model.independent_vars[0]] = data[0]
+        lmfit_jacobian(model, params, kargs)
         fit = model.fit(data[1], params, scale_covar=scale_covar, weights=1.0 / data[2], **kargs)
         if fit.success:
             row = self._record_curve_fit_result(
@@ -887,6 +1049,8 @@ class FittingMixin(object):
         output = kargs.pop("output", "row" if asrow else "fit")
 
         fit = _sp_.odr.ODR(data, model, beta0=model.estimate)
+        if model.fjacb is not None and model.fjacd is not None:
+            fit.set_job(deriv=3)  # Use the supplied jacobians without checking them
         try:
             fit_result = fit.run()
             fit_result.redchi = fit_result.sum_square / (len(fit_result.y) - len(fit_result.beta))
@@ -1013,6 +1177,11 @@ class FittingMixin(object):
             and return a list of parameter values that is in the same order as the model function. If p0 is not given and a :py:class:`lmfit.Model` or
             :py:class:`scipy.odr.Model` is supplied as the model function, then the model's estimates of the starting values will be used instead.
 
+            If an :py:class:`lmfit.Model` has a ``jacobian(x, *params)`` method returning the derivatives of the model
+            with respect to each parameter as an array of shape (number of parameters, len(x)), it is passed to
+            curve_fit as *jac* unless a *jac* keyword is given. Many of the models in
+            :py:mod:`Stoner.analysis.fitting.models` provide one.
+
 
         See Also:
             *   :py:meth:`Stoner.Data.lmfit`
@@ -1057,6 +1226,8 @@ class FittingMixin(object):
             p0 = kargs.pop("p0", func.estimate)
         elif isinstance(func, Model):
             _func = func.func
+            if getattr(func, "jacobian", None) is not None:
+                kargs.setdefault("jac", partial(_curve_fit_jac, func.jacobian))
             try:
                 if "p0" not in kargs:  # Avoid expensive guess if we have a p0
                     pguess = func.guess
@@ -1176,6 +1347,13 @@ class FittingMixin(object):
                 whether to automatically scale covariance matrix (leastsq only)
             output (str, default "fit"):
                 Specifiy what to return.
+            vectorized (bool):
+                If True, evaluate each generation of the population with a single call to the model function (see
+                :py:meth:`MimizerAdaptor.population_func`). This uses scipy's *vectorized* option where available and
+                otherwise a map-like *workers* callable, and always implies ``updating="deferred"``. Default False.
+            workers (int or map-like callable):
+                Passed to :py:func:`scipy.optimize.differential_evolution` to evaluate the population in parallel.
+                Cannot be combined with *vectorized*.
 
         Returns:
             ( various ) :
@@ -1213,26 +1391,41 @@ class FittingMixin(object):
         # Support both asrow and output, the latter wins if both supplied
         asrow = kargs.pop("asrow", False)
         output = kargs.pop("output", "row" if asrow else "fit")
+        vectorized = kargs.pop("vectorized", False)
 
         data, scale_covar, _ = self._assemnle_data_to_fit(xcol, ycol, sigma, bounds, scale_covar)
         data = data[0:3]
-        model, prefix = _prep_lmfit_model(model, kargs)
-        p0, single_fit = _prep_lmfit_p0(model, data[1], data[0], p0, kargs)
+        model, prefix = prep_lmfit_model(model, kargs)
+        p0, single_fit = prep_lmfit_p0(model, data[1], data[0], p0, kargs)
 
         for k in model.param_names:
             kargs.pop(k, None)
+        # Keep differential_evolution's own options away from the curve_fit polishing step
+        de_args = getfullargspec(differential_evolution).args  # pylint: disable=W1505
+        de_kargs = {k: kargs.pop(k) for k in list(kargs) if k in de_args}
 
         diff_model = MimizerAdaptor(model, params=p0)
 
-        kargs["polish"] = kargs.get("polish", True)
+        de_kargs["polish"] = de_kargs.get("polish", True)
 
         if not single_fit:
             raise NotImplementedError("Sorry chi^2 mapping not implemented for differential evolution yet.")
-        fit = differential_evolution(diff_model.minimize_func, diff_model.bounds, data, **kargs)
+        func = diff_model.minimize_func
+        if vectorized:
+            if "workers" in de_kargs:
+                raise ValueError("Cannot use both vectorized and workers with differential_evolution.")
+            if "vectorized" in de_args:
+                func = diff_model.population_func
+                de_kargs["vectorized"] = True
+            else:  # Older scipy - hand the whole population to a map-like workers instead
+                de_kargs["workers"] = partial(_population_map, diff_model.population_func, data)
+            de_kargs["updating"] = "deferred"
+        fit = differential_evolution(func, diff_model.bounds, data, **kargs, **de_kargs)
         if not fit.success:
             raise RuntimeError(fit.message)
-        kargs.pop("polish", None)
         kargs["full_output"] = True
+        if getattr(model, "jacobian", None) is not None:
+            kargs.setdefault("jac", partial(_curve_fit_jac, model.jacobian))
         polish = _curve_fit_result(
             *curve_fit(model.func, data[0], data[1], sigma=data[2], p0=fit.x, absolute_sigma=not scale_covar, **kargs)
         )
@@ -1306,6 +1499,15 @@ class FittingMixin(object):
                 whether to automatically scale covariance matrix (leastsq only)
             output (str, default "fit"):
                 Specifiy what to return.
+            executor (None, "process" or "thread"):
+                In :math:`\chi^2` mode, fit the rows of *p0* one after another (None, the default), in a pool of
+                processes or in a pool of threads (only useful if the model releases the GIL).
+            workers (int or None):
+                The number of processes or threads to use, defaults to half or all but one of the CPUs respectively.
+            chunksize (int):
+                In :math:`\chi^2` mode, the number of rows of *p0* sent to a worker at once (default 16).
+            progress (callable or None):
+                In :math:`\chi^2` mode, called as progress(done, total) each time a chunk of fits is finished.
 
         Returns:
             ( various ) :
@@ -1328,6 +1530,16 @@ class FittingMixin(object):
            values of the parameters. In this mode the return value is a 2D array whose rows correspond to the inputs to the rows of p0, the
            columns are the fitted values of the parameters with an additional column for :math:`\chi^2`.
 
+           The rows are written into the returned array or :py:class:`Stoner.Data` as each fit finishes. If the mapping
+           is interrupted with Ctrl-C, the rows done so far are returned, the others being nan. With an *executor*,
+           the metadata records the fit of the first row of *p0* rather than the last.
+
+        .. note::
+
+           If the model has a *jacobian* method (see :py:meth:`Stoner.Data.curve_fit`) and is fitted with the default
+           leastsq method, it is passed to lmfit as the *Dfun* fit keyword unless one is already given in *fit_kws* or
+           any parameter is constrained by an expression.
+
         Example:
             .. plot:: samples/lmfit_simple.py
                 :include-source:
@@ -1345,9 +1557,14 @@ class FittingMixin(object):
         asrow = kargs.pop("asrow", False)
         output = kargs.pop("output", "row" if asrow else "fit")
 
+        executor = kargs.pop("executor", None)
+        workers = kargs.pop("workers", None)
+        chunksize = kargs.pop("chunksize", 16)
+        progress = kargs.pop("progress", None)
+
         data, scale_covar, _ = self._assemnle_data_to_fit(xcol, ycol, sigma, bounds, scale_covar)
-        model, prefix = _prep_lmfit_model(model, kargs)
-        p0, single_fit = _prep_lmfit_p0(model, data[1], data[0], p0, kargs)
+        model, prefix = prep_lmfit_model(model, kargs)
+        p0, single_fit = prep_lmfit_p0(model, data[1], data[0], p0, kargs)
 
         if single_fit:
             ret_val = self.__lmfit_one(
@@ -1365,15 +1582,14 @@ class FittingMixin(object):
             )
         else:  # chi^2 mode
             pn = p0
-            ret_val = _np_.zeros((pn.shape[0], pn.shape[1] * 2 + 1))
-            for i, pn_i in enumerate(pn):  # iterate over every row in the supplied p0 values
-                p0, single_fit = _prep_lmfit_p0(
-                    model, data[1], data[0], pn_i, kargs
-                )  # model, data, params, prefix, columns, scale_covar,**kargs)
-                ret_val[i, :] = self.__lmfit_one(model, data, p0, prefix, _, scale_covar, output="row")
+            rows = [prep_lmfit_p0(model, data[1], data[0], pn_i, kargs)[0] for pn_i in pn]
+            ret_val = _np_.full((pn.shape[0], pn.shape[1] * 2 + 1), _np_.nan)
+            # The first fit is done here to record the metadata needed to label the output
+            ret_val[0, :] = self.__lmfit_one(model, data, rows[0], prefix, _, scale_covar, output="row")
             if output == "data":  # Create a data object and seet column headers etc correctly
                 ret = self.clone
                 ret.data = ret_val
+                ret_val = ret
                 ret.column_headers = []
                 ret.setas = ""
                 prefix = ret["lmfit.prefix"][-1]
@@ -1403,7 +1619,29 @@ class FittingMixin(object):
                 ret.setas[plots] = "y"
                 ret.setas[errors] = "e"
                 ret.setas[fixed] = "x"
-                ret_val = ret
+            target = ret_val.data if output == "data" else ret_val
+            setup = (self, model, data, prefix, _, scale_covar)
+            pool = _fit_pool(executor, workers, _lmfit_chi2_init, setup)
+            # Worker processes get the set-up from _lmfit_chi2_init, otherwise pass it with each chunk
+            fit_chunk = _lmfit_chi2_chunk if executor == "process" else partial(_lmfit_chi2_chunk, setup=setup)
+            chunks = (
+                [(i, rows[i]) for i in range(start, min(start + chunksize, len(rows)))]
+                for start in range(1, len(rows), chunksize)
+            )
+            done = 1
+            try:
+                for chunk in (pool.imap_unordered if pool is not None else map)(fit_chunk, chunks):
+                    for i, row in chunk:  # Stream the results into the output as they arrive
+                        target[i, :] = row
+                    done += len(chunk)
+                    if progress is not None:
+                        progress(done, len(rows))
+            except KeyboardInterrupt:
+                warn("chi^2 mapping interrupted after {} of {} fits.".format(done, len(rows)))
+            finally:
+                if pool is not None:
+                    pool.terminate()
+                    pool.join()
 
         return ret_val
 
@@ -1462,6 +1700,9 @@ class FittingMixin(object):
             This function ois designed to be as compatible as possible with :py:meth:`AnalysisMixin.curve_fit` and
                 :py:meth:`AnalysisMixin.lmfit` to facilitate easy of switching between them.
 
+            If an lmfit model has a *jacobian* method (see :py:meth:`AnalysisMixin.curve_fit`) it is used for odr's
+            *fjacb*, with the derivatives with respect to x (*fjacd*) taken by central differences.
+
         See Also:
             -   :py:meth:`AnalysisMixin.curve_fit`
             -   :py:meth:`AnalysisMixin.lmfit`
@@ -1482,8 +1723,8 @@ class FittingMixin(object):
         bounds = kargs.pop("boinds", lambda x, r: True)
         p0 = kargs.pop("p0", None)
         data, scale_covar, _ = self._assemnle_data_to_fit(xcol, ycol, sigma, bounds, scale_covar, sigma_x=sigma_x)
-        model, prefix = _prep_lmfit_model(model, kargs)
-        p0, single_fit = _prep_lmfit_p0(model, data[1], data[0], p0, kargs)
+        model, prefix = prep_lmfit_model(model, kargs)
+        p0, single_fit = prep_lmfit_p0(model, data[1], data[0], p0, kargs)
         kargs["p0"] = p0
         model = odr_Model(model, p0=p0)
         if not absolute_sigma:
@@ -6,9 +6,16 @@
 
 __all__ = ["BlochGrueneisen", "FluchsSondheimer", "WLfit", "blochGrueneisen", "fluchsSondheimer", "wlfit"]
 
+import os
+import os.path as path
+
 import numpy as np
 from scipy.integrate import quad
-from scipy.special import digamma
+from scipy.interpolate import CubicSpline, RectBivariateSpline
+from scipy.special import digamma, zeta
+
+from ....core.cache import cache_dir
+from ....tools import get_option
 
 try:
     from lmfit import Model
@@ -23,6 +30,160 @@ def _bgintegrand(x, n):
     return x ** n / ((np.exp(x) - 1) * (1 - np.exp(-x)))
 
 
+def _fskernel(x, k):
+    """The integrand for the Fluchs-Sondheimer model."""
+    return (x - x ** 3) / np.expm1(k * x)
+
+
+# The dimensionless integrals of the Bloch-Grueneisen and Fluchs-Sondheimer models are interpolated from tables that
+# are built the first time they are needed and kept in memory, and in the load cache directory if the *load_cache*
+# option is set. The grids are chosen so that the interpolated values agree with quad to a relative accuracy better
+# than 1E-6 - outside of them the integrals are either given by their asymptotic series or, for Bloch-Grueneisen
+# exponents outside the table, found with quad.
+_table_version = 1
+_tables = {}
+_bg_n = np.linspace(1.25, 10.0, 176)  # Bloch-Grueneisen exponents n
+_bg_s = np.linspace(np.log(1e-3), np.log(60.0), 541)  # ln(thetaD/T) - the integral has converged by thetaD/T=60
+_bg_series = (1.0, -1.0 / 12, 1.0 / 240)  # Coefficients of x^2exp(x)/(exp(x)-1)^2 = 1-x^2/12+x^4/240-...
+_fs_s = np.linspace(np.log(1e-3), np.log(40.0), 321)  # ln(t/l) - above t/l=40 the asymptotic series is exact
+
+
+def _bg_build(n, s):
+    """Tabulate ln((n-1)I_n(u))-(n-1)ln(u) for the Bloch-Grueneisen integral I_n(u) on a grid of n and ln(u).
+
+    The integral is accumulated with 8 point Gauss-Legendre quadrature over each interval of the ln(u) grid, starting
+    from its series expansion at the smallest u. Dividing by the small-u limit u^(n-1)/(n-1) leaves a smooth function of
+    n and ln(u) that a bicubic spline interpolates accurately.
+    """
+    nodes, weights = np.polynomial.legendre.leggauss(8)
+    step = np.diff(s)[:, None]
+    x = np.exp(s[:-1, None] + (nodes + 1) * step / 2)
+    n = n[:, None]
+    intervals = np.sum(_bgintegrand(x, n[..., None]) * x * weights * step / 2, axis=-1)
+    start = sum(c * np.exp((n + 2 * i - 1) * s[0]) / (n + 2 * i - 1) for i, c in enumerate(_bg_series))
+    integral = np.concatenate([start, start + np.cumsum(intervals, axis=1)], axis=1)
+    return np.log((n - 1) * integral) - (n - 1) * s
+
+
+def _fs_build(s):
+    """Tabulate ln(kF(k)) for the Fluchs-Sondheimer integral F(k) on a grid of ln(k)."""
+    k = np.exp(s)
+    return np.log(k * np.array([quad(_fskernel, 0, 1, (v,), epsabs=0, epsrel=1e-12)[0] for v in k]))
+
+
+def _integral_table(name, builder, *grid):
+    """Return a tabulated integral, loading it from the cache directory or building and saving it if necessary.
+
+    Args:
+        name (str): Name of the table.
+        builder (callable): Function that builds the table from the grid.
+        *grid (arrays): The points at which the table is built.
+
+    Returns:
+        (ndarray): The tabulated values.
+
+    Notes:
+        The cache directory is only used if the *load_cache* option is set, otherwise the table is always built.
+    """
+    if not get_option("load_cache"):
+        return builder(*grid)
+    filename = None
+    try:
+        filename = path.join(cache_dir(), "{}_integral_v{}.npz".format(name, _table_version))
+        with np.load(filename) as stored:
+            if len(grid) == len(stored.files) - 1 and all(
+                np.array_equal(stored["grid{}".format(i)], g) for i, g in enumerate(grid)
+            ):
+                return stored["values"]
+    except (OSError, IOError, KeyError, ValueError):
+        pass
+    values = builder(*grid)
+    if filename is not None:
+        try:
+            np.savez(filename + ".tmp.npz", values=values, **{"grid{}".format(i): g for i, g in enumerate(grid)})
+            os.replace(filename + ".tmp.npz", filename)
+        except (OSError, IOError):
+            pass
+    return values
+
+
+def _bg_spline():
+    """Return the bicubic spline of the tabulated Bloch-Grueneisen integral."""
+    if "bg" not in _tables:
+        _tables["bg"] = RectBivariateSpline(_bg_n, _bg_s, _integral_table("blochgrueneisen", _bg_build, _bg_n, _bg_s))
+    return _tables["bg"]
+
+
+def _fs_spline():
+    """Return the cubic spline of the tabulated Fluchs-Sondheimer integral."""
+    if "fs" not in _tables:
+        _tables["fs"] = CubicSpline(_fs_s, _integral_table("fluchssondheimer", _fs_build, _fs_s))
+    return _tables["fs"]
+
+
+def _bg_integral(u, n, deriv=False):
+    """Evaluate the Bloch-Grueneisen integral I_n(u), the integral of x^n/((exp(x)-1)(1-exp(-x))) from 0 to u.
+
+    Args:
+        u (array): Upper limits of the integral (thetaD/T).
+        n (array): Exponents, broadcast against *u*.
+
+    Keyword Arguments:
+        deriv (bool): Also return the derivative of the integral with respect to n.
+
+    Returns:
+        (array or (array, array)): The integral and, if *deriv* is True, its derivative with respect to n.
+    """
+    u, n = np.broadcast_arrays(np.asarray(u, dtype=float), np.asarray(n, dtype=float))
+    intg = np.zeros(u.shape)
+    d_n = np.zeros(u.shape)
+    table = (n >= _bg_n[0]) & (n <= _bg_n[-1]) & (u > 0)
+    series = table & (u < np.exp(_bg_s[0]))
+    table &= ~series
+    if table.any():
+        spline = _bg_spline()
+        nt = n[table]
+        s = np.minimum(np.log(u[table]), _bg_s[-1])
+        intg[table] = np.exp(spline.ev(nt, s) + (nt - 1) * s) / (nt - 1)
+        if deriv:
+            d_n[table] = intg[table] * (spline.ev(nt, s, dx=1) + s - 1 / (nt - 1))
+    if series.any():
+        s = np.log(u[series])
+        for i, c in enumerate(_bg_series):
+            power = n[series] + 2 * i - 1
+            term = c * np.exp(power * s) / power
+            intg[series] += term
+            d_n[series] += term * (s - 1 / power)
+    for ix in zip(*np.nonzero(~(table | series))):
+        intg[ix] = quad(_bgintegrand, 0, u[ix], (n[ix],))[0]
+        if deriv:
+            d_n[ix] = quad(lambda x, n: _bgintegrand(x, n) * np.log(x), 0, u[ix], (n[ix],))[0]
+    if deriv:
+        return intg, d_n
+    return intg
+
+
+def _fs_integral(k):
+    """Evaluate the Fluchs-Sondheimer integral F(k), the integral of (x-x^3)/(exp(kx)-1) from 0 to 1.
+
+    Args:
+        k (array): Ratio of thickness to mean-free-path.
+
+    Returns:
+        (array): The integral. For negative k, F(k)=-1/4-F(-k).
+    """
+    k = np.asarray(k, dtype=float)
+    a = np.abs(k)
+    ret = np.full(k.shape, np.inf)
+    small = (a > 0) & (a < np.exp(_fs_s[0]))
+    large = a > np.exp(_fs_s[-1])
+    table = (a > 0) & ~small & ~large
+    ret[table] = np.exp(_fs_spline()(np.log(a[table]))) / a[table]
+    ret[small] = 2 / (3 * a[small]) - 1 / 8 + a[small] / 90 - a[small] ** 3 / 12600
+    ret[large] = zeta(2, 1) / a[large] ** 2 - 6 * zeta(4, 1) / a[large] ** 4
+    return np.where(k < 0, -0.25 - ret, ret)
+
+
 def wlfit(B, s0, DS, B1, B2):
     """
     Weak localisation
@@ -49,27 +210,28 @@ def wlfit(B, s0, DS, B1, B2):
 
     e = 1.6e-19  # C
     h = 6.62e-34  # Js
-    # Sets up conductivity fit array
-    cond = np.zeros(len(B))
-    if B2 == B1:
-        B2 = B1 * 1.00001  # prevent dividing by zero
+    B2 = np.where(B2 == B1, B1 * 1.00001, B2)  # prevent dividing by zero
 
-    # performs calculation for all parts
-    for tt, Bi in enumerate(B):
-        if Bi != 0:  # prevent dividing by zero
-            WLpt1 = digamma(0.5 + B2 / np.abs(Bi))
-            WLpt2 = digamma(0.5 + B1 / np.abs(Bi))
-        else:
-            WLpt1 = (digamma(0.5 + B2 / np.abs(B[tt - 1])) + digamma(0.5 + B2 / np.abs(B[tt + 1]))) / 2
-            WLpt2 = (digamma(0.5 + B1 / np.abs(B[tt - 1])) + digamma(0.5 + B1 / np.abs(B[tt + 1]))) / 2
+    B = np.atleast_1d(np.asarray(B, dtype=float))
+    absB = np.abs(B)
+    zero = absB == 0
 
-        WLpt3 = np.log(B2 / B1)
+    def terms(b):
+        """Difference of the digamma terms at field magnitudes b."""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return digamma(0.5 + B2 / b) - digamma(0.5 + B1 / b)
 
-        # Calculates fermi level smearing
-        cond[tt] = (e ** 2 / (h * np.pi)) * (WLpt1 - WLpt2 - WLpt3)
-    # cond = s0*cond / min(cond)
-    cond = s0 + DS * cond
-    return cond
+    # Evaluate the digamma terms only at non-zero fields, then fill each zero-field point with the mean of the terms
+    # at its neighbouring points (the first point's left neighbour wraps around to the last point).
+    WLpt = np.zeros(np.broadcast(B, B1, B2).shape)
+    WLpt[..., ~zero] = terms(absB[~zero])
+    if zero.any():
+        ix = np.nonzero(zero)[0]
+        WLpt[..., ix] = (terms(absB[ix - 1]) + terms(absB[(ix + 1) % B.size])) / 2
+
+    # Calculates fermi level smearing
+    cond = (e ** 2 / (h * np.pi)) * (WLpt - np.log(B2 / B1))
+    return s0 + DS * cond
 
 
 def fluchsSondheimer(t, l, p, sigma_0):
@@ -92,16 +254,10 @@ def fluchsSondheimer(t, l, p, sigma_0):
             :include-source:
             :outname: fluchssondheimer
         """
-    k = t / l
-
-    kernel = lambda x, k: (x - x ** 3) * np.exp(-k * x) / (1 - np.exp(-k * x))
-
-    result = np.zeros(k.shape)
-    for i, v in enumerate(k):
-        ret1 = 1 - (3 * (1 - p) / (8 * v)) + (3 * (1 - p) / (2 * v))
-        ret2 = quad(kernel, 0, 1, (v,))[0]
-        result[i] = ret1 * ret2
-    return result / sigma_0
+    k = np.asarray(t, dtype=float) / l
+    with np.errstate(divide="ignore"):
+        ret1 = 1 - (3 * (1 - p) / (8 * k)) + (3 * (1 - p) / (2 * k))
+    return ret1 * _fs_integral(k) / sigma_0
 
 
 def blochGrueneisen(T, thetaD, rho0, A, n):
@@ -122,11 +278,8 @@ def blochGrueneisen(T, thetaD, rho0, A, n):
             :include-source:
             :outname: blochgruneisen
     """
-    ret = np.zeros(T.shape)
-    for i, t in enumerate(T):
-        intg = quad(_bgintegrand, 0, thetaD / (t), (n,))[0]
-        ret[i] = rho0 + A * (t / thetaD) ** n * intg
-    return ret
+    T = np.asarray(T, dtype=float)
+    return rho0 + A * (T / thetaD) ** n * _bg_integral(thetaD / T, n)
 
 
 class WLfit(Model):
@@ -237,3 +390,18 @@ class BlochGrueneisen(Model):
         """Guess some starting values - not very clever"""
         pars = self.make_params(thetaD=900, rho0=0.01, A=0.2, n=5.0)
         return update_param_vals(pars, self.prefix, **kwargs)
+
+    def jacobian(self, T, thetaD, rho0, A, n):  # pylint: disable=unused-argument
+        """Return the derivatives of the model with respect to thetaD, rho0, A and n."""
+        T = np.asarray(T, dtype=float)
+        u = thetaD / T
+        intg, intg_n = _bg_integral(u, n, deriv=True)
+        scale = (T / thetaD) ** n
+        return np.array(
+            [
+                A * scale * (_bgintegrand(u, n) / T - n * intg / thetaD),
+                np.ones_like(u),
+                scale * intg,
+                A * scale * (intg_n - np.log(u) * intg),
+            ]
+        )
@@ -19,6 +19,7 @@ __all__ = [
 ]
 
 import numpy as np
+from scipy.special import xlogy
 
 try:
     from lmfit import Model
@@ -124,7 +125,9 @@ class Linear(_Linear):
 
     """Simple linear fit"""
 
-    pass
+    def jacobian(self, x, slope, intercept):  # pylint: disable=unused-argument
+        """Return the derivatives of the model with respect to slope and intercept."""
+        return np.array([x, np.ones_like(x)])
 
 
 class Quadratic(_Quadratic):
@@ -148,7 +151,9 @@ class Quadratic(_Quadratic):
             :outname: quadratic-class
     """
 
-    pass
+    def jacobian(self, x, a, b, c):  # pylint: disable=unused-argument
+        """Return the derivatives of the model with respect to a, b and c."""
+        return np.array([x ** 2, x, np.ones_like(x)])
 
 
 class PowerLaw(_PowerLaw):
@@ -171,7 +176,10 @@ class PowerLaw(_PowerLaw):
             :outname: powerlaw-class
     """
 
-    pass
+    def jacobian(self, x, amplitude, exponent):
+        """Return the derivatives of the model with respect to the amplitude and exponent."""
+        xk = x ** exponent
+        return np.array([xk, amplitude * xlogy(xk, x)])
 
 
 class StretchedExp(Model):
@@ -212,6 +220,12 @@ class StretchedExp(Model):
         pars = self.make_params(A=A, beta=beta, x_0=x0)
         return update_param_vals(pars, self.prefix, **kwargs)
 
+    def jacobian(self, x, A, beta, x_0):
+        """Return the derivatives of the model with respect to A, beta and x_0."""
+        u = (x / x_0) ** beta
+        e = np.exp(-u)
+        return np.array([e, -A * e * xlogy(u, x / x_0), A * e * u * beta / x_0])
+
 
 class Lorentzian_diff(Model):
     r"""lmfit Model rerprenting the differential form of a Lorentzian Peak.
@@ -258,3 +272,11 @@ class Lorentzian_diff(Model):
         pars["mu"].min = np.min(x)
         pars["mu"].max = np.max(x)
         return update_param_vals(pars, self.prefix, **kwargs)
+
+    def jacobian(self, x, A, sigma, mu):
+        """Return the derivatives of the model with respect to A, sigma and mu."""
+        u = x - mu
+        D = sigma ** 2 + u ** 2
+        g = -2 * u / (np.pi * D ** 2)
+        dmu = 2 * A * sigma / (np.pi * D ** 2) * (1 - 4 * u ** 2 / D)
+        return np.array([sigma * g, A * g * (1 - 4 * sigma ** 2 / D), dmu])
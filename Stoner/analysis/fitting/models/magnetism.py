@@ -176,6 +176,14 @@ class Langevin(Model):
         pars = self.make_params(M_s=M_s, m=m, T=T)
         return update_param_vals(pars, self.prefix, **kwargs)
 
+    def jacobian(self, H, M_s, m, T):
+        """Return the derivatives of the model with respect to M_s, m and T."""
+        from scipy.constants import k, mu_0
+
+        x = mu_0 * H * m / (k * T)
+        dL = 1.0 / x ** 2 - 1.0 / np.sinh(x) ** 2  # Derivative of the Langevin function
+        return np.array([1.0 / np.tanh(x) - 1.0 / x, M_s * dL * x / m, -M_s * dL * x / T])
+
 
 class KittelEquation(Model):
 
@@ -221,6 +229,12 @@ class KittelEquation(Model):
         pars["H_k"].max = M_s.max()
         return update_param_vals(pars, self.prefix, **kwargs)
 
+    def jacobian(self, H, g, M_s, H_k):
+        """Return the derivatives of the model with respect to g, M_s and H_k."""
+        f = kittelEquation(H, g, M_s, H_k)
+        P = (H + H_k) * (H + H_k + M_s)
+        return np.array([f / g, f * (H + H_k) / (2 * P), f * (2 * (H + H_k) + M_s) / (2 * P)])
+
 
 class Inverse_Kittel(Model):
 
@@ -262,6 +276,13 @@ class Inverse_Kittel(Model):
         pars["H_k"].max = M_s.max()
         return update_param_vals(pars, self.prefix, **kwargs)
 
+    def jacobian(self, f, g, M_s, H_k):
+        """Return the derivatives of the model with respect to g, M_s and H_k."""
+        gamma = g * cnst.e / (2 * cnst.m_e)
+        S = np.sqrt(M_s ** 2 * gamma ** 2 * cnst.mu_0 ** 2 + 16 * np.pi ** 2 * f ** 2)
+        dg = (gamma / g) * (M_s ** 2 * cnst.mu_0 / (2 * S) - S / (2 * gamma ** 2 * cnst.mu_0))
+        return np.array([dg, -0.5 + M_s * gamma * cnst.mu_0 / (2 * S), -np.ones_like(f)])
+
 
 class FMR_Power(Model):
     r"""A combination of a Lorentzian and differential Lorenztion peak as measured in an FMR experiment.
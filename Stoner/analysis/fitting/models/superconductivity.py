@@ -10,7 +10,9 @@
 import numpy as np
 from scipy.special import jv
 from scipy.constants import physical_constants
+from scipy.fftpack import next_fast_len
 from functools import partial
+from collections import OrderedDict
 
 __all__ = [
     "RSJ_Noiseless",
@@ -34,38 +36,85 @@ except ImportError:
     Model = object
     update_param_vals = None
 
-try:  # numba is an optional dependency
-    from numba import jit, float64
-except ImportError:
-
-    def jit(func, *_):
-        """Null decorator function."""
-        return func
+class _StrijkersGrid(object):
 
-    class _dummy(object):
-        """A class that does nothing so that float64 can be an instance of it safely."""
+    """The energy mesh, interpolation weights and convolution kernels for evaluating the Strijkers model at given V.
 
-        def __call__(self, *args):
-            return self
+    Args:
+        V (array): bias voltages
 
-        def __getitem__(self, *args):
-            return self
+    The mesh is 20x denser than the data points and spans twice the largest bias. Gaussian broadening kernels are
+    stored in Fourier space for each value of omega that has been used, so repeated evaluations at the same V and
+    omega only need one forward and one inverse real FFT.
+    """
 
-    float64 = _dummy()
+    max_kernels = 16
+
+    def __init__(self, V):
+        """Build the energy mesh and linear interpolation weights for V."""
+        mv = np.max(np.abs(V))  # Limit for evaluating the integrals
+        self.E = np.linspace(-2 * mv, 2 * mv, V.size * 20)  # Energy range in meV
+        self.absE = np.abs(self.E)
+        self.E2 = self.E ** 2
+        self.size = self.E.size
+        self.fft_size = next_fast_len(2 * self.size - 1)
+        self.kernel_cache = OrderedDict()
+        # Linear interpolation back onto the V data points
+        self.high = np.searchsorted(self.E, V)
+        self.low = self.high - 1
+        El = self.E[self.low]
+        self.weight = (V - El) / (self.E[self.high] - El)
+
+    def kernels(self, omega):
+        """Return the Fourier transforms of the normalised Gaussian broadening kernels for each width in omega."""
+        new = OrderedDict((w, None) for w in omega if w not in self.kernel_cache)
+        if new:  # Build all the missing kernels together
+            width = np.array(list(new))[:, None]
+            gauss = np.exp(-(self.E2 / (2 * width ** 2)))
+            gauss /= gauss.sum(axis=1, keepdims=True)  # Normalised gaussian for the convolution
+            new = OrderedDict(zip(new, np.fft.rfft(gauss, self.fft_size, axis=1)))
+        ret = np.array([new[w] if w in new else self.kernel_cache[w] for w in omega])
+        for w, kernel in new.items():
+            if len(self.kernel_cache) >= self.max_kernels:
+                self.kernel_cache.popitem(last=False)
+            self.kernel_cache[w] = kernel
+        return ret
+
+    def convolve(self, G, omega):
+        """Convolve each row of G with the Gaussian kernel for the matching omega and interpolate onto V."""
+        kernels = self.kernels(omega)
+        cond = np.fft.irfft(np.fft.rfft(G, self.fft_size) * kernels, self.fft_size)
+        # Chop out the central section of the full convolution
+        cond = cond[:, (self.size // 2) : 3 * (self.size // 2)]
+        return cond[:, self.low] * (1 - self.weight) + cond[:, self.high] * self.weight
+
+
+_strijkers_grids = OrderedDict()
+
+
+def _strijkers_grid(V):
+    """Return a (cached) :py:class:`_StrijkersGrid` for the bias voltages V."""
+    key = (V.size, V.tobytes())
+    if key in _strijkers_grids:
+        _strijkers_grids.move_to_end(key)
+    else:
+        if len(_strijkers_grids) >= 8:
+            _strijkers_grids.popitem(last=False)
+        _strijkers_grids[key] = _StrijkersGrid(V)
+    return _strijkers_grids[key]
 
 
-@jit(float64[:](float64[:], float64, float64, float64, float64))
 def _strijkers_core(V, omega, delta, P, Z):
     """strijkers Model for point-contact Andreev Reflection Spectroscopy
     Args:
         V = bias voltages, params=list of parameter values, imega, delta,P and Z
-        omega (float): Broadening
-        delta (float): SC energy Gap
-        P (float): Interface parameter
-        Z (float): Current spin polarization through contact
+        omega (1D array): Broadening
+        delta (1D array): SC energy Gap
+        P (1D array): Interface parameter
+        Z (1D array): Current spin polarization through contact
 
     Return:
-        Conductance vs bias data.
+        (2D array) Conductance vs bias data with one row for each set of parameters.
 
     .. note::
 
@@ -73,12 +122,9 @@ def _strijkers_core(V, omega, delta, P, Z):
 
     This version only uses 1 delta, not modified for proximity
     """
-    #   Parameters
-
-    mv = np.max(np.abs(V))  # Limit for evaluating the integrals
-    E = np.linspace(-2 * mv, 2 * mv, V.size * 20)  # Energy range in meV - we use a mesh 20x denser than data points
-    gauss = (1.0 / np.sqrt(2 * np.pi * omega ** 2)) * np.exp(-(E ** 2 / (2 * omega ** 2)))
-    gauss /= gauss.sum()  # Normalised gaussian for the convolution
+    grid = _strijkers_grid(V)
+    E2, absE = grid.E2, grid.absE
+    delta, P, Z = delta[:, None], P[:, None], Z[:, None]
 
     # Conductance calculation
     #    For ease of calculation, epsilon = E/(sqrt(E^2 - delta^2))
@@ -89,13 +135,11 @@ def _strijkers_core(V, omega, delta, P, Z):
     #    Ap is always zero as the polarised current has 0 prob for an Andreev
     #    event
 
-    Au1 = (delta ** 2) / ((E ** 2) + (((delta ** 2) - (E ** 2)) * (1 + 2 * (Z ** 2)) ** 2))
-    Au2 = (((np.abs(E) / (np.sqrt((E ** 2) - (delta ** 2)))) ** 2) - 1) / (
-        ((np.abs(E) / (np.sqrt((E ** 2) - (delta ** 2)))) + (1 + 2 * (Z ** 2))) ** 2
-    )
-    Bu2 = (4 * (Z ** 2) * (1 + (Z ** 2))) / (
-        ((np.abs(E) / (np.sqrt((E ** 2) - (delta ** 2)))) + (1 + 2 * (Z ** 2))) ** 2
-    )
+    with np.errstate(invalid="ignore", divide="ignore"):
+        epsilon = absE / np.sqrt(E2 - delta ** 2)
+    Au1 = (delta ** 2) / (E2 + ((delta ** 2) - E2) * (1 + 2 * (Z ** 2)) ** 2)
+    Au2 = (epsilon ** 2 - 1) / (epsilon + (1 + 2 * (Z ** 2))) ** 2
+    Bu2 = (4 * (Z ** 2) * (1 + (Z ** 2))) / (epsilon + (1 + 2 * (Z ** 2))) ** 2
     Bp2 = Bu2 / (1 - Au2)
 
     unpolarised_prefactor = (1 - P) * (1 + (Z ** 2))
@@ -104,24 +148,14 @@ def _strijkers_core(V, omega, delta, P, Z):
     G = (
         unpolarised_prefactor
         + polarised_prefactor
-        + +np.where(
-            np.abs(E) <= delta,
-            unpolarised_prefactor * (2 * Au1 - 1) - np.ones_like(E) * polarised_prefactor,
+        + np.where(
+            absE <= delta,
+            unpolarised_prefactor * (2 * Au1 - 1) - polarised_prefactor,
             unpolarised_prefactor * (Au2 - Bu2) - Bp2 * polarised_prefactor,
         )
     )
 
-    # Convolve and chop out the central section
-    cond = np.convolve(G, gauss)
-    cond = cond[(E.size // 2) : 3 * (E.size // 2)]
-    # Linear interpolation back onto the V data point
-    matches = np.searchsorted(E, V)
-    condl = cond[matches - 1]
-    condh = cond[matches]
-    El = E[matches - 1]
-    Er = E[matches]
-    cond = (condh - condl) / (Er - El) * (V - El) + condl
-    return cond
+    return grid.convolve(G, omega)
 
 
 def strijkers(V, omega, delta, P, Z):
@@ -143,12 +177,24 @@ def strijkers(V, omega, delta, P, Z):
 
     This version only uses 1 delta, not modified for proximity
 
+    The energy mesh and broadening kernels are cached for each V and omega, so repeated calls with the same bias
+    voltages (as in a fit) are cheap. Any of the parameters may be given as an array of k values (or a (k,1) column)
+    to evaluate k parameter sets in one call, in which case the result has shape (k, len(V)).
+
     Example:
         .. plot:: samples/lmfit_demo.py
             :include-source:
             :outname: strijkers_func
     """
-    return _strijkers_core(V, omega, delta, P, Z)
+    V = np.asarray(V, dtype=float)
+    params = np.broadcast_arrays(*[np.asarray(p, dtype=float) for p in (omega, delta, P, Z)])
+    shape = params[0].shape
+    cond = _strijkers_core(V.ravel(), *[p.ravel() for p in params])
+    if not shape:
+        return cond[0].reshape(V.shape)
+    if shape[-1] == 1:
+        shape = shape[:-1]
+    return cond.reshape(shape + (V.size,))
 
 
 def rsj_noiseless(I, Ic_p, Ic_n, Rn, V_offset):
@@ -20,6 +20,7 @@ __all__ = [
 
 import numpy as np
 import scipy.constants as consts
+from scipy.special import xlogy
 
 try:
     from lmfit import Model
@@ -160,6 +161,12 @@ class Arrhenius(Model):
         pars = self.make_params(A=np.exp(d2), DE=_kb * d1)
         return update_param_vals(pars, self.prefix, **kwargs)
 
+    def jacobian(self, x, A, DE):
+        """Return the derivatives of the model with respect to A and DE."""
+        _kb = consts.physical_constants["Boltzmann constant"][0] / consts.physical_constants["elementary charge"][0]
+        e = np.exp(-DE / (_kb * x))
+        return np.array([e, -A * e / (_kb * x)])
+
 
 class NDimArrhenius(Model):
 
@@ -199,6 +206,13 @@ class NDimArrhenius(Model):
         pars = self.make_params(A=np.exp(d2), DE=_kb * d1, n=1.0)
         return update_param_vals(pars, self.prefix, **kwargs)
 
+    def jacobian(self, x, A, DE, n):
+        """Return the derivatives of the model with respect to A, DE and n."""
+        _kb = consts.physical_constants["Boltzmann constant"][0] / consts.physical_constants["elementary charge"][0]
+        xn = x ** n
+        e = np.exp(-DE / (_kb * xn))
+        return np.array([e, -A * e / (_kb * xn), A * e * DE * np.log(x) / (_kb * xn)])
+
 
 class ModArrhenius(Model):
 
@@ -238,6 +252,12 @@ class ModArrhenius(Model):
         pars = self.make_params(A=np.exp(d2), DE=_kb * d1, n=1.0)
         return update_param_vals(pars, self.prefix, **kwargs)
 
+    def jacobian(self, x, A, DE, n):
+        """Return the derivatives of the model with respect to A, DE and n."""
+        _kb = consts.physical_constants["Boltzmann constant"][0] / consts.physical_constants["elementary charge"][0]
+        e = (x ** n) * np.exp(-DE / (_kb * x))
+        return np.array([e, -A * e / (_kb * x), A * xlogy(e, x)])
+
 
 class VFTEquation(Model):
 
@@ -279,3 +299,9 @@ class VFTEquation(Model):
             d1, d2 = np.polyfit(-1.0 / (x - x0), np.log(data), 1)
         pars = self.make_params(A=np.exp(d2), dE=_kb * d1, x_0=x0)
         return update_param_vals(pars, self.prefix, **kwargs)
+
+    def jacobian(self, x, A, DE, x_0):
+        """Return the derivatives of the model with respect to A, DE and x_0."""
+        _kb = consts.physical_constants["Boltzmann constant"][0] / consts.physical_constants["elementary charge"][0]
+        e = np.exp(-DE / (_kb * (x - x_0)))
+        return np.array([e, -A * e / (_kb * (x - x_0)), -A * e * DE / (_kb * (x - x_0) ** 2)])
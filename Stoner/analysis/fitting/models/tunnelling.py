@@ -165,6 +165,15 @@ class Simmons(Model):
         pars = self.make_params(A=1e3, phi=3.0, d=10.0)
         return update_param_vals(pars, self.prefix, **kwargs)
 
+    def jacobian(self, V, A, phi, d):
+        """Return the derivatives of the model with respect to A, phi and d."""
+        q1, q2 = np.sqrt(phi - V / 2), np.sqrt(phi + V / 2)
+        e1, e2 = np.exp(-1.025 * d * q1), np.exp(-1.025 * d * q2)
+        diff = q1 ** 2 * e1 - q2 ** 2 * e2
+        dphi = e1 * (1 - 1.025 * d * q1 / 2) - e2 * (1 - 1.025 * d * q2 / 2)
+        dd = -1.025 * (q1 ** 3 * e1 - q2 ** 3 * e2)
+        return 6.2e2 * np.array([diff / d ** 2, A * dphi / d ** 2, A * (dd / d ** 2 - 2 * diff / d ** 3)])
+
 
 class BDR(Model):
 
@@ -250,3 +259,7 @@ class TersoffHammann(Model):
         """Just set the A, phi and d values to typical answers for a small tunnel junction"""
         pars = self.make_params(A=np.mean(data / V))
         return update_param_vals(pars, self.prefix, **kwargs)
+
+    def jacobian(self, V, A):  # pylint: disable=unused-argument
+        """Return the derivatives of the model with respect to A."""
+        return np.array([V])
@@ -3,10 +3,23 @@
 Functions used by the AnalysisMixin class.
 """
 import numpy as np
-from scipy.interpolate import interp1d
-from scipy.optimize import curve_fit, newton
+from scipy.optimize import curve_fit
 
-__all__ = ["outlier", "threshold", "_twoD_fit", "ApplyAffineTransform", "GetAffineTransform", "poly_outlier"]
+from ..core.utils import sliding_window, window_offsets
+
+__all__ = [
+    "outlier",
+    "threshold",
+    "_twoD_fit",
+    "ApplyAffineTransform",
+    "GetAffineTransform",
+    "poly_outlier",
+    "outlier_windows",
+    "poly_outlier_windows",
+    "BinAccumulator",
+]
+
+_threshold_chunk = 1 << 20  # Largest number of data point and threshold pairs that threshold compares at once
 
 
 def outlier(row, window, metric, ycol=None):
@@ -71,49 +84,145 @@ def poly_outlier(row, window, metric=3.0, ycol=None, xcol=None, order=1, yerr=No
     return (pval - row[ycol]) ** 2 > metric * perr
 
 
-def threshold(threshold, data, rising=True, falling=False):
+def outlier_windows(data, window, exclude_centre, metric, ycol=None):
+    """Vectorised version of :py:func:`outlier` that tests every row with a complete window at once.
+
+    Args:
+        data (2D array): All of the data.
+        window (int): Number of rows in the window around each row.
+        exclude_centre (int): Number of rows in the middle of each window to leave out.
+        metric (float): distance the current row is from the local mean.
+
+    Keyword Arguments:
+        ycol (column index or None): If set, specifies the column containing the data to check.
+
+    Returns:
+        (1D bool array):
+            For rows (window-1)/2 to len(data)-(window-1)/2-1, True if the row is an outlier.
+    """
+    half = (window - 1) // 2
+    column = data[:, ycol]
+    windows = sliding_window(column, window)[:, window_offsets(window, exclude_centre) + half]
+    av = windows.mean(axis=1)
+    std = windows.std(axis=1)
+    ret = abs(column[half : len(column) - half] - av) > metric * std
+    return np.ma.filled(ret, False)
+
+
+def poly_outlier_windows(data, window, exclude_centre, metric=3.0, ycol=None, xcol=None, order=1, yerr=None):
+    """Vectorised version of :py:func:`poly_outlier` that fits all of the complete windows at once.
+
+    Args:
+        data (2D array): All of the data.
+        window (int): Number of rows in the window around each row.
+        exclude_centre (int): Number of rows in the middle of each window to leave out.
+
+    Keyword Arguments:
+        metric, ycol, xcol, order, yerr: As for :py:func:`poly_outlier`.
+
+    Returns:
+        (1D bool array):
+            For rows (window-1)/2 to len(data)-(window-1)/2-1, True if the row is an outlier.
+
+    Notes:
+        The weighted least squares fits and their covariances are worked out as :py:func:`numpy.polyfit` does,
+        by solving the normal equations for all windows together.
+    """
+    half = (window - 1) // 2
+    keep = window_offsets(window, exclude_centre) + half
+    if order > len(keep) - 2:
+        raise ValueError("order should be smaller than the window length. {} vs {}".format(order, len(keep) - 2))
+    data = np.ma.getdata(data)
+    rows = data[half : len(data) - half]
+    x = sliding_window(data[:, xcol], window)[:, keep] - rows[:, xcol, None]
+    y = sliding_window(data[:, ycol], window)[:, keep]
+    lhs = x[:, :, None] ** np.arange(order, -1, -1)  # Vandermonde matrix for each window
+    if yerr:
+        w = 1.0 / sliding_window(data[:, yerr], window)[:, keep]
+        lhs = lhs * w[:, :, None]
+        y = y * w
+    scale = np.sqrt((lhs * lhs).sum(axis=1))
+    lhs = lhs / scale[:, None, :]
+    inverse = np.linalg.pinv(np.einsum("nmi,nmj->nij", lhs, lhs))
+    coeffs = np.einsum("nij,nmj,nm->ni", inverse, lhs, y)
+    resids = ((np.einsum("nmi,ni->nm", lhs, coeffs) - y) ** 2).sum(axis=1)
+    pval = coeffs[:, -1] / scale[:, -1]
+    perr = np.sqrt(inverse[:, -1, -1] / scale[:, -1] ** 2 * resids / (len(keep) - order - 1))
+    return (pval - rows[:, ycol]) ** 2 > metric * perr
+
+
+def threshold(threshold, data, rising=True, falling=False, interpolate=True):
     """Internal function that implements the threshold method - also used in peak-finder
 
     Args:
-        threshold (float):
-            Threshold valuye in data to look for
+        threshold (float or 1D array):
+            Threshold value, or values, in data to look for
         rising (bool):
             Find points where data is rising up past threshold
         falling (bool):
             Find points where data is falling below the threshold
+        interpolate (bool):
+            Refine the crossing points with a cubic through the two points either side of the crossing (default) or
+            just use a straight line between the two points.
 
     Returns:
-        (array):
-            Fractional indices where the data has crossed the threshold assuming a
-            straight line interpolation between two points.
+        (array or list of arrays):
+            Fractional indices where the data has crossed the threshold. If *threshold* is an array, then there is an
+            array of indices for each threshold value.
+
+    Notes:
+        The crossings are found for blocks of thresholds at a time, so that no more than about *_threshold_chunk*
+        differences between the data and the thresholds are held in memory, and then all of the crossings are refined
+        together. Each crossing is first estimated with a straight line and then refined with Newton's method on a cubic
+        through the four surrounding points, kept within the two points either side of the crossing.
     """
-    # First we find all points where we cross zero in the correct direction
-    current = data
-    previous = np.roll(current, 1)
-    current = np.atleast_1d(current)
-    index = np.arange(len(current))
-    sdat = np.column_stack((index, current, previous))
-    if rising and not falling:
-        expr = lambda x: (x[1] >= threshold) & (x[2] < threshold)
-    elif rising and falling:
-        expr = lambda x: ((x[1] >= threshold) & (x[2] < threshold)) | ((x[1] <= threshold) & (x[2] > threshold))
-    elif falling and not rising:
-        expr = lambda x: (x[1] <= threshold) & (x[2] > threshold)
-    else:
-        expr = lambda x: False
-
-    # Now we refine the estimate of zero crossing with a cubic interpolation
-    # and use Newton's root finding method to locate the zero in the interpolated data
-
-    intr = interp1d(index, data.ravel() - threshold, kind="cubic")
-    roots = []
-    for ix, x in enumerate(sdat):
-        if ix > 0 and expr(x):  # There's a root somewhere here !
-            try:
-                roots.append(newton(intr, ix))
-            except (ValueError, RuntimeError):  # fell off the end here
-                pass
-    return np.array(roots)
+    data = np.asarray(np.ma.filled(np.ma.asarray(data, dtype=float), np.nan)).ravel()
+    levels = np.atleast_1d(np.asarray(threshold, dtype=float)).ravel()
+    step = max(_threshold_chunk // max(len(data), 1), 1)
+    which, row = [np.zeros(0, dtype=int)], [np.zeros(0, dtype=int)]
+    for start in range(0, len(levels), step):
+        diff = data[None, :] - levels[start : start + step, None]
+        previous, current = diff[:, :-1], diff[:, 1:]
+        crossed = np.zeros(previous.shape, dtype=bool)
+        if rising:
+            crossed |= (current >= 0) & (previous < 0)
+        if falling:
+            crossed |= (current <= 0) & (previous > 0)
+        block_which, block_row = np.nonzero(crossed)
+        which.append(block_which + start)
+        row.append(block_row)
+    which, row = np.concatenate(which), np.concatenate(row)
+    level = levels[which]
+    b, c = data[row] - level, data[np.minimum(row + 1, len(data) - 1)] - level
+    t = b / (b - c)  # Straight line estimate of the crossing between row and row + 1
+    if interpolate and len(data) > 2:
+        # Neighbouring points, extrapolated with a straight line at the ends of the data and next to nans
+        a = data[np.maximum(row - 1, 0)] - level
+        d = data[np.minimum(row + 2, len(data) - 1)] - level
+        a = np.where((row > 0) & np.isfinite(a), a, 2 * b - c)
+        d = np.where((row + 2 < len(data)) & np.isfinite(d), d, 2 * c - b)
+        # Coefficients of the cubic through (-1,a), (0,b), (1,c), (2,d)
+        c1 = -a / 3 - b / 2 + c - d / 6
+        c2 = a / 2 - b + c / 2
+        c3 = (d - a) / 6 + (b - c) / 2
+        lower, upper = np.zeros_like(t), np.ones_like(t)
+        for _ in range(50):
+            value = b + t * (c1 + t * (c2 + t * c3))
+            below = np.sign(value) == np.sign(b)
+            lower = np.where(below, t, lower)
+            upper = np.where(below, upper, t)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                step = value / (c1 + t * (2 * c2 + 3 * t * c3))
+            moving = np.abs(step) > 1e-12
+            if not moving.any():
+                break
+            new_t = t - step
+            bisect = ~((new_t > lower) & (new_t < upper))  # Newton step left the bracket, so bisect instead
+            t = np.where(moving, np.where(bisect, (lower + upper) / 2, new_t), t)
+    roots = row + t
+    if np.ndim(threshold) == 0:
+        return roots
+    return [roots[which == i] for i in range(len(levels))]
 
 
 def _twoD_fit(xy1, xy2, xmode="linear", ymode="linear", m0=None):
@@ -257,3 +366,150 @@ def GetAffineTransform(p, pd):
     p = np.append(p, np.atleast_2d(np.ones(3)).T, axis=1)
     transform = np.linalg.solve(p, pd)
     return transform.T
+
+
+class BinAccumulator(object):
+
+    """Accumulate binned averages of x-y data a chunk at a time, as used by :py:meth:`Stoner.Data.bin`.
+
+    Each chunk is sorted on x once and the rows that fall into every bin are found with :py:func:`numpy.searchsorted`,
+    so the cost is O(N log N) however many bins there are. The counts, means, sums of squared deviations and (for
+    weighted binning) sums of weights of each bin are combined between chunks, so a large file or a whole folder of
+    files can be binned without concatenating the data.
+
+    Args:
+        bin_left, bin_right (1D arrays): The lower and upper limits of each bin. A point is in a bin if
+            left < x <= right. Bins may overlap.
+
+    Keyword Arguments:
+        bin_centres (1D array or None): The centres of the bins, defaults to the middle of each bin.
+        weighted (bool): If True, the y values are weighted by 1/error^2 and errors must be given to :py:meth:`add`.
+
+    Example:
+        Bin every file in a folder onto the same bins::
+
+            left, right, centres = folder[0].make_bins("X", 100, "log", bin_start=1E-3, bin_stop=1E3)
+            acc = BinAccumulator(left, right, centres)
+            for data in folder:
+                acc.add_data(data)
+            centres, ybin, ebin, nbins = acc.result()
+    """
+
+    def __init__(self, bin_left, bin_right, bin_centres=None, weighted=False):
+        self.bin_left = np.minimum(bin_left, bin_right)
+        self.bin_right = np.maximum(bin_left, bin_right)
+        if bin_centres is None:
+            bin_centres = (self.bin_left + self.bin_right) / 2.0
+        self.bin_centres = np.asarray(bin_centres)
+        self.weighted = weighted
+        self.count = None  # Statistics for each bin and y column are set up by the first chunk
+        self.mean = None
+        self.m2 = None
+        self.weights = None
+        self.weighted_sum = None
+
+    def add(self, x, y, yerr=None):
+        """Add a chunk of data to the bins.
+
+        Args:
+            x (1D array): The x values of the chunk.
+            y (1D or 2D array): The y values of the chunk, one column for each set of y data.
+
+        Keyword Arguments:
+            yerr (1D or 2D array): The errors in y, which must be given if the accumulator is weighted.
+
+        Returns:
+            (BinAccumulator): This accumulator.
+
+        Notes:
+            Rows where x, y or the errors are nan or masked are left out.
+        """
+        x = np.ma.masked_invalid(np.ma.asarray(x, dtype=float).ravel())
+        y = np.ma.masked_invalid(np.ma.asarray(y, dtype=float).reshape(len(x), -1))
+        bad = np.ma.getmaskarray(x) | np.ma.getmaskarray(y).any(axis=1)
+        if self.weighted:
+            if yerr is None:
+                raise ValueError("A weighted BinAccumulator needs the errors in y.")
+            yerr = np.ma.masked_invalid(np.ma.asarray(yerr, dtype=float).reshape(len(x), -1))
+            bad |= np.ma.getmaskarray(yerr).any(axis=1)
+            yerr = np.ma.getdata(yerr)[~bad]
+        x = np.ma.getdata(x)[~bad]
+        y = np.ma.getdata(y)[~bad]
+        nbins = len(self.bin_left)
+        if self.count is None:
+            shape = (nbins, y.shape[1])
+            self.count = np.zeros(nbins, dtype=int)
+            self.mean, self.m2, self.weights, self.weighted_sum = [np.zeros(shape) for _ in range(4)]
+        # Find the rows in each bin from the sorted x values and list them bin by bin
+        order = np.argsort(x, kind="mergesort")
+        xs = x[order]
+        lo = np.searchsorted(xs, self.bin_left, side="right")
+        count = np.maximum(np.searchsorted(xs, self.bin_right, side="right") - lo, 0)
+        which = np.repeat(np.arange(nbins), count)
+        rows = order[np.repeat(lo - (np.cumsum(count) - count), count) + np.arange(count.sum())]
+        ys = y[rows]
+
+        def total(values):
+            """Sum *values* (a column for each y column) for each bin."""
+            return np.column_stack([np.bincount(which, weights=v, minlength=nbins) for v in values.T])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = total(ys) / count[:, None]
+            mean[count == 0] = 0.0
+            m2 = total((ys - mean[which]) ** 2)
+            new_count = self.count + count
+            delta = mean - self.mean
+            frac = np.where(new_count > 0, count / np.maximum(new_count, 1), 0.0)[:, None]
+            self.mean += delta * frac
+            self.m2 += m2 + delta ** 2 * self.count[:, None] * frac
+            self.count = new_count
+            if self.weighted:
+                w = np.broadcast_to(1.0 / yerr[rows] ** 2, ys.shape)
+                self.weights += total(w)
+                self.weighted_sum += total(w * ys)
+        return self
+
+    def add_data(self, data, xcol=None, ycol=None, yerr=None):
+        """Add the data from a :py:class:`Stoner.Core.DataFile` or :py:class:`Stoner.core.array.DataArray` to the bins.
+
+        Args:
+            data (DataFile or DataArray): The data to add, e.g. a file or a slice of rows from one.
+
+        Keyword Arguments:
+            xcol, ycol, yerr (index or None): The columns of x, y and y error data. Default to the columns assigned
+                as x, y and e in data.setas.
+
+        Returns:
+            (BinAccumulator): This accumulator.
+        """
+        setas = data.setas
+        cols = setas._get_cols()
+        xcol = setas.find_col(cols["xcol"] if xcol is None else xcol)
+        ycol = setas.find_col(cols["ycol"] if ycol is None else ycol, force_list=True)
+        values = data if isinstance(data, np.ndarray) else data.data
+        errors = None
+        if self.weighted:
+            errors = values[:, setas.find_col(cols["yerr"] if yerr is None else yerr, force_list=True)]
+        return self.add(values[:, xcol], values[:, ycol], errors)
+
+    def result(self):
+        """Return the binned data.
+
+        Returns:
+            (tuple of 4 arrays):
+                The bin centres and 2D arrays with a column for each y column of the average y value, its error and the
+                number of points in each bin. Empty bins have a value of 0 and an error of nan (or inf if weighted).
+        """
+        if self.count is None:
+            raise ValueError("No data has been added to the bins.")
+        count = np.broadcast_to(self.count[:, None], self.mean.shape).astype(float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            std_err = np.sqrt(self.m2 / count) / np.sqrt(count)
+            if self.weighted:
+                ybin = np.where(count > 0, self.weighted_sum / self.weights, 0.0)
+                ebin = 1.0 / np.sqrt(self.weights)
+                ebin = np.where(count > 3, np.maximum(std_err, ebin / count), ebin)
+            else:
+                ybin = self.mean.copy()
+                ebin = np.where(count * count.shape[1] > 1, std_err, np.nan)
+        return self.bin_centres, ybin, ebin, count
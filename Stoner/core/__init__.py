@@ -13,11 +13,12 @@ __all__ = [
     "setas",
     "exceptions",
     "utils",
+    "cache",
     "Typing",
 ]
 
 from .base import regexpDict, typeHintedDict, metadataObject, string_to_type
 from .setas import setas as _setas
 from .array import DataArray
-from . import utils, exceptions, base, array
+from . import utils, exceptions, base, array, cache
 from . import Typing
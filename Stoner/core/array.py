@@ -36,6 +36,11 @@ class DataArray(_ma_.MaskedArray):
         setas (list or string): Actually a proxy to a magic class that handles the assignment of columns to different axes and
             also tracks the names of columns (so that columns may be accessed as named items).
 
+    When the *search_index* option is set, :py:meth:`Stoner.Core.DataFile.search`,
+    :py:meth:`Stoner.Core.DataFile.select` and :py:meth:`Stoner.Core.DataFile.closest` look values up in a sorted copy
+    of each column they use. These are kept with the DataArray and thrown away when it, or an indexed view of it, is
+    assigned to.
+
 
 
     This array type is used to represent numeric data in the Stoner Package - primarily as a 2D
@@ -103,6 +108,8 @@ class DataArray(_ma_.MaskedArray):
                 self.mask = False
                 self._setas._row = False
             self._setas.shape = getattr(self, "shape", (0,))
+        self._sort_cache = {}
+        self._sort_parent = None
 
     def __array_wrap__(self, out_arr, context=None):
         """Make sure ufuncs do the right thing with DataArrays"""
@@ -268,6 +275,15 @@ class DataArray(_ma_.MaskedArray):
         super(DataArray, self).__setstate__(state[0:-2])
         self.i = state[-1]
 
+    def __deepcopy__(self, memo):
+        """Deep copy the DataArray, leaving out its sorted columns and any array that it is a view of."""
+        cache, parent = self._sort_cache, self._sort_parent
+        self._sort_cache, self._sort_parent = {}, None
+        try:
+            return super(DataArray, self).__deepcopy__(memo)
+        finally:
+            self._sort_cache, self._sort_parent = cache, parent
+
     def __getattr__(self, name):
         """Get a column using the setas attribute."""
         # Overrides __getattr__ to allow access as row.x etc.
@@ -406,6 +422,8 @@ class DataArray(_ma_.MaskedArray):
                 ret.i = self.i
             if not single_row:
                 ret.name = self.column_headers
+        if isinstance(ret, DataArray) and ret.base is not None:  # Writing to a view must clear our sorted columns
+            ret._sort_parent = self
         return ret
 
     def __setitem__(self, ix, val):
@@ -426,11 +444,43 @@ class DataArray(_ma_.MaskedArray):
             self.unshare_mask()
 
         super(DataArray, self).__setitem__(ix, val)
+        parent = self
+        while parent is not None:
+            parent._sort_cache = {}
+            parent = parent._sort_parent
 
     # ============================================================================================================================
     ############################              Private Methods                ####################################################
     # ============================================================================================================================
 
+    def _sorted_column(self, col):
+        """Return a column's values in ascending order, together with the rows that they came from.
+
+        Args:
+            col (int): The column to sort.
+
+        Returns:
+            (order, values) or None:
+                The row indices that sort the column and the sorted values (with nans at the end), or None if the
+                DataArray isn't 2D or the column has masked values.
+
+        Notes:
+            The result is kept with a hash of the column's values and is only reused if the hash still matches, so
+            changes that don't go through :py:meth:`DataArray.__setitem__` (e.g. in place arithmetic or writing to
+            the underlying numpy array) are also noticed.
+        """
+        mask = _ma_.getmask(self)
+        if self.ndim != 2 or (mask is not _ma_.nomask and mask[:, col].any()):
+            return None
+        values = _ma_.getdata(self)[:, col]
+        key = hash(values.tobytes())
+        cached = self._sort_cache.get(col)
+        if cached is None or cached[0] != key:
+            order = _np_.argsort(values, kind="mergesort")
+            cached = (key, order, values[order])
+            self._sort_cache[col] = cached
+        return cached[1:]
+
     def _col_args(
         self,
         scalar=True,
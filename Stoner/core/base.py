@@ -96,6 +96,9 @@ class regexpDict(sorteddict):
 
     allowed_keys = (object,)
 
+    #: _version (int): Incremented whenever an item is set or deleted.
+    _version = 0
+
     def __lookup__(self, name, multiple=False, exact=False):
         """Lookup name and find a matching key or raise KeyError.
 
@@ -159,10 +162,29 @@ class regexpDict(sorteddict):
                 raise KeyError("{} is not a match to any key.".format(name))
             key = name
         super(regexpDict, self).__setitem__(key, value)
+        self._version = self._version + 1
 
     def __delitem__(self, name):
         """Deletes keys that match by regular expression as well as exact matches"""
         super(regexpDict, self).__delitem__(self.__lookup__(name))
+        self._version = self._version + 1
+
+    def clear(self):
+        """Remove all items."""
+        super(regexpDict, self).clear()
+        self._version = self._version + 1
+
+    def pop(self, *args):
+        """Remove and return an item."""
+        ret = super(regexpDict, self).pop(*args)
+        self._version = self._version + 1
+        return ret
+
+    def popitem(self, *args, **kargs):
+        """Remove and return a (key, value) pair."""
+        ret = super(regexpDict, self).popitem(*args, **kargs)
+        self._version = self._version + 1
+        return ret
 
     def __contains__(self, name):
         """Returns True if name either is an exact key or matches when interpreted as a regular experssion."""
@@ -195,6 +217,11 @@ class regexpDict(sorteddict):
         """Key is definitely in dictionary as literal"""
         return super(regexpDict, self).__contains__(name)
 
+    @property
+    def version(self):
+        """A counter that changes whenever an item is set or deleted - used to spot changes to the dictionary."""
+        return self._version
+
 
 class typeHintedDict(regexpDict):
 
@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+"""Keep binary copies of loaded data files so that they can be reloaded without parsing the original file again.
+
+The cache is switched on with the *load_cache* package option. Each cached file is stored in the directory given by the
+*load_cache_dir* option (or *~/.stoner_cache* if that is empty) as a .npy file of the data, which is memory mapped
+when it is reloaded, a .mask.npy file if any of the data is masked and a pickle of the column headers, column
+assignments, metadata and the size and modification time of the original file. An entry is only used if the original
+file hasn't changed since it was cached and it was loaded with the same class and loader arguments. When the cache
+grows larger than *load_cache_size* MB, the least recently used entries are removed.
+"""
+__all__ = ["cache_dir", "cache_entry", "load_cached", "save_cached", "trim_cache"]
+
+import hashlib
+import os
+import os.path as path
+import pickle
+
+import numpy as np
+
+from ..tools import get_option
+
+_parts = (".pkl", ".mask.npy", ".npy")
+_format_version = 1  # Increase this when the layout of the entries changes so that old entries are ignored
+_cache_sizes = {}  # Running total of the bytes in each cache directory, set by trim_cache and added to by save_cached
+
+
+def cache_dir():
+    """Return the directory used for the load cache, creating it if necessary."""
+    directory = get_option("load_cache_dir")
+    if not directory:
+        directory = path.join(path.expanduser("~"), ".stoner_cache")
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+
+def cache_entry(filename, filetype=None, args=(), kargs=None):
+    """Return the path of the cache entry for a file, without the extension.
+
+    Args:
+        filename (str): The file that was loaded.
+
+    Keyword Arguments:
+        filetype (str or None): The name of the class used to load the file, or None if the class was found by trying
+            all the subclasses of :py:class:`Stoner.Core.DataFile`.
+        args (tuple): Extra positional arguments passed to the loader.
+        kargs (dict or None): Extra keyword arguments passed to the loader.
+
+    Returns:
+        (str): The path in the cache directory that the parts of the cache entry start with.
+    """
+    kargs = sorted((kargs or {}).items())
+    key = "{}|{}|{}|{!r}|{!r}".format(
+        _format_version, path.realpath(filename), filetype if filetype is not None else "auto", tuple(args), kargs
+    )
+    return path.join(cache_dir(), hashlib.sha1(key.encode("utf-8")).hexdigest())
+
+
+def load_cached(filename, filetype=None, args=(), kargs=None):
+    """Read a file from the cache if it is there and the file hasn't changed since it was cached.
+
+    Args:
+        filename (str): The file to load.
+
+    Keyword Arguments:
+        filetype, args, kargs: As for :py:func:`cache_entry`.
+
+    Returns:
+        (dict or None): A dictionary with the *data* (as a masked array), *column_headers*, *setas* and *metadata* of
+        the file, or None if the file isn't in the cache or the cache entry is out of date.
+    """
+    entry = cache_entry(filename, filetype, args, kargs)
+    try:
+        stat = os.stat(filename)
+        if path.getmtime(entry + ".pkl") < stat.st_mtime:
+            return None
+        with open(entry + ".pkl", "rb") as info_file:
+            info = pickle.load(info_file)
+        if info["mtime"] != stat.st_mtime or info["size"] != stat.st_size:
+            return None
+        data = np.load(entry + ".npy", mmap_mode="c")
+        mask = np.load(entry + ".mask.npy") if info["masked"] else False
+        os.utime(entry + ".pkl", None)  # Mark as recently used for trim_cache
+    except (OSError, IOError, EOFError, KeyError, ValueError, pickle.UnpicklingError):
+        return None
+    info["data"] = np.ma.MaskedArray(data, mask=mask)
+    return info
+
+
+def save_cached(filename, datafile, filetype=None, args=(), kargs=None):
+    """Store a newly loaded file in the cache and trim the cache if it has grown too large.
+
+    Args:
+        filename (str): The file that was loaded.
+        datafile (DataFile): The loaded data.
+
+    Keyword Arguments:
+        filetype, args, kargs: As for :py:func:`cache_entry`.
+
+    Returns:
+        (bool): True if the file was cached. Data that can't be memory mapped (e.g. arrays of objects) isn't cached.
+
+    Notes:
+        The size of the cache is only measured by listing the cache directory the first time a file is saved to it and
+        when the running total of the sizes of the entries saved since then passes *load_cache_size* MB.
+    """
+    data = np.ma.asarray(datafile.data)
+    if data.dtype.hasobject or data.ndim != 2:
+        return False
+    entry = cache_entry(filename, filetype, args, kargs)
+    stat = os.stat(filename)
+    mask = np.ma.getmaskarray(data)
+    info = {
+        "mtime": stat.st_mtime,
+        "size": stat.st_size,
+        "masked": bool(mask.any()),
+        "column_headers": list(datafile.column_headers),
+        "setas": datafile.setas.to_list(),
+        "metadata": datafile.metadata,
+    }
+    try:
+        np.save(entry + ".tmp.npy", np.ma.getdata(data))
+        os.replace(entry + ".tmp.npy", entry + ".npy")
+        if info["masked"]:
+            np.save(entry + ".tmp.npy", mask)
+            os.replace(entry + ".tmp.npy", entry + ".mask.npy")
+        with open(entry + ".tmp", "wb") as info_file:  # Written last so a partial entry is never used
+            pickle.dump(info, info_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(entry + ".tmp", entry + ".pkl")
+        size = sum(path.getsize(entry + part) for part in _parts if part != ".mask.npy" or info["masked"])
+    except (OSError, IOError, pickle.PicklingError):
+        return False
+    directory = path.dirname(entry)
+    if directory in _cache_sizes:  # Overwritten entries are counted twice, which only makes the next trim earlier
+        _cache_sizes[directory] += size
+        if _cache_sizes[directory] <= get_option("load_cache_size") * 1024 ** 2:
+            return True
+    trim_cache()
+    return True
+
+
+def trim_cache(size=None):
+    """Remove the least recently used entries from the cache until it is no bigger than *size* MB.
+
+    Keyword Arguments:
+        size (int or None): The maximum size of the cache in MB, defaults to the *load_cache_size* option.
+    """
+    if size is None:
+        size = get_option("load_cache_size")
+    directory = cache_dir()
+    entries = {}
+    for name in os.listdir(directory):
+        for part in _parts:
+            if name.endswith(part):
+                stem = name[: -len(part)]
+                break
+        else:
+            continue
+        full_name = path.join(directory, name)
+        try:
+            entry = entries.setdefault(stem, [0, 0.0, []])
+            entry[0] += path.getsize(full_name)
+            if name.endswith(".pkl"):
+                entry[1] = path.getmtime(full_name)
+            entry[2].append(full_name)
+        except OSError:
+            continue
+    total = sum(entry[0] for entry in entries.values())
+    for entry_size, _, files in sorted(entries.values(), key=lambda entry: entry[1]):
+        if total <= size * 1024 ** 2:
+            break
+        for full_name in files:
+            try:
+                os.remove(full_name)
+            except OSError:
+                pass
+        total -= entry_size
+    _cache_sizes[directory] = total
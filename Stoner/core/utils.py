@@ -11,14 +11,28 @@ __all__ = [
     "itersubclasses",
     "tab_delimited",
     "decode_string",
+    "header_lines",
+    "sliding_window",
+    "window_offsets",
+    "sorted_spans",
+    "spans_mask",
+    "operator_limits",
 ]
 
 import copy
 import csv
+import io
+import numbers
 import re
 from collections import Mapping
 import numpy as np
-from Stoner.compat import index_types, int_types
+from numpy.lib.stride_tricks import as_strided
+from Stoner.compat import index_types, int_types, bytes2str
+
+try:
+    from numpy.lib.stride_tricks import sliding_window_view
+except ImportError:  # numpy < 1.20
+    sliding_window_view = None
 
 
 def add_core(other, newdata):
@@ -290,3 +304,158 @@ def decode_string(value):
         count = int(count)
         value = value.replace(total, code * count, 1)
     return value
+
+
+def header_lines(header):
+    """Split the bytes read from the start of a file into lines of text.
+
+    Args:
+        header (bytes): The first few kB of a file as read by :py:meth:`Stoner.Core.DataFile.load` for probing.
+
+    Returns:
+        (list of str): The decoded lines with universal newline handling - the same lines that a file opened in
+        text mode with utf-8 encoding would have yielded. The last line may be truncated if the file was longer
+        than the header.
+    """
+    return io.StringIO(bytes2str(header), newline=None).readlines()
+
+
+def _window_view(data, window):
+    """Return a read-only strided view of the ndarray *data* as windows of *window* rows."""
+    if sliding_window_view is not None:
+        return np.moveaxis(sliding_window_view(data, window, axis=0), -1, 1)
+    shape = (data.shape[0] - window + 1, window) + data.shape[1:]
+    return as_strided(data, shape=shape, strides=(data.strides[0],) + data.strides, writeable=False)
+
+
+def sliding_window(data, window, wrap=False):
+    """Return every window of *window* consecutive rows of *data* as one array, without copying the data.
+
+    Args:
+        data (ndarray or masked array): 1D or 2D data.
+        window (int): The number of rows in each window.
+
+    Keyword Arguments:
+        wrap (bool): If True, pad the start and end of the data with rows from the other end so that there is one
+            window centred on each row. This copies the data once. Default is False, which gives only the complete
+            windows.
+
+    Returns:
+        (ndarray or masked array):
+            A read-only array of shape (number of windows, window) + data.shape[1:], whose element [i, j] is row i+j
+            of the (padded) data. If *data* is a masked array then so is the result, with the mask windowed the same
+            way.
+    """
+    masked = isinstance(data, np.ma.MaskedArray)
+    values = np.ma.getdata(data)
+    mask = np.ma.getmaskarray(data) if masked else None
+    if wrap:
+        half = (window - 1) // 2
+        values = np.concatenate((values[len(values) - half :], values, values[: window - 1 - half]))
+        if masked:
+            mask = np.concatenate((mask[len(mask) - half :], mask, mask[: window - 1 - half]))
+    if window < 1 or window > len(values):
+        raise ValueError("Window of {} rows doesn't fit into {} rows of data.".format(window, len(values)))
+    windows = _window_view(values, window)
+    if masked:
+        windows = np.ma.MaskedArray(windows, mask=_window_view(mask, window), copy=False)
+    return windows
+
+
+def window_offsets(window, exclude_centre=0):
+    """Return the offsets from the centre row of the rows in a window, leaving out any excluded centre rows.
+
+    Args:
+        window (int): The (odd) number of rows in the window.
+
+    Keyword Arguments:
+        exclude_centre (odd int or bool): The number of rows to leave out of the middle of the window, True for 1 row
+            or False (the default) for none.
+
+    Returns:
+        (1D int array): The offsets, e.g. [-3,-2,-1,1,2,3] for a window of 7 excluding 1 row.
+
+    Raises:
+        ValueError: If the window or number of excluded rows are not odd, or the window is too small.
+    """
+    if isinstance(exclude_centre, bool):
+        exclude_centre = int(exclude_centre)
+    if exclude_centre:
+        if exclude_centre % 2 == 0:
+            raise ValueError("If excluding the centre of the window, this must be an odd number of rows.")
+        elif window - exclude_centre < 2 or window < 3 or window % 2 == 0:
+            raise ValueError(
+                "Window must be at least two bigger than the number of rows exluded from the centre, "
+                + "bigger than 3 and odd"
+            )
+    half = (window - 1) // 2
+    offsets = np.arange(-half, half + 1)
+    return offsets[np.abs(offsets) > (exclude_centre - 1) // 2] if exclude_centre else offsets
+
+
+def sorted_spans(values, low, high, include_low=False, include_high=True):
+    """Find where ranges of values lie in a sorted array.
+
+    Args:
+        values (1D array): Values sorted into ascending order, with any nans at the end.
+        low, high (float or 1D array): The lower and upper limits of one or more ranges.
+
+    Keyword Arguments:
+        include_low (bool): Whether values equal to *low* are in the range (default False).
+        include_high (bool): Whether values equal to *high* are in the range (default True).
+
+    Returns:
+        (lo, hi):
+            Arrays such that values[lo[i]:hi[i]] are the values in the i'th range. Ranges with a nan limit are empty.
+    """
+    low = np.atleast_1d(np.asarray(low, dtype=float))
+    high = np.atleast_1d(np.asarray(high, dtype=float))
+    lo = np.searchsorted(values, low, side="left" if include_low else "right")
+    hi = np.searchsorted(values, high, side="right" if include_high else "left")
+    hi = np.where(np.isnan(low) | np.isnan(high), lo, np.maximum(hi, lo))
+    return lo, hi
+
+
+def spans_mask(lo, hi, size):
+    """Return a boolean array of length *size* that is True inside any of the ranges lo[i]:hi[i]."""
+    marks = np.zeros(size + 1, dtype=int)
+    np.add.at(marks, lo, 1)
+    np.add.at(marks, hi, -1)
+    return np.cumsum(marks[:-1]) > 0
+
+
+def operator_limits(op, value):
+    """Convert a :py:meth:`Stoner.Core.DataFile.select` comparison into a range of values.
+
+    Args:
+        op (str): The name of the operator from :py:data:`Stoner.tools.operator`.
+        value: The value that is being compared with.
+
+    Returns:
+        (tuple or None):
+            (low, high, include_low, include_high) for :py:func:`sorted_spans`, or None if the comparison isn't a
+            range of real numbers.
+    """
+    if isinstance(value, numbers.Real) and not isinstance(value, bool):
+        value = float(value)
+        return {
+            "eq": (value, value, True, True),
+            "lt": (-np.inf, value, True, False),
+            "le": (-np.inf, value, True, True),
+            "gt": (value, np.inf, False, True),
+            "ge": (value, np.inf, True, True),
+        }.get(op)
+    if (
+        isinstance(value, (tuple, list))
+        and len(value) == 2
+        and all(isinstance(v, numbers.Real) and not isinstance(v, bool) for v in value)
+    ):
+        closed = {
+            "between": (False, False),
+            "ibetween": (True, True),
+            "ilbetween": (True, False),
+            "iubetween": (False, True),
+        }
+        if op in closed:
+            return (float(min(value)), float(max(value))) + closed[op]
+    return None
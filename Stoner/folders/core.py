@@ -21,10 +21,50 @@ from Stoner.core.base import metadataObject
 from .utils import pathjoin
 
 from .each import item as each_item
-from .metadata import proxy as combined_metadata_proxy
+from .metadata import proxy as combined_metadata_proxy, MetadataIndex, _as_number
 
 regexp_type = (_pattern_type,)
 
+_numeric_ops = ["eq", "ne", "lt", "le", "gt", "ge", "between", "ibetween", "ilbetween", "iubetween"]
+
+
+def _select_test(arg, value, negate):
+    """Work out the metadata key, operator and negation for a keyword argument to :py:meth:`baseFolder.select`.
+
+    Args:
+        arg (str): The keyword argument name, possibly with a *__operator* suffix.
+        value (any): The value being tested against.
+        negate (bool): The negation to use if *arg* doesn't have an operator.
+
+    Returns:
+        (key, op, negate): The metadata key, operator name and whether to negate the test.
+    """
+    parts = arg.split("__")
+    if parts[-1] in operator and len(parts) > 1:
+        if len(parts) > 2 and parts[-2] == "not":
+            end = -2
+            negate = True
+        else:
+            end = -1
+            negate = False
+        return "__".join(parts[:end]), parts[-1], negate
+    if isinstance(value, tuple) and len(value) == 2:
+        op = "between"  # Assume two length tuples are testing for range
+    elif not isinstance(value, string_types) and isiterable(value):
+        op = "in"  # Assume other iterables are testing for memebership
+    else:  # Everything else is exact matches
+        op = "eq"
+    return arg, op, negate
+
+
+def _numeric_test(op, value):
+    """Check whether the select operator *op* with *value* can be evaluated on an array of floats."""
+    if op not in _numeric_ops:
+        return False
+    if op.endswith("between"):
+        return isiterable(value) and len(value) > 0 and all([_as_number(v) is not None for v in value])
+    return _as_number(value) is not None
+
 
 def __add_core__(result, other):
     """Implements the core logic of the addition operator.
@@ -203,6 +243,7 @@ class baseFolder(MutableSequence):
         self._loader = None
         self._instance_attrs = set()
         self._root = "."
+        self._metadata_index = MetadataIndex()
         return self
 
     def __init__(self, *args, **kargs):
@@ -527,6 +568,7 @@ class baseFolder(MutableSequence):
             self.objects.update({name: value})
         else:
             self.objects[name] = value
+        self._metadata_index.update(name, value)
 
     def __inserter__(self, ix, name, value):
         """Insert the element into a specific place in our data folder.
@@ -557,7 +599,9 @@ class baseFolder(MutableSequence):
             We're in the base class here, so we don't call super() if we can't handle this, then we're stuffed!
 
         """
-        del self.objects[ix]
+        name = self.objects.__lookup__(ix)  # ix may be an int or pattern, but the index is keyed by name
+        del self.objects[name]
+        self._metadata_index.remove(name)
 
     def __clear__(self):
         """"Clears all stored :py:class:`Stoner.Core.metadataObject` instances stored.
@@ -797,6 +841,43 @@ class baseFolder(MutableSequence):
                 continue
             yield member
 
+    def _indexed_members(self):
+        """Bring the metadata index up to date and return the objects that it covers.
+
+        Objects that haven't been loaded yet are loaded (just their metadata if possible) and objects whose metadata
+        has changed since they were indexed are indexed again. Objects that are already indexed are taken straight
+        from the object store, without going through :py:meth:`baseFolder.__getter__`.
+
+        Returns:
+            (list of (str, metadataObject)): The names and objects in the folder in order.
+        """
+        index = self._metadata_index
+        objects = self.objects
+        members = []
+        for name in self.__names__():
+            member = dict.get(objects, name) if isinstance(objects, dict) else None
+            if not isinstance(member, metadataObject) or index.stale(name, member):
+                member = self.__getter__(name, instantiate="metadata")
+                if member is None:
+                    continue
+                if index.stale(name, member):
+                    index.update(name, member)
+            members.append((name, member))
+        index.prune([name for name, _ in members])
+        return members
+
+    def _iter_metadata(self):
+        """Iterate over objects for reading their metadata.
+
+        Mixin classes that can load just the metadata of an object do so when *__getter__* is called with
+        *instantiate="metadata"* - otherwise this is the same as iterating over the folder.
+        """
+        for n in self.__names__():
+            member = self.__getter__(n, instantiate="metadata")
+            if member is None:
+                continue
+            yield member
+
     def __rmatmul__(self, other):
         """Implement callable@DataFolder as a generic iterate a function over DataFolder members.
 
@@ -1296,10 +1377,10 @@ class baseFolder(MutableSequence):
         else:
             next_keys = []
         if isinstance(key, string_types):
-            k = key
-            key = lambda x: x.get(k, "None")
-        for x in self:
-            v = key(x)
+            members = self.__group_indexed(key)
+        else:
+            members = ((x, key(x)) for x in self)
+        for x, v in members:
             if not v in self.groups:
                 self.add_group(v)
             self.groups[v].append(x)
@@ -1490,41 +1571,88 @@ class baseFolder(MutableSequence):
             gkargs["recurse"] = True
             for g in self.groups:
                 result.groups[g] = self.groups[g].select(*args, **gkargs)
+        if any([callable(v) for v in kargs.values()]):  # Callable tests need the whole object
+            matches = self.__select_members(kargs, negate)
+        else:
+            matches = self.__select_indexed(kargs, negate)
+        for f in matches:
+            # Something matched, so append to result
+            if hasattr(f, "filename"):
+                name = f.filename
+                result.__setter__(name, f)
+            else:
+                result.append(f)
+        return result
+
+    def __select_members(self, kargs, negate):
+        """Test each object in turn for :py:meth:`baseFolder.select` and yield those that match."""
         for f in self:
             for arg in kargs:
                 if callable(kargs[arg]) and kargs[arg](f):
                     break
                 elif isinstance(arg, string_types):
                     val = kargs[arg]
-                    parts = arg.split("__")
-                    if parts[-1] in operator and len(parts) > 1:
-                        if len(parts) > 2 and parts[-2] == "not":
-                            end = -2
-                            negate = True
-                        else:
-                            end = -1
-                            negate = False
-                        arg = "__".join(parts[:end])
-                        op = parts[-1]
-                    else:
-                        if isinstance(kargs[arg], tuple) and len(kargs[arg] == 2):
-                            op = "between"  # Assume two length tuples are testing for range
-                        elif not isinstance(kargs[arg], string_types) and isiterable(kargs[arg]):
-                            op = "in"  # Assume other iterables are testing for memebership
-                        else:  # Everything else is exact matches
-                            op = "eq"
+                    arg, op, negate = _select_test(arg, val, negate)
                     func = operator[op]
                     if arg in f and negate ^ func(f[arg], val):
                         break
             else:  # No tests matched - contineu to next line
                 continue
-            # Something matched, so append to result
-            if hasattr(f, "filename"):
-                name = f.filename
-                result.__setter__(name, f)
-            else:
-                result.append(f)
-        return result
+            yield f
+
+    def __select_indexed(self, kargs, negate):
+        """Use the metadata index to find the objects that match the tests for :py:meth:`baseFolder.select`.
+
+        Tests on real numbers are evaluated on whole columns of the index at once. Other values are tested one at a
+        time, and objects that don't have the exact metadata key fall back to testing the object itself so that
+        regular expression matching of keys still works.
+        """
+        members = self._indexed_members()
+        index = self._metadata_index
+        rows = index.rows([name for name, _ in members])
+        matched = _np_.zeros(len(members), dtype=bool)
+        for arg in kargs:
+            if not isinstance(arg, string_types):
+                continue
+            val = kargs[arg]
+            key, op, negate = _select_test(arg, val, negate)
+            func = operator[op]
+            values, numbers, isnumber, present = index.column(key, rows)
+            todo = ~matched
+            if _numeric_test(op, val):
+                fast = todo & present & isnumber
+                matched[fast] = negate ^ _np_.asarray(func(numbers[fast], val), dtype=bool)
+                todo &= ~fast
+            for i in _np_.nonzero(todo)[0]:
+                if present[i]:
+                    test = negate ^ func(values[i], val)
+                else:
+                    f = members[i][1]
+                    test = key in f and negate ^ func(f[key], val)
+                if test:
+                    matched[i] = True
+        return [members[i][1] for i in _np_.nonzero(matched)[0]]
+
+    def __group_indexed(self, key):
+        """Yield each object with its value of *key* looked up from the metadata index for :py:meth:`baseFolder.group`.
+
+        Each object is loaded in full just once (grouping moves the objects, so a metadata only load isn't enough) and
+        only the values of *key* are read from the index.
+        """
+        index = self._metadata_index
+        members = []
+        for name in self.__names__():
+            x = self.__getter__(name)
+            if x is None:
+                continue
+            if index.stale(name, x):
+                index.update(name, x)
+            members.append((name, x))
+        names = [name for name, _ in members]
+        index.prune(names)
+        values, _, _, present = index.column(key, index.rows(names))
+        for (_, x), value, has_key in zip(members, values, present):
+            yield x, value if has_key else x.get(key, "None")
 
     def setdefault(self, k, d=None):
         """Return or set a subgroup or named object."""
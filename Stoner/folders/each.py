@@ -7,12 +7,41 @@ from inspect import ismethod
 import numpy as _np_
 from functools import wraps, partial
 from traceback import format_exc
-from .utils import get_pool
+from .utils import get_pool, release_pool
+from Stoner.compat import string_types
 from Stoner.tools import isiterable
 
 
+def _metadata_stub(d):
+    """Return a copy of a :py:class:`Stoner.Core.DataFile` with its metadata and column headers, but no data.
+
+    The copy is marked as only having the metadata, so that a :py:class:`Stoner.folders.mixins.DiskBasedFolder` will
+    load the whole file again when it is accessed. Other types of object are returned unchanged.
+    """
+    from Stoner.Core import DataFile
+
+    if not isinstance(d, DataFile):
+        return d
+    stub = d.__class__()
+    stub.metadata.update(d.metadata)
+    stub.filename = d.filename
+    stub._header_only(d.column_headers)
+    return stub
+
+
 def _worker(d, **kwargs):
-    """Support function to run an arbitary function over a :py:class:`Stoner.Data` object."""
+    """Support function to run an arbitary function over a :py:class:`Stoner.Data` object.
+
+    If the *load* keyword argument is given and *d* is a name, then *load(d)* is used to load the object first. In
+    this case the object is not sent back unless the *stub* keyword argument is True, when just its metadata is sent.
+    """
+    load = kwargs.get("load", None)
+    by_path = load is not None and isinstance(d, string_types)
+    if by_path:
+        try:
+            d = load(d)
+        except Exception as e:  # pylint: disable=broad-except
+            return (None, (e, format_exc()))
     byname = kwargs.get("byname", False)
     func = kwargs.get("func", lambda x: x)
     if byname:
@@ -31,6 +60,8 @@ def _worker(d, **kwargs):
             ret = func(d, *args, **kargs)
     except Exception as e:
         ret = e, format_exc()
+    if by_path:
+        d = _metadata_stub(d) if kwargs.get("stub", False) else None
     return (d, ret)
 
 
@@ -219,6 +250,13 @@ class item(object):
         # Ok that's the wrapper function, now return  it for the user to mess around with.
         return _wrapper_
 
+    def _to_send(self, name):
+        """Return the member of the folder to send to a worker - the object if it is loaded, otherwise its name."""
+        member = self._folder.__getter__(name, instantiate=None)
+        if isinstance(member, self._folder._type) and not getattr(member, "_metadata_only", False):
+            return self._folder._update_from_object_attrs(member)
+        return name
+
     def iter(self, func, *args, **kargs):
         """Iterate over the baseFolder, calling func on each item.
 
@@ -227,6 +265,8 @@ class item(object):
 
         Keyword Args:
             _return (None, bool or str): Controls how the return value from *func* is added to the DataFolder
+            _bypath (bool): Send the names of files that haven't been loaded yet to the workers, which load and process
+                them, rather than loading the whole folder first.
 
         Returns:
             A list of the results of evaluating *func* for each item in the folder.
@@ -236,32 +276,42 @@ class item(object):
             the return value replaces trhe original :py:class:`Stoner.Core.metadataobject` in the :py:class:`baseFolder`.
             If *_result* is True the return value is added to the :py:class:`Stoner.Core.metadataObject`'s metadata under the name
             of the function. If *_result* is a string. then return result is stored in the corresponding name.
+
+            With *_bypath* the files that weren't already loaded stay unloaded and only the return values of *func*
+            are sent back from the workers, so changes that *func* makes to these files are lost. If *_return* is set,
+            a copy of just the metadata of each file is kept to hold the return value and the data is loaded again when
+            the file is accessed. *_bypath* has no effect for folders that can't load their members from just the name
+            (e.g. zip or HDF5 folders).
         """
         _return = kargs.pop("_return", None)
         _byname = kargs.pop("_byname", False)
-        self._folder.fetch()  # Prefetch thefolder in case we can do it in parallel
+        load = getattr(self._folder, "_member_loader", lambda: None)() if kargs.pop("_bypath", False) else None
+        names = self._folder.__names__()
+        if load is None:
+            self._folder.fetch()  # Prefetch thefolder in case we can do it in parallel
+            source = self._folder
+        else:
+            source = (self._to_send(name) for name in names)
         p, imap = get_pool()
-        for ix, (f, ret) in enumerate(
-            imap(partial(_worker, func=func, args=args, kargs=kargs, byname=_byname), self._folder)
-        ):
+        worker = partial(
+            _worker, func=func, args=args, kargs=kargs, byname=_byname, load=load, stub=_return is not None
+        )
+        for ix, (f, ret) in enumerate(imap(worker, source)):
             new_d = f
             if self._folder.debug:
                 print(ix, type(ret))
             if isinstance(ret, self._folder._type) and _return is None:
                 try:  # Check if ret has same data type, otherwise will not overwrite well
-                    if ret.data.dtype != f.data.dtype:
+                    if f is not None and ret.data.dtype != f.data.dtype:
                         continue
-                    else:
-                        new_d = ret
+                    new_d = ret
                 except AttributeError:
                     pass
-            elif _return is not None:
+            elif _return is not None and new_d is not None:
                 if isinstance(_return, bool) and _return:
                     _return = func.__name__
                 new_d[_return] = ret
-            name = self._folder.__names__()[ix]
-            self._folder.__setter__(name, new_d)
+            if new_d is not None:
+                self._folder.__setter__(names[ix], new_d)
             yield ret
-        if p is not None:
-            p.close()
-            p.join()
+        release_pool(p)
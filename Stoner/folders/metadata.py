@@ -2,13 +2,183 @@
 """
 :py:mod:`Stoner.folders.metadata` provides classes and functions to support the :py:attr:`Stoner.DataFolder.metadata` magic attribute.
 """
-__all__ = ["proxy"]
-from Stoner.compat import string_types
+__all__ = ["proxy", "MetadataIndex"]
+from numbers import Real
+from Stoner.compat import string_types, int_types
 from Stoner.tools import islike_list, isiterable, all_type
 from Stoner.Core import DataFile
 import numpy as np
 from collections import MutableMapping
 from Stoner.core import typeHintedDict
+from Stoner.core.base import regexpDict
+
+
+def _as_number(value):
+    """Return *value* as a float if it can be compared exactly as one, otherwise None."""
+    if isinstance(value, bool) or not isinstance(value, Real):
+        return None
+    if isinstance(value, int_types) and abs(value) > 2 ** 53:  # Would lose precision as a float
+        return None
+    return float(value)
+
+
+class MetadataIndex(object):
+
+    """A columnar index of the metadata of the objects stored in a folder.
+
+    Each metadata key has a column made up of a list of the values, a float array of the values that are real numbers,
+    a boolean array marking which of those are numbers and a boolean array of which rows have the key at all. Rows are
+    allocated to the names of the objects in the folder as they are stored.
+
+    Notes:
+        The index is only a cache - each row remembers the metadata dictionary and the
+        :py:attr:`typeHintedDict.version` it was built from so that rows for objects whose metadata has been changed in
+        place can be rebuilt when the index is next used.
+    """
+
+    def __init__(self):
+        """Create an empty index."""
+        self.clear()
+
+    def __deepcopy__(self, memo):
+        """Copies of a folder get a new empty index as their objects will be copies too."""
+        return self.__class__()
+
+    def __getstate__(self):
+        """Don't pickle the index contents - just start again."""
+        return {}
+
+    def __setstate__(self, state):
+        """Restore an empty index."""
+        self.clear()
+
+    def clear(self):
+        """Remove all the rows from the index."""
+        self._rows = dict()  # name -> row
+        self._free = []  # rows that can be reused
+        self._sources = []  # row -> (metadata dictionary, version)
+        self._keys = []  # row -> set of keys present in the row
+        self._columns = dict()  # key -> [values, numbers, isnumber, present]
+        self._size = 0
+
+    def _grow(self):
+        """Double the number of rows available."""
+        size = max(16, 2 * self._size)
+        extra = size - self._size
+        self._sources.extend([None] * extra)
+        self._keys.extend([set() for _ in range(extra)])
+        self._free.extend(range(size - 1, self._size - 1, -1))
+        for column in self._columns.values():
+            column[0].extend([None] * extra)
+            for i, fill in zip(range(1, 4), (np.nan, False, False)):
+                column[i] = np.append(column[i], np.full(extra, fill, dtype=column[i].dtype))
+        self._size = size
+
+    def _column(self, key):
+        """Return the column for *key*, creating it if necessary."""
+        if key not in self._columns:
+            self._columns[key] = [
+                [None] * self._size,
+                np.full(self._size, np.nan),
+                np.zeros(self._size, dtype=bool),
+                np.zeros(self._size, dtype=bool),
+            ]
+        return self._columns[key]
+
+    def stale(self, name, obj):
+        """Check whether the row for *name* needs to be rebuilt from *obj*."""
+        row = self._rows.get(name, None)
+        if row is None:
+            return True
+        metadata = getattr(obj, "metadata", None)
+        source = self._sources[row]
+        return source[0] is not metadata or source[1] != getattr(metadata, "version", None)
+
+    def update(self, name, obj):
+        """Store the metadata of *obj* into the row for *name*.
+
+        If *obj* doesn't have any metadata then any existing row for *name* is removed.
+        """
+        metadata = getattr(obj, "metadata", None)
+        if not isinstance(metadata, regexpDict):
+            self.remove(name)
+            return
+        row = self._rows.get(name, None)
+        if row is not None and not self.stale(name, obj):
+            return
+        if row is None:
+            if not self._free:
+                self._grow()
+            row = self._free.pop()
+            self._rows[name] = row
+        keys = set()
+        for key in list(metadata.keys()):
+            value = super(regexpDict, metadata).__getitem__(key)
+            column = self._column(key)
+            column[0][row] = value
+            number = _as_number(value)
+            column[1][row] = np.nan if number is None else number
+            column[2][row] = number is not None
+            column[3][row] = True
+            keys.add(key)
+        for key in self._keys[row] - keys:  # Clear keys no longer present
+            self._clear_cell(key, row)
+        self._keys[row] = keys
+        self._sources[row] = (metadata, getattr(metadata, "version", None))
+
+    def _clear_cell(self, key, row):
+        """Mark *key* as missing from *row*."""
+        column = self._columns[key]
+        column[0][row] = None
+        column[1][row] = np.nan
+        column[2][row] = False
+        column[3][row] = False
+
+    def remove(self, name):
+        """Remove the row for *name* from the index if there is one."""
+        row = self._rows.pop(name, None)
+        if row is None:
+            return
+        for key in self._keys[row]:
+            self._clear_cell(key, row)
+        self._keys[row] = set()
+        self._sources[row] = None
+        self._free.append(row)
+
+    def prune(self, names):
+        """Remove all rows that are not for one of *names*."""
+        for name in set(self._rows.keys()) - set(names):
+            self.remove(name)
+
+    def rows(self, names):
+        """Return an array of the rows for *names*, which must all be in the index."""
+        return np.array([self._rows[name] for name in names], dtype=int)
+
+    def column(self, key, rows):
+        """Return the column for *key* for the given *rows*.
+
+        Args:
+            key (str): The exact metadata key.
+            rows (array of int): The rows to return.
+
+        Returns:
+            (values, numbers, isnumber, present): A list of the values, an array of those values as floats, and boolean
+            arrays of which values are numbers and which rows have the key.
+        """
+        if key not in self._columns:
+            missing = np.zeros(len(rows), dtype=bool)
+            return [None] * len(rows), np.full(len(rows), np.nan), missing, missing.copy()
+        values, numbers, isnumber, present = self._columns[key]
+        return [values[r] for r in rows], numbers[rows], isnumber[rows], present[rows]
+
+    def key_counts(self, rows):
+        """Return a dictionary of the number of the given *rows* that have each key."""
+        ret = dict()
+        for key, column in self._columns.items():
+            count = np.count_nonzero(column[3][rows])
+            if count:
+                ret[key] = count
+        return ret
 
 
 class proxy(MutableMapping):
@@ -26,7 +196,7 @@ class proxy(MutableMapping):
             for item in self._folder._metadata.items():
                 yield item
         else:
-            for item in self._folder:
+            for item in self._objects():
                 yield item.metadata
 
     @all.setter
@@ -42,20 +212,17 @@ class proxy(MutableMapping):
     @property
     def common_keys(self):
         """Return the set of metadata keys common to all objects int he Folder."""
-        if len(self._folder) > 0:
-            keys = set(self._folder[0].metadata.keys())
-            for d in self._folder:
-                keys &= set(d.metadata.keys())
-        else:
-            keys = set()
-        return sorted(list(keys))
+        names = [name for name, _ in self._folder._indexed_members()]
+        counts = self._folder._metadata_index.key_counts(self._folder._metadata_index.rows(names))
+        return sorted([k for k, count in counts.items() if count == len(names)])
 
     @property
     def common_metadata(self):
         """Return a dictionary of the common_keys that have common values."""
         output = typeHintedDict()
+        first = next(self._objects(), None)
         for key in self.common_keys:
-            val = self._folder[0][key]
+            val = first[key]
             if np.all(self[key] == val):
                 output[key] = val
         return output
@@ -102,14 +269,14 @@ class proxy(MutableMapping):
         for d in self._folder:
             d[key] = value
 
+    def _objects(self):
+        """Iterate over the objects in the folder, only loading their metadata if the folder supports it."""
+        return self._folder._iter_metadata()
+
     def all_keys(self):
         """Return the union of all the metadata keyus for all objects int he Folder."""
-        if len(self._folder) > 0:
-            keys = set(self._folder[0].metadata.keys())
-            for d in self._folder:
-                keys |= set(d.metadata.keys())
-        else:
-            keys = set()
+        names = [name for name, _ in self._folder._indexed_members()]
+        keys = set(self._folder._metadata_index.key_counts(self._folder._metadata_index.rows(names)).keys())
         for k in sorted(keys):
             yield k
 
@@ -219,9 +386,16 @@ class proxy(MutableMapping):
             for k in keys:
                 if k not in self.common_keys:
                     raise KeyError("{} is not a key in all members of the folder".format(k))
-        results = []
-        for d in self._folder:
-            results.append({k: d[k] for k in keys if k in d})
+        members = self._folder._indexed_members()
+        rows = self._folder._metadata_index.rows([name for name, _ in members])
+        results = [dict() for _ in members]
+        for k in keys:
+            values, _, _, present = self._folder._metadata_index.column(k, rows)
+            for i, ((_, d), value, has_key) in enumerate(zip(members, values, present)):
+                if has_key:
+                    results[i][k] = value
+                elif k in d:  # Not an exact key, so check for a regular expression match in the object
+                    results[i][k] = d[k]
 
         for r in results:  # Expand the results where a result contains a list
             for k in keys:
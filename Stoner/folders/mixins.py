@@ -7,9 +7,11 @@ __all__ = ["DiskBasedFolder", "DataMethodsMixin", "PlotMethodsMixin"]
 
 import os
 import os.path as path
+from collections import OrderedDict
 from functools import partial
-from numpy import mean, std, array, append, any as np_any, floor, sqrt, ceil
-from numpy.ma import masked_invalid
+from warnings import warn
+from numpy import mean, std, array, append, any as np_any, floor, sqrt, ceil, full, nan, arange, asarray
+from numpy.ma import masked_invalid, getdata
 from matplotlib.pyplot import figure, Figure, subplot, tight_layout
 from copy import deepcopy
 
@@ -19,8 +21,12 @@ from Stoner.tools import isiterable
 from Stoner.core.base import metadataObject, string_to_type
 from Stoner.core.exceptions import StonerUnrecognisedFormat
 from .core import baseFolder, __add_core__ as _base__add_core__, __sub_core__ as _base__sub_core__
-from .utils import scan_dir, discard_earlier, filter_files, get_pool, removeDisallowedFilenameChars
+from .each import _metadata_stub
+from .utils import scan_dir, discard_earlier, filter_files, get_pool, release_pool, pool_apply
+from .utils import removeDisallowedFilenameChars
+from .utils import get_cached_format, set_cached_format, save_format_cache
 from Stoner.core.exceptions import assertion
+from Stoner.analysis.fitting import lmfit_jacobian, prep_lmfit_model, prep_lmfit_p0
 
 regexp_type = (_pattern_type,)
 
@@ -48,10 +54,129 @@ def __sub_core__(result, other):
     return _base__sub_core__(result, other)
 
 
-def _loader(name, loader=None, typ=None, directory=None):
-    """Lods and returns an object."""
+def _is_datafile_loader(loader):
+    """Check whether *loader* is a :py:class:`Stoner.Core.DataFile` that can be told which format to load."""
+    from Stoner.Core import DataFile
+
+    return isinstance(loader, type) and issubclass(loader, DataFile)
+
+
+def _load_format(loader, filename, format_cache=False, **kargs):
+    """Load *filename* with *loader*, trying the file format remembered in the format cache first.
+
+    Args:
+        loader (callable): The class used to load the file.
+        filename (str): The file to load.
+
+    Keyword Arguments:
+        format_cache (bool): Whether to look the file up in the format cache.
+        **kargs: Other keyword arguments are passed to *loader*.
+
+    Returns:
+        (metadataObject): The loaded object.
+    """
+    if format_cache and _is_datafile_loader(loader):
+        filetype = get_cached_format(filename)
+        if filetype is not None:
+            try:
+                return loader(filename, filetype=filetype, **kargs)
+            except Exception:  # pylint: disable=broad-except
+                pass  # Cache was wrong, so fall back to the guessing the format
+    return loader(filename, **kargs)
+
+
+def _remember_format(filename, obj):
+    """Store the class that loaded *filename* into *obj* in the format cache."""
+    from Stoner.Core import DataFile
+
+    filetype = obj.get("Loaded as", None) if hasattr(obj, "get") else None
+    if filetype not in DataFile.subclasses:
+        filetype = None
+    set_cached_format(filename, filetype)
+
+
+def _loader(name, loader=None, typ=None, directory=None, format_cache=False, process=None):
+    """Lods and returns an object.
+
+    If *process* is a dictionary, then :py:func:`_on_load_process` is run on the object with *process* as its
+    keyword arguments before it is returned, so that a worker does the load time processing as well as the loading.
+    """
+    filename = name if path.exists(name) else path.join(directory, name)
+    tmp = typ(_load_format(loader, filename, format_cache))
+    if process is not None:
+        tmp = _on_load_process(tmp, **process)
+    return tmp, name
+
+
+def _member_nbytes(obj):
+    """Estimate the memory used by a loaded member of a folder from the size of its data."""
+    data = getattr(obj, "data", None)
+    return int(getattr(data, "nbytes", 0)) + int(getattr(getattr(data, "mask", None), "nbytes", 0))
+
+
+def _on_load_process(tmp, pattern=(), read_means=False):
+    """Set the metadata from the filename patterns and the column means of a newly loaded file.
+
+    Args:
+        tmp (metadataObject): The newly loaded object.
+
+    Keyword Arguments:
+        pattern (list of str or regular expressions): The folder's patterns - named groups in regular expressions that
+            match the filename are stored in the metadata.
+        read_means (bool): Store the mean and standard deviation of each column in the metadata.
+
+    Returns:
+        (metadataObject): The updated object.
+    """
+    for p in pattern:
+        if isinstance(p, _pattern_type) and (p.search(tmp.filename) is not None):
+            m = p.search(tmp.filename)
+            for k in m.groupdict():
+                tmp.metadata[k] = string_to_type(m.group(k))
+    if read_means:  # Add mean and standard deviations to the metadata
+        if len(tmp) == 0:
+            pass
+        elif len(tmp) == 1:
+            for h in tmp.column_headers:
+                tmp[h] = tmp.column(h)[0]
+                tmp["{}_stdev".format(h)] = None
+        else:
+            for h in tmp.column_headers:
+                try:
+                    tmp[h] = mean(masked_invalid(tmp.column(h)))
+                    tmp["{}_stdev".format(h)] = std(masked_invalid(tmp.column(h)))
+                except ValueError:
+                    continue
+    tmp["Loaded from"] = tmp.filename
+    return tmp
+
+
+def _load_member(name, loader=None, typ=None, directory=None, extra_args=None, format_cache=False, **kargs):
+    """Load a member of a folder from disc in the same way as :py:meth:`DiskBasedFolder.__getter__`.
+
+    This is used by worker processes that are only sent the name of the file, so everything it needs from the folder
+    is passed in as keyword arguments.
+
+    Args:
+        name (str): The name of the member in the folder.
+
+    Keyword Arguments:
+        loader, typ, directory, extra_args, format_cache: The folder's loader, type, directory, extra_args and
+            format_cache attributes.
+        pattern, read_means: The folder's attributes used by :py:func:`_on_load_process`.
+        attrs (dict): Attributes to set on the loaded object.
+
+    Returns:
+        (metadataObject): The loaded object.
+    """
     filename = name if path.exists(name) else path.join(directory, name)
-    return typ(loader(filename)), name
+    tmp = typ(_load_format(loader, filename, format_cache, **(extra_args or {})))
+    if not isinstance(getattr(tmp, "filename", None), string_types):
+        tmp.filename = path.basename(filename)
+    tmp = _on_load_process(tmp, kargs.get("pattern", ()), kargs.get("read_means", False))
+    for k, value in kargs.get("attrs", {}).items():
+        setattr(tmp, k, value)
+    return tmp
 
 
 class DiskBasedFolder(object):
@@ -84,6 +209,25 @@ class DiskBasedFolder(object):
         multifile (boo): Whether to select individual files manually that are not (necessarily) in  a common directory structure.
 
         readlist (bool): Whether to read the directory immediately on creation. Default is True
+
+        format_cache (bool): If True, remember which :py:class:`Stoner.Core.DataFile` subclass loaded each file and use
+            that class directly next time the file is loaded. The formats are kept in the load cache directory (see
+            :py:func:`Stoner.core.cache.cache_dir`), not in the data directories. Entries are ignored if the file's
+            size or modification time have changed. The cache is written after :py:meth:`DiskBasedFolder.fetch` or
+            iterating over the folder, and when Python exits. Default is False.
+
+        metadata_only (bool): If True, queries of the folder's metadata and :py:meth:`DiskBasedFolder.select` only load
+            the metadata of files that haven't been loaded yet. The data is loaded when the file is accessed. This has
+            no effect if *read_means* is set. Default is False.
+
+        cache_size (int): The maximum number of files to keep loaded, 0 (the default) for no limit. When the limit is
+            reached, the least recently used file is unloaded, keeping a copy of just its metadata (for
+            :py:class:`Stoner.Core.DataFile` types) so that it is loaded again when it is next accessed. Changes made to
+            the data of the unloaded file are lost.
+
+        cache_bytes (int): The maximum number of bytes of data to keep loaded, 0 (the default) for no limit. Files are
+            unloaded as for *cache_size*. The size of each file is estimated from the size of its data array.
+            :py:attr:`DiskBasedFolder.cache_stats` gives the number of hits, misses and evictions.
     """
 
     _defaults = {
@@ -100,6 +244,10 @@ class DiskBasedFolder(object):
         "pruned": True,
         "readlist": True,
         "discard_earlier": False,
+        "format_cache": False,
+        "metadata_only": False,
+        "cache_size": 0,
+        "cache_bytes": 0,
     }
 
     def __init__(self, *args, **kargs):
@@ -207,31 +355,74 @@ class DiskBasedFolder(object):
         Keyword Arguments:
             instatiate (bool): IF True (default) then always return a :py:class:`Stoner.Core.Data` object. If False,
                 the __getter__ method may return a key that can be used by it later to actually get the
-                :py:class:`Stoner.Core.Data` object.
+                :py:class:`Stoner.Core.Data` object. If "metadata" and *metadata_only* is set, then a file that
+                hasn't been loaded yet is only loaded as far as its metadata.
 
         Returns:
             (metadataObject): The metadataObject
         """
         assertion(name is not None, "Cannot get an anonympus entry!")
+        stub = None
+        metadata_only = instantiate == "metadata" and self.metadata_only and not self.read_means
+        metadata_only = metadata_only and _is_datafile_loader(self.loader)
         try:  # Try the parent methods first
-            return super(DiskBasedFolder, self).__getter__(name, instantiate=instantiate)
+            tmp = super(DiskBasedFolder, self).__getter__(name, instantiate=instantiate)
+            if metadata_only or not instantiate or not getattr(tmp, "_metadata_only", False):
+                if instantiate is True:
+                    self._cache_hit(name)
+                return tmp
+            stub = tmp
+            name = self.__lookup__(name)  # Only have the metadata so far, so load the whole file
         except (AttributeError, IndexError, KeyError):
             pass
         # Find a filename and load
         fname = name if path.exists(name) else path.join(self.directory, name)
+        extra_args = dict(self.extra_args)
+        if metadata_only:
+            extra_args["metadata_only"] = True
         try:
-            tmp = self.type(self.loader(fname, **self.extra_args))
+            tmp = self.type(_load_format(self.loader, fname, self.format_cache, **extra_args))
         except StonerUnrecognisedFormat:
             return None
+        if self.format_cache and _is_datafile_loader(self.loader):
+            _remember_format(fname, tmp)  # Written out by fetch, at the end of iterating or at exit
         if not isinstance(getattr(tmp, "filename", None), string_types):
             tmp.filename = path.basename(fname)
         # Process file hooks
         tmp = self.on_load_process(tmp)
         tmp = self._update_from_object_attrs(tmp)
+        if stub is not None:  # Keep any metadata that was added to the metadata only copy
+            tmp.metadata.update(stub.metadata)
+        if not metadata_only:
+            self._cache_counters()["misses"] += 1
         # Store the result
         self.__setter__(name, tmp)
         return tmp
 
+    def __setter__(self, name, value, force_insert=False):
+        """Store a member, keeping track of loaded members for the *cache_size* and *cache_bytes* limits."""
+        super(DiskBasedFolder, self).__setter__(name, value, force_insert=force_insert)
+        lru = self._cache_lru()
+        lru.pop(name, None)
+        if isinstance(value, self._type) and not getattr(value, "_metadata_only", False):
+            lru[name] = _member_nbytes(value)
+            self._cache_evict()
+
+    def __deleter__(self, ix):
+        """Forget deleted members in the cache as well."""
+        name = self.__lookup__(ix)
+        super(DiskBasedFolder, self).__deleter__(ix)
+        self._cache_lru().pop(name, None)
+
+    def __next__(self):
+        """Iterate over the objects, writing the format cache once at the end rather than after every file."""
+        try:
+            for member in super(DiskBasedFolder, self).__next__():
+                yield member
+        finally:
+            if self.format_cache:
+                save_format_cache()
+
     def __add__(self, other):
         """Implement the addition operator for baseFolder and metadataObjects."""
         result = deepcopy(self)
@@ -272,13 +463,115 @@ class DiskBasedFolder(object):
         """Just alias directory to root now."""
         self.root = value
 
+    @property
+    def cache_stats(self):
+        """A dictionary of the number and size in bytes of the loaded files and the cache hits, misses and evictions.
+
+        A hit is an access to a file that was already loaded, a miss one that had to be loaded from disc and an
+        eviction the unloading of a file to keep within the *cache_size* and *cache_bytes* limits.
+        """
+        lru = self._cache_lru()
+        stats = {"loaded": len(lru), "bytes": sum(lru.values())}
+        stats.update(self._cache_counters())
+        return stats
+
     @property
     def not_loaded(self):
         """Return an array of True/False for whether we've loaded a metadataObject yet."""
         for n in self.__names__():
-            if not isinstance(self.__getter__(n, instantiate=None), self._type):
+            member = self.__getter__(n, instantiate=None)
+            if not isinstance(member, self._type) or getattr(member, "_metadata_only", False):
                 yield n
 
+    def _cache_lru(self):
+        """Return the map of loaded member names to their sizes, least recently used first."""
+        if not isinstance(self.__dict__.get("_lru"), OrderedDict):
+            self._lru = OrderedDict()
+        return self._lru
+
+    def _cache_counters(self):
+        """Return the dictionary of cache hit, miss and eviction counts."""
+        if not isinstance(self.__dict__.get("_cache_counts"), dict):
+            self._cache_counts = {"hits": 0, "misses": 0, "evictions": 0}
+        return self._cache_counts
+
+    def _cache_hit(self, name):
+        """Record that a loaded member was accessed."""
+        lru = self._cache_lru()
+        if not lru:
+            return
+        if name not in lru:  # Not the canonical name
+            try:
+                name = self.__lookup__(name)
+            except (IndexError, KeyError, TypeError):
+                return
+        if name in lru:
+            lru.move_to_end(name)
+            self._cache_counters()["hits"] += 1
+
+    def _cache_evict(self):
+        """Unload the least recently used members until the folder is within the *cache_size* and *cache_bytes* limits.
+
+        The most recently used member is never unloaded. Members of :py:class:`Stoner.Core.DataFile` types are
+        replaced by a copy of their metadata, which :py:meth:`DiskBasedFolder.__getter__` loads again in full, other
+        members by their name.
+        """
+        size = getattr(self, "cache_size", 0)
+        nbytes = getattr(self, "cache_bytes", 0)
+        if not size and not nbytes:
+            return
+        lru = self._cache_lru()
+        total = sum(lru.values())
+        stubs = type(self).__getter__ is DiskBasedFolder.__getter__
+        while len(lru) > 1 and ((size and len(lru) > size) or (nbytes and total > nbytes)):
+            name, member_bytes = lru.popitem(last=False)
+            total -= member_bytes
+            try:
+                member = super(DiskBasedFolder, self).__getter__(name, instantiate=None)
+            except (AttributeError, IndexError, KeyError):
+                continue
+            stub = _metadata_stub(member) if stubs else member
+            super(DiskBasedFolder, self).__setter__(name, name if stub is member else stub)
+            self._cache_counters()["evictions"] += 1
+
+    def _member_loader(self, process=True):
+        """Return a picklable function that loads a member of the folder from its name, or None if this isn't possible.
+
+        Keyword Arguments:
+            process (bool): If False, the function only loads the file and leaves :py:meth:`on_load_process` and the
+                folder's object attributes to the caller.
+
+        Folders that override :py:meth:`DiskBasedFolder.__getter__` (e.g. to read from inside a zip or HDF5 file) or
+        :py:meth:`DiskBasedFolder.on_load_process` can't have their members loaded without the folder itself.
+        """
+        cls = type(self)
+        if cls.__getter__ is not DiskBasedFolder.__getter__ or (
+            process and cls.on_load_process is not DiskBasedFolder.on_load_process
+        ):
+            return None
+        if not process:
+            return partial(
+                _load_member,
+                loader=self.loader,
+                typ=self.type,
+                directory=self.directory,
+                extra_args=dict(self.extra_args),
+                format_cache=self.format_cache and _is_datafile_loader(self.loader),
+            )
+        attrs = {k: v for k, v in self.kargs.items() if hasattr(self.instance, k)}
+        attrs.update(getattr(self, "_object_attrs", {}))
+        return partial(
+            _load_member,
+            loader=self.loader,
+            typ=self.type,
+            directory=self.directory,
+            extra_args=dict(self.extra_args),
+            format_cache=self.format_cache and _is_datafile_loader(self.loader),
+            pattern=list(self.pattern),
+            read_means=self.read_means,
+            attrs=attrs,
+        )
+
     @property
     def pattern(self):
         """Provide support for getting the pattern attribute."""
@@ -301,18 +594,32 @@ class DiskBasedFolder(object):
     def fetch(self):
         """Preload the contents of the DiskbasedFolder.
 
-        With multiprocess enabled this will parallel load the contents of the folder into memory.
+        With multiprocess enabled this will parallel load the contents of the folder into memory. The filename
+        patterns and *read_means* processing are also done by the workers, unless a subclass has its own
+        :py:meth:`DiskBasedFolder.on_load_process`, which is then run here as each file arrives.
         """
         p, imap = get_pool()
+        format_cache = self.format_cache and _is_datafile_loader(self.loader)
+        process = None
+        if type(self).on_load_process is DiskBasedFolder.on_load_process:
+            process = {"pattern": list(self.pattern), "read_means": self.read_means}
         for (f, name) in imap(
-            partial(_loader, loader=self.loader, typ=self._type, directory=self.directory), self.not_loaded
+            partial(
+                _loader,
+                loader=self.loader,
+                typ=self._type,
+                directory=self.directory,
+                format_cache=format_cache,
+                process=process,
+            ),
+            self.not_loaded,
         ):
-            self.__setter__(
-                name, self.on_load_process(f)
-            )  # This doesn't run on_load_process in parallel, but it's not expensive enough to make it worth it.
-        if p is not None:
-            p.close()
-            p.join()
+            if format_cache:  # Only update the cache in this process to avoid clashing writes
+                _remember_format(name if path.exists(name) else path.join(self.directory, name), f)
+            self.__setter__(name, f if process is not None else self.on_load_process(f))
+        release_pool(p)
+        if format_cache:
+            save_format_cache()
         return self
 
     def getlist(self, **kargs):
@@ -365,6 +672,83 @@ class DiskBasedFolder(object):
             self.flatten()
         return self
 
+    def _prefetch_loader(self):
+        """Return a picklable function that loads a member from its name for :py:meth:`iter_prefetch`.
+
+        The function only reads the file - :py:meth:`on_load_process` is run when the member is stored. None is
+        returned if the folder's members can't be loaded without the folder itself.
+        """
+        return self._member_loader(process=False)
+
+    def _store_prefetched(self, name, tmp):
+        """Process and store a member loaded by :py:meth:`DiskBasedFolder.iter_prefetch` as the __getter__ would."""
+        stub = super(DiskBasedFolder, self).__getter__(name, instantiate=None)
+        plain = type(self).__getter__ is DiskBasedFolder.__getter__
+        if plain and self.format_cache and _is_datafile_loader(self.loader):
+            _remember_format(name if path.exists(name) else path.join(self.directory, name), tmp)
+        tmp = self._update_from_object_attrs(self.on_load_process(tmp))
+        if isinstance(stub, self._type) and getattr(stub, "_metadata_only", False):
+            tmp.metadata.update(stub.metadata)
+        self._cache_counters()["misses"] += 1
+        self.__setter__(name, tmp)
+        return tmp
+
+    def iter_prefetch(self, depth=4):
+        """Iterate over the folder, loading the next *depth* files in the background while each one is used.
+
+        Keyword Arguments:
+            depth (int): How many files to load ahead of the current one.
+
+        Yields:
+            (metadataObject): Each member of the folder in turn, as when iterating over the folder.
+
+        Notes:
+            The files are read by the pool of workers from :py:func:`Stoner.folders.utils.get_pool`, so the
+            *multiprocessing* and *threading* options choose between threads, processes or reading each file when it
+            is reached. The workers only read the files - :py:meth:`on_load_process` is run and the file is stored in
+            the folder by the calling thread as each one is reached, so the folder is never changed from two threads at
+            once. If *cache_size* is set it should be larger than *depth*, otherwise files may be unloaded again before
+            they are reached.
+        """
+        names = self.__names__()
+        depth = max(int(depth), 1)
+        load = self._prefetch_loader()
+        p = get_pool()[0] if load is not None else None
+        pending = {}
+
+        def _start(name):
+            """Start loading a member in the background unless it is already loaded."""
+            member = super(DiskBasedFolder, self).__getter__(name, instantiate=None)
+            if isinstance(member, self._type) and not getattr(member, "_metadata_only", False):
+                return None
+            return pool_apply(p, load, name)
+
+        try:
+            for ix, name in enumerate(names):
+                if p is not None:
+                    for ahead in range(ix, min(ix + depth + 1, len(names))):
+                        if ahead not in pending:
+                            pending[ahead] = _start(names[ahead])
+                result = pending.pop(ix, None)
+                member = None
+                if result is not None:
+                    try:
+                        member = self._store_prefetched(name, result.get())
+                    except Exception:  # pylint: disable=broad-except
+                        member = None  # Let __getter__ deal with files that can't be loaded
+                if member is None:
+                    member = self.__getter__(name, instantiate=True)
+                if member is None:
+                    continue
+                yield member
+        finally:
+            for result in pending.values():  # Don't hand the pool back with loads still running
+                if result is not None:
+                    result.wait()
+            release_pool(p)
+            if self.format_cache:
+                save_format_cache()
+
     def keep_latest(self):
         """Filter out earlier revisions of files with the same name.
 
@@ -384,27 +768,7 @@ class DiskBasedFolder(object):
 
     def on_load_process(self, tmp):
         """Carry out processing on a newly loaded file to set means and extra metadata."""
-        for p in self.pattern:
-            if isinstance(p, _pattern_type) and (p.search(tmp.filename) is not None):
-                m = p.search(tmp.filename)
-                for k in m.groupdict():
-                    tmp.metadata[k] = string_to_type(m.group(k))
-        if self.read_means:  # Add mean and standard deviations to the metadata
-            if len(tmp) == 0:
-                pass
-            elif len(tmp) == 1:
-                for h in tmp.column_headers:
-                    tmp[h] = tmp.column(h)[0]
-                    tmp["{}_stdev".format(h)] = None
-            else:
-                for h in tmp.column_headers:
-                    try:
-                        tmp[h] = mean(masked_invalid(tmp.column(h)))
-                        tmp["{}_stdev".format(h)] = std(masked_invalid(tmp.column(h)))
-                    except ValueError:
-                        continue
-        tmp["Loaded from"] = tmp.filename
-        return tmp
+        return _on_load_process(tmp, self.pattern, self.read_means)
 
     def save(self, root=None):
         """Save the entire data folder out to disc using the groups as a directory tree,
@@ -436,6 +800,50 @@ class DiskBasedFolder(object):
         return self
 
 
+def _fit_all_one(task, setup):
+    """Fit a model to the data from one file for :py:meth:`DataMethodsMixin.fit_all`.
+
+    Args:
+        task (tuple):
+            The position of the file in the folder, its (x, y, sigma) arrays, the scale_covar flag and a dictionary
+            of parameter values to start from (or None).
+
+        setup (tuple):
+            The lmfit model, the initial guess, the parameter values given as keywords and other keyword arguments
+            for the fit.
+
+    Returns:
+        (tuple):
+            The position of the file and either a dictionary of the fit results or the exception that stopped the fit.
+    """
+    model, p0, overrides, kargs = setup
+    ix, (xdata, ydata, sigma), scale_covar, start = task
+    try:
+        params, _ = prep_lmfit_p0(model, ydata, xdata, p0, dict(overrides))
+        if start is not None:  # Warm start from the previous fit
+            params = deepcopy(params)
+            for name, value in start.items():
+                params[name].value = value
+        kargs = dict(kargs)
+        kargs[model.independent_vars[0]] = xdata
+        lmfit_jacobian(model, params, kargs)
+        fit = model.fit(ydata, params, scale_covar=scale_covar, weights=1.0 / sigma, **kargs)
+    except Exception as err:  # pylint: disable=broad-except
+        return ix, err
+    if not fit.success:
+        return ix, RuntimeError(fit.message)
+    return (
+        ix,
+        {
+            "values": {name: fit.params[name].value for name in model.param_names},
+            "errors": {name: fit.params[name].stderr for name in model.param_names},
+            "chi-square": fit.chisqr,
+            "red. chi-sqr": fit.redchi,
+            "nfev": fit.nfev,
+        },
+    )
+
+
 class DataMethodsMixin(object):
 
     """A mixin class that provides a :py:class:`Stoner.folders.core.baseFolder` with methods for working with :py:class:`Stoner.Data` objects.
@@ -524,6 +932,94 @@ class DataMethodsMixin(object):
 
         return ret.walk_groups(_extractor, group=True, replace_terminal=True, walker_args={"metadata": metadata})
 
+    def fit_all(self, model, xcol=None, ycol=None, sigma=None, p0=None, **kargs):
+        r"""Fit the same lmfit model to every file in the folder and return a table of the results.
+
+        Args:
+            model (lmfit.Model, lmfit.Model subclass or callable):
+                The model to fit to each file.
+
+        Keyword Arguments:
+            xcol, ycol (index or None):
+                Columns of x and y data. Default to the setas attributes of each file.
+            sigma (index or None):
+                Column of y errors. Defaults to the setas error column, if any, of each file.
+            p0 (list, array, lmfit.Parameters, callable or None):
+                The initial guess for every file, as for :py:meth:`Stoner.Data.lmfit`. None uses the model's guess.
+            bounds (callable):
+                Selects the rows of each file to fit, as for :py:meth:`Stoner.Data.lmfit`.
+            absolute_sigma, scale_covar (bool):
+                As for :py:meth:`Stoner.Data.lmfit`.
+            warm_start (bool):
+                Start each fit from the results of the previous file (default False). The files are then fitted in
+                order, without a pool of workers.
+
+        Returns:
+            (Stoner.Data):
+                A row for each file with its position in the folder, the value and error of each parameter,
+                :math:`\chi^2`, the reduced :math:`\chi^2` and the number of function evaluations. The *filenames*
+                metadata lists the files. A fit that fails gives a row of nans and a warning.
+
+        Notes:
+            Parameter names given as keyword arguments set initial values as for :py:meth:`Stoner.Data.lmfit`. Other
+            keyword arguments are passed to the model's fit method.
+
+            The files are fitted with the pool of workers from :py:func:`Stoner.folders.utils.get_pool`, so the
+            *multiprocessing*, *threading* and *pool_...* options (see :py:func:`Stoner.set_option`) choose whether
+            and how the fits run in parallel, as they do for loading the files. The model is prepared once and sent to
+            the workers with the x, y and sigma arrays of each file.
+        """
+        bounds = kargs.pop("bounds", lambda x, y: True)
+        absolute_sigma = kargs.pop("absolute_sigma", True)
+        scale_covar = kargs.pop("scale_covar", not absolute_sigma)
+        warm_start = kargs.pop("warm_start", False)
+        model, _ = prep_lmfit_model(model, kargs)
+        overrides = {name: kargs.pop(name) for name in model.param_names if name in kargs}
+        setup = (model, p0, overrides, kargs)
+
+        tasks = []
+        filenames = []
+        for ix, d in enumerate(self):
+            data, covar, _ = d._assemnle_data_to_fit(xcol, ycol, sigma, bounds, scale_covar)
+            tasks.append((ix, tuple(asarray(getdata(a), dtype=float) for a in data[:3]), covar, None))
+            filenames.append(d.filename)
+
+        results = [None] * len(tasks)
+        if warm_start:
+            start = None
+            for task in tasks:
+                ix, results[ix] = _fit_all_one(task[:3] + (start,), setup)
+                if isinstance(results[ix], dict):
+                    start = results[ix]["values"]
+        else:
+            p, imap = get_pool()
+            try:
+                for ix, result in imap(partial(_fit_all_one, setup=setup), tasks):
+                    results[ix] = result
+            finally:
+                release_pool(p)
+
+        headers = ["Index"]
+        for name in model.param_names:
+            headers.extend([name, "d_{}".format(name)])
+        headers.extend(["chi-square", "red. chi-sqr", "nfev"])
+        table = full((len(tasks), len(headers)), nan)
+        table[:, 0] = arange(len(tasks))
+        for ix, result in enumerate(results):
+            if not isinstance(result, dict):
+                warn("Fitting {} failed: {}".format(filenames[ix], result))
+                continue
+            row = []
+            for name in model.param_names:
+                error = result["errors"][name]
+                row.extend([result["values"][name], nan if error is None else error])
+            table[ix, 1:] = row + [result["chi-square"], result["red. chi-sqr"], result["nfev"]]
+        ret = self.type(table)
+        ret.column_headers = headers
+        ret.setas = "x" + "ye" * len(model.param_names)
+        ret["filenames"] = filenames
+        return ret
+
     def gather(self, xcol=None, ycol=None):
         """Collects xy and y columns from the subfiles in the final group in the tree and builds iunto a :py:class:`Stoner.Core.metadataObject`
 
@@ -11,16 +11,29 @@ __all__ = [
     "discard_earlier",
     "filter_files",
     "get_pool",
+    "release_pool",
+    "pool_apply",
+    "shutdown_pool",
     "removeDisallowedFilenameChars",
+    "FORMAT_CACHE",
+    "get_cached_format",
+    "set_cached_format",
+    "save_format_cache",
 ]
+import atexit
 import os.path as path
 import os
 import re
+import json
 import string
+import threading
 from collections import OrderedDict
+from functools import partial
 from Stoner.compat import string_types, _pattern_type
-from Stoner.tools import get_option
+from Stoner.tools import get_option, set_option, _options
+from Stoner.core.cache import cache_dir
 import fnmatch
+import hashlib
 from numpy import array
 import itertools
 from multiprocessing.pool import ThreadPool
@@ -110,19 +123,80 @@ def filter_files(files, patterns, keep=True):
     return files
 
 
+# The shared pool and the (threading, workers) options it was created with, see get_pool()
+_shared_pool = {"pool": None, "key": None}
+_pool_lock = threading.Lock()
+
+
+def _indexed_call(func, item):
+    """Call func on the second part of an (index, argument) pair and return the index with the result."""
+    ix, arg = item
+    return ix, func(arg)
+
+
+def _call_with_options(options, func, item):
+    """Set the package options sent with an item in a worker process and then call func on the item."""
+    for name, value in options.items():
+        if get_option(name) != value:
+            set_option(name, value)
+    return func(item)
+
+
+def _ordered_imap(pool, chunksize, send_options, func, iterable):
+    """Map func over iterable with pool.imap_unordered, but yield the results in the order of iterable.
+
+    Results that arrive early are held until all the earlier ones have been yielded, so the workers are never left
+    idle waiting for a slow item while later ones are finished. If *send_options* is True then the package options are
+    sent with the items, so that worker processes see options that were set after they started.
+    """
+    if send_options:
+        func = partial(_call_with_options, dict(_options), func)
+    pending = {}
+    next_ix = 0
+    for ix, result in pool.imap_unordered(partial(_indexed_call, func), enumerate(iterable), chunksize):
+        pending[ix] = result
+        while next_ix in pending:
+            yield pending.pop(next_ix)
+            next_ix += 1
+
+
+def _new_pool(threads, workers):
+    """Create a ThreadPool or a process Pool with the given number of workers (0 for the default)."""
+    if threads:
+        return ThreadPool(processes=workers or int(multiprocessing.cpu_count() - 1))
+    return multiprocessing.Pool(workers or int(multiprocessing.cpu_count() / 2))
+
+
 def get_pool():
     """Utility method to get a Pool and map implementation depending on options.
 
     Returns:
         Pool(),map: Pool object if possible and map implementation.
+
+    Notes:
+        The *threading* option chooses between a pool of threads and a pool of processes and the *pool_workers* option
+        sets the number of workers (0 for one less than the number of cpus for threads or half the number of cpus for
+        processes). If the *pool_persistent* option is set then the pool is created the first time it is needed and
+        then shared by all folders until the options change or the interpreter exits, otherwise a new pool is created
+        for each call. The map implementation sends *pool_chunksize* items at a time to the workers and yields the
+        results in order. The package options are sent to worker processes with the items, so a persistent pool
+        follows changes made with :py:func:`Stoner.set_option`. Pools should be handed back with
+        :py:func:`release_pool` rather than closed directly.
     """
     if get_option("multiprocessing"):
+        key = (get_option("threading"), get_option("pool_workers"))
         try:
-            if get_option("threading"):
-                p = ThreadPool(processes=int(multiprocessing.cpu_count() - 1))
+            if get_option("pool_persistent"):
+                with _pool_lock:
+                    if _shared_pool["key"] != key:
+                        shutdown_pool()
+                    if _shared_pool["pool"] is None:
+                        _shared_pool["pool"] = _new_pool(*key)
+                        _shared_pool["key"] = key
+                    p = _shared_pool["pool"]
             else:
-                p = multiprocessing.Pool(int(multiprocessing.cpu_count() / 2))
-            imap = p.imap
+                p = _new_pool(*key)
+            imap = partial(_ordered_imap, p, max(get_option("pool_chunksize"), 1), not key[0])
         except (ArithmeticError, AttributeError, LookupError, RuntimeError, NameError, OSError, TypeError, ValueError):
             # Fallback to non-multiprocessing if necessary
             p = None
@@ -133,6 +207,50 @@ def get_pool():
     return p, imap
 
 
+def release_pool(p):
+    """Hand back a pool from :py:func:`get_pool`, closing it unless it is the shared persistent pool.
+
+    Args:
+        p (Pool or None): The pool returned by :py:func:`get_pool`.
+    """
+    if p is not None and p is not _shared_pool["pool"]:
+        p.close()
+        p.join()
+
+
+def pool_apply(p, func, item):
+    """Start calling func on a single item with a pool from :py:func:`get_pool` without waiting for the result.
+
+    Args:
+        p (Pool): The pool returned by :py:func:`get_pool`.
+        func (callable): A picklable function of one argument.
+        item: The argument to call *func* with.
+
+    Returns:
+        (AsyncResult): The pending result of the call.
+
+    Notes:
+        As with the map from :py:func:`get_pool`, the package options are sent with the item to worker processes.
+    """
+    if not isinstance(p, ThreadPool):
+        func = partial(_call_with_options, dict(_options), func)
+    return p.apply_async(func, (item,))
+
+
+def shutdown_pool():
+    """Stop the shared persistent pool if it has been created.
+
+    A new pool will be created the next time :py:func:`get_pool` needs one. This is called automatically when the
+    interpreter exits.
+    """
+    p = _shared_pool["pool"]
+    _shared_pool["pool"] = None
+    _shared_pool["key"] = None
+    if p is not None:
+        p.terminate()
+        p.join()
+
+
 def removeDisallowedFilenameChars(filename):
     """Utility method to clean characters in filenames
 
@@ -144,3 +262,113 @@ def removeDisallowedFilenameChars(filename):
     """
     validFilenameChars = "-_.() %s%s" % (string.ascii_letters, string.digits)
     return "".join([c for c in filename if c in validFilenameChars])
+
+
+#: FORMAT_CACHE (str): Name, in the cache directory, of the file that remembers which :py:class:`Stoner.Core.DataFile`
+#: subclass loaded each file of a directory. The placeholder is filled with a hash of the directory's path.
+FORMAT_CACHE = "formats_{}.json"
+
+# Map of cache filename to [mtime of cache file, dirty flag, {basename:[size,mtime,class name]}, data directory]
+_format_caches = {}
+
+
+def _file_stamp(filename):
+    """Return the [size, mtime] pair used to decide whether a cached file format is still valid."""
+    stat = os.stat(filename)
+    return [stat.st_size, stat.st_mtime]
+
+
+def _format_cache(filename):
+    """Return the in-memory copy of the format cache for the directory containing *filename*.
+
+    The format caches are kept in the directory returned by :py:func:`Stoner.core.cache.cache_dir` so that nothing is
+    written into the data directories. A cache file is only re-read if it has changed on disc since it was last read.
+    """
+    directory = path.dirname(path.realpath(filename))
+    key = hashlib.sha1(directory.encode("utf-8", "surrogateescape")).hexdigest()
+    cache_file = path.join(cache_dir(), FORMAT_CACHE.format(key))
+    try:
+        stamp = os.stat(cache_file).st_mtime
+    except OSError:
+        stamp = None
+    entry = _format_caches.get(cache_file)
+    if entry is None or (entry[0] != stamp and not entry[1]):
+        cache = {}
+        if stamp is not None:
+            try:
+                with open(cache_file, "r") as data:
+                    cache = json.load(data)
+            except (IOError, OSError, ValueError):  # Corrupt or unreadable cache - start again
+                cache = {}
+        entry = [stamp, False, cache, directory]
+        _format_caches[cache_file] = entry
+    return entry
+
+
+def get_cached_format(filename):
+    """Look up the name of the class that last loaded *filename*.
+
+    Args:
+        filename (str): Path of the file to look up.
+
+    Returns:
+        (str or None): The name of the :py:class:`Stoner.Core.DataFile` subclass, or None if the file is not in the
+        cache or has changed size or modification time since it was cached.
+    """
+    try:
+        stamp = _file_stamp(filename)
+    except OSError:
+        return None
+    cache = _format_cache(filename)[2]
+    entry = cache.get(path.basename(filename))
+    if entry is None or entry[:2] != stamp:
+        return None
+    return entry[2]
+
+
+def set_cached_format(filename, filetype):
+    """Record the class used to load *filename* in the in-memory format cache.
+
+    Args:
+        filename (str): Path of the file that was loaded.
+        filetype (str or None): Name of the class that loaded it. If None then any cached entry is removed.
+
+    Notes:
+        The cache is not written to disc until :py:func:`save_format_cache` is called.
+    """
+    entry = _format_cache(filename)
+    name = path.basename(filename)
+    if filetype is None:
+        if entry[2].pop(name, None) is not None:
+            entry[1] = True
+        return
+    try:
+        value = _file_stamp(filename) + [filetype]
+    except OSError:
+        return
+    if entry[2].get(name) != value:
+        entry[2][name] = value
+        entry[1] = True
+
+
+def save_format_cache():
+    """Write any changed format caches back to the cache directory.
+
+    Caches that cannot be written are silently dropped. Entries for files that no longer exist are removed.
+    """
+    for cache_file, entry in _format_caches.items():
+        if not entry[1]:
+            continue
+        for name in [name for name in entry[2] if not path.exists(path.join(entry[3], name))]:
+            del entry[2][name]
+        try:
+            with open(cache_file, "w") as data:
+                json.dump(entry[2], data)
+            entry[0] = os.stat(cache_file).st_mtime
+        except (IOError, OSError):
+            pass
+        entry[1] = False
+
+
+atexit.register(save_format_cache)  # Catch formats remembered since the last fetch or iteration over a folder
+atexit.register(shutdown_pool)
@@ -14,6 +14,7 @@ import numpy as np
 import Stoner.Core as Core
 from Stoner.compat import str2bytes
 from Stoner.core.base import string_to_type
+from Stoner.core.utils import header_lines
 
 
 class BNLFile(Core.DataFile):
@@ -47,6 +48,14 @@ class BNLFile(Core.DataFile):
         super(BNLFile, self).__init__(*params)
         self.line_numbers = []
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Rule out files that don't start with a # comment."""
+        lines = header_lines(header)
+        if lines and lines[0][0] != "#":
+            return False
+        return None
+
     def __find_lines(self):
         """Returns an array of ints [header_line,data_line,scan_line,date_line,motor_line]."""
         with io.open(self.filename, "r", errors="ignore", encoding="utf-8") as fp:
@@ -85,19 +94,25 @@ class BNLFile(Core.DataFile):
         self.__setitem__("Sdatetime", dateLine[3:-1])  # don't want \n at end of line so use -1
         self.__setitem__("Smotor", motorLine.split()[3])
 
-    def __parse_BNL_data(self):
+    def __parse_BNL_data(self, metadata_only=False):
         """Internal function for parsing BNL data.
 
          The meta data is labelled by #L type tags
         so easy to find but #L must be excluded from the result.
+
+        Keyword Arguments:
+            metadata_only (bool): Stop after reading the metadata and column headers.
         """
         self.__find_lines()
         # creates a list, line_numbers, formatted [header_line,data_line,scan_line,date_line,motor_line]
         header_string = linecache.getline(self.filename, self.line_numbers[0])
         header_string = re.sub(r'["\n]', "", header_string)  # get rid of new line character
         header_string = re.sub(r"#L", "", header_string)  # get rid of line indicator character
-        column_headers = map(lambda x: x.strip(), header_string.split())
+        column_headers = [x.strip() for x in header_string.split()]
         self.__get_metadata()
+        if metadata_only:
+            self._header_only(column_headers)
+            return
         try:
             self.data = np.genfromtxt(self.filename, skip_header=self.line_numbers[1] - 1)
         except IOError:
@@ -124,7 +139,9 @@ class BNLFile(Core.DataFile):
             a new method below.
         """
         self.filename = filename
-        self.__parse_BNL_data()  # call an internal function rather than put it in load function
+        self.__parse_BNL_data(
+            metadata_only=kargs.get("metadata_only", False)
+        )  # call an internal function rather than put it in load function
         linecache.clearcache()
         return self
 
@@ -142,6 +159,12 @@ class MDAASCIIFile(Core.DataFile):
     # the file load/save dialog boxes.
     patterns = ["*.txt"]  # Recognised filename patterns
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the mda2ascii banner line."""
+        lines = header_lines(header)
+        return bool(lines) and lines[0].strip() == "## mda2ascii 1.2 generated output"
+
     def _load(self, filename=None, *args, **kargs):
         """Load function. File format has space delimited columns from row 3 onwards."""
         if filename is None or not filename:
@@ -234,6 +257,12 @@ class OpenGDAFile(Core.DataFile):
     # the file load/save dialog boxes.
     patterns = ["*.dat"]  # Recognised filename patterns
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the &SRS line that starts an OpenGDA file."""
+        lines = header_lines(header)
+        return bool(lines) and lines[0].strip() == "&SRS"
+
     def _load(self, filename=None, *args, **kargs):
         """Load an OpenGDA file.
 
@@ -292,6 +321,12 @@ class SNSFile(Core.DataFile):
     # the file load/save dialog boxes.
     patterns = ["*.dat"]  # Recognised filename patterns
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the QuickNXS banner line."""
+        lines = header_lines(header)
+        return bool(lines) and lines[0].strip().startswith("# Datafile created by QuickNXS 0.9.39")
+
     def _load(self, filename=None, *args, **kargs):
         """Load function. File format has space delimited columns from row 3 onwards."""
         if filename is None or not filename:
@@ -146,6 +146,11 @@ class KermitPNGFile(Core.DataFile):
 
     mime_type = "image/png"
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the PNG signature."""
+        return header[:8] == b"\x89PNG\r\n\x1a\n"
+
     def _check_signature(self, filename):
         """Check that this is a PNG file and raie a Core.StonerLoadError if not."""
         try:
@@ -234,6 +239,11 @@ try:  # Optional tdms support
 
         mime_type = "application/octet-stream"
 
+        @classmethod
+        def probe(cls, header, filename):
+            """Check for the TDMS lead in tag."""
+            return header[:4] == b"TDSm"
+
         def _load(self, filename=None, *args, **kargs):
             """TDMS file loader routine.
 
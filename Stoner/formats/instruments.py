@@ -18,6 +18,7 @@ import Stoner.Core as Core
 from Stoner.compat import str2bytes, bytes2str
 from Stoner.core.exceptions import StonerAssertionError, assertion, StonerLoadError
 from Stoner.core.base import string_to_type
+from Stoner.core.utils import header_lines
 
 
 class LSTemperatureFile(Core.DataFile):
@@ -40,6 +41,14 @@ class LSTemperatureFile(Core.DataFile):
     # the file load/save dialog boxes.
     patterns = ["*.340"]
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Rule out files whose first line is not a key: value pair."""
+        lines = header_lines(header)
+        if lines and lines[0].strip() != "" and len(lines[0].split(":")) != 2:
+            return False
+        return None
+
     def _load(self, filename=None, *args, **kargs):
         """Data loader function for 340 files."""
         if filename is None or not filename:
@@ -159,6 +168,12 @@ class QDFile(Core.DataFile):
     # the file load/save dialog boxes.
     patterns = ["*.dat"]  # Recognised filename patterns
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the [Header] line that starts a Quantum Design file."""
+        lines = header_lines(header)
+        return bool(lines) and lines[0].strip() == "[Header]"
+
     def _load(self, filename=None, *args, **kargs):
         """QD system file loader routine.
 
@@ -221,15 +236,22 @@ class QDFile(Core.DataFile):
                 raise Core.StonerLoadError("Not a Quantum Design File !")
 
             column_headers = f.readline().strip().split(",")
-            data = np.genfromtxt([str2bytes(l) for l in f], dtype="float", delimiter=",", invalid_raise=False)
-            if data.shape[0] == 0:
+            if kargs.get("metadata_only", False):
+                data = None
+            else:
+                data = np.genfromtxt([str2bytes(l) for l in f], dtype="float", delimiter=",", invalid_raise=False)
+            if data is None:
+                self._header_only(column_headers)
+            elif data.shape[0] == 0:
                 raise Core.StonerLoadError("No data in file!")
-            if data.shape[1] < len(column_headers):  # Trap for buggy QD software not giving ewnough columns of data
-                data = np.append(data, np.ones((data.shape[0], len(column_headers) - data.shape[1])) * np.NaN, axis=1)
-            elif data.shape[1] > len(column_headers):  # too much data
-                data = data[:, : len(column_headers) - data.shape[1]]
-            self.data = data
-        self.column_headers = column_headers
+            else:
+                if data.shape[1] < len(column_headers):  # Trap for buggy QD software not giving ewnough columns of data
+                    padding = np.ones((data.shape[0], len(column_headers) - data.shape[1])) * np.NaN
+                    data = np.append(data, padding, axis=1)
+                elif data.shape[1] > len(column_headers):  # too much data
+                    data = data[:, : len(column_headers) - data.shape[1]]
+                self.data = data
+                self.column_headers = column_headers
         s = self.setas
         for k in setas:
             for ix in setas[k]:
@@ -251,6 +273,12 @@ class RigakuFile(Core.DataFile):
     # the file load/save dialog boxes.
     patterns = ["*.ras"]  # Recognised filename patterns
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the *RAS_DATA_START line that starts a Rigaku file."""
+        lines = header_lines(header)
+        return bool(lines) and lines[0].strip() == "*RAS_DATA_START"
+
     def _load(self, filename=None, *args, **kargs):
         """Reads an Rigaku ras file including handling the metadata nicely
 
@@ -396,6 +424,14 @@ class SPCFile(Core.DataFile):
 
     mime_type = ["application/octet-stream"]
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check the flags and version bytes at the start of the spc header."""
+        if len(header) < 512:
+            return False
+        ftflgs, fversn = bytearray(header[:2])
+        return ftflgs & 64 != 64 and 75 <= fversn <= 77
+
     def _read_xdata(self, f):
         """Read the xdata from the spc file."""
         self._pts = self._header["fnpts"]
@@ -658,7 +694,17 @@ class VSMFile(Core.DataFile):
     # the file load/save dialog boxes.
     patterns = ["*.fld"]  # Recognised filename patterns
 
-    def __parse_VSM(self, header_line=3, data_line=3, header_delim=","):
+    @classmethod
+    def probe(cls, header, filename):
+        """Check that the first line of the file is a VSM timestamp."""
+        lines = header_lines(header)
+        try:
+            datetime.strptime(lines[0].strip(), "%a %b %d %H:%M:%S %Y")
+        except (IndexError, ValueError):
+            return False
+        return True
+
+    def __parse_VSM(self, header_line=3, data_line=3, header_delim=",", metadata_only=False):
         """An intrernal function for parsing deliminated data without a leading column of metadata.copy
 
         Keyword Arguments:
@@ -666,6 +712,7 @@ class VSMFile(Core.DataFile):
                 If None, then column headers are auotmatically generated.
             data_line (int): The line on which the data starts
             header_delim (strong): The delimiter used for separating header values
+            metadata_only (bool): Stop after reading the column headers.
 
         Returns:
             Nothing, but modifies the current object.
@@ -695,6 +742,10 @@ class VSMFile(Core.DataFile):
                         break
         except (StonerAssertionError, ValueError, AssertionError, TypeError) as e:
             raise Core.StonerLoadError("Not a VSM File" + str(e.args))
+        if metadata_only:
+            self._header_only(column_headers)
+            self.setas(x="H_vsm (T)", y="m (emu)")  # pylint: disable=not-callable
+            return
         self.data = np.genfromtxt(
             self.filename,
             dtype="float",
@@ -724,7 +775,7 @@ class VSMFile(Core.DataFile):
             self.get_filename("r")
         else:
             self.filename = filename
-        self.__parse_VSM()
+        self.__parse_VSM(metadata_only=kargs.get("metadata_only", False))
         return self
 
 
@@ -746,6 +797,12 @@ class XRDFile(Core.DataFile):
         super(XRDFile, self).__init__(*args, **kargs)
         self._public_attrs = {"four_bounce": bool}
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the ;RAW4.00 line that starts a Brucker file."""
+        lines = header_lines(header)
+        return bool(lines) and lines[0].strip() == ";RAW4.00"
+
     def _load(self, filename=None, *args, **kargs):
         """Reads an XRD Core.DataFile as produced by the Brucker diffractometer
 
@@ -13,6 +13,7 @@ import Stoner.Core as Core
 from .generic import CSVFile
 from Stoner.compat import bytes2str
 from Stoner.core.base import string_to_type
+from Stoner.core.utils import header_lines
 
 
 class BigBlueFile(CSVFile):
@@ -57,6 +58,12 @@ class BirgeIVFile(Core.DataFile):
 
     patterns = ["*.dat"]
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the date on the first line."""
+        lines = header_lines(header)
+        return bool(lines) and re.compile(r"\d{1,2}/\d{1,2}/\d{4}").match(lines[0]) is not None
+
     def _load(self, filename, *args, **kargs):
         """File loader for PinkLib.
 
@@ -124,6 +131,12 @@ class MokeFile(Core.DataFile):
     # the file load/save dialog boxes.
     patterns = ["*.dat", "*.txt"]
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for the Leeds MOKE banner line."""
+        lines = header_lines(header)
+        return bool(lines) and lines[0].strip() == "#Leeds CM Physics MOKE"
+
     def _load(self, filename, *args, **kargs):
         """Leeds  MOKE file loader routine.
 
@@ -169,6 +182,18 @@ class FmokeFile(Core.DataFile):
     # the file load/save dialog boxes.
     patterns = ["*.dat"]  # Recognised filename patterns
 
+    @classmethod
+    def probe(cls, header, filename):
+        """Check for a line of numbers followed by the Header: line."""
+        lines = header_lines(header)
+        if len(lines) < 2:
+            return None if len(header) >= cls._probe_size else False
+        try:
+            [float(x.strip()) for x in lines[0].split("\t")]
+        except ValueError:
+            return False
+        return lines[1].split("\t")[0].strip() == "Header:"
+
     def _load(self, filename, *args, **kargs):
         """Sheffield Focussed MOKE file loader routine.
 
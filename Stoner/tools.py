@@ -121,6 +121,13 @@ _options = {
     "no_figs": True,
     "multiprocessing": os.name != "nt",  # multiprocess doesn't run too well under Windows due to spawn()
     "threading": False,
+    "pool_workers": 0,
+    "pool_chunksize": 1,
+    "pool_persistent": True,
+    "load_cache": False,
+    "load_cache_dir": "",
+    "load_cache_size": 1024,
+    "search_index": False,
 }
 
 ###############################################################################################################
@@ -535,11 +542,20 @@ def set_option(name, value):
     - short_data_repr (bool): Just use short representation for DataFiles
     - short_img_repr (bool): Just use a short representation for image file
     - no_figs (bool): Do not return figures from plotting functions, just plot them.
+    - multiprocessing (bool): Run folder operations such as fetch and each in a pool of workers.
+    - threading (bool): Use a pool of threads rather than a pool of processes.
+    - pool_workers (int): Number of workers in the pool, 0 for the default.
+    - pool_chunksize (int): Number of items sent to a worker at a time.
+    - pool_persistent (bool): Keep the pool running between calls and share it between folders.
+    - load_cache (bool): Keep binary copies of loaded files and reload from them when the file hasn't changed.
+    - load_cache_dir (str): Directory for the load cache - if empty, *~/.stoner_cache* is used.
+    - load_cache_size (int): Maximum size of the load cache in MB.
+    - search_index (bool): Look up values for search, select and closest in sorted copies of the data columns.
     """
     if name not in _options.keys():
         raise IndexError("{} is not a valid package option".format(name))
-    if not isinstance(value, bool):
-        raise ValueError("{} takes a boolean value not a {}".format(name, type(value)))
+    if not isinstance(value, type(_options[name])):
+        raise ValueError("{} takes a {} value not a {}".format(name, type(_options[name]).__name__, type(value)))
     _options[name] = value
 
 
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the tabulated Bloch-Grueneisen and Fluchs-Sondheimer models against the old per-point quad loops.
+
+Usage:
+    python e_transport_tables.py [points ...] [--repeat N]
+
+Evaluates :py:func:`Stoner.analysis.fitting.models.e_transport.blochGrueneisen` and
+:py:func:`Stoner.analysis.fitting.models.e_transport.fluchsSondheimer` and copies of the old implementations that
+integrate with :py:func:`scipy.integrate.quad` at each point, checks that they agree and prints the best of *repeat*
+timings. The first call (which loads or builds the integral tables) is not timed.
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy.integrate import quad
+
+from Stoner.analysis.fitting.models.e_transport import _bgintegrand, blochGrueneisen, fluchsSondheimer
+
+
+def blochGrueneisen_quad(T, thetaD, rho0, A, n):
+    """The original blochGrueneisen implementation with a quad call for each temperature."""
+    ret = np.zeros(T.shape)
+    for i, t in enumerate(T):
+        intg = quad(_bgintegrand, 0, thetaD / (t), (n,))[0]
+        ret[i] = rho0 + A * (t / thetaD) ** n * intg
+    return ret
+
+
+def fluchsSondheimer_quad(t, l, p, sigma_0):
+    """The original fluchsSondheimer implementation with a quad call for each thickness."""
+    k = t / l
+    kernel = lambda x, k: (x - x ** 3) * np.exp(-k * x) / (1 - np.exp(-k * x))
+    result = np.zeros(k.shape)
+    for i, v in enumerate(k):
+        ret1 = 1 - (3 * (1 - p) / (8 * v)) + (3 * (1 - p) / (2 * v))
+        ret2 = quad(kernel, 0, 1, (v,))[0]
+        result[i] = ret1 * ret2
+    return result / sigma_0
+
+
+def time_call(func, args, repeat):
+    """Return the best of *repeat* times to call *func* with *args*."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("points", nargs="*", type=int, default=[101, 1001, 10001], help="Temperature/thickness points")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of times to evaluate each model")
+    args = parser.parse_args()
+
+    models = [
+        (
+            "blochGrueneisen",
+            blochGrueneisen,
+            blochGrueneisen_quad,
+            lambda p: np.linspace(4.2, 300, p),
+            (265, 65, 1.0, 5),
+        ),
+        (
+            "fluchsSondheimer",
+            fluchsSondheimer,
+            fluchsSondheimer_quad,
+            lambda p: np.linspace(2, 100, p),
+            (12.5, 0.75, 1e3),
+        ),
+    ]
+    print("{:>18} {:>10} {:>12} {:>14} {:>8}".format("Model", "Points", "quad (s)", "tabulated (s)", "Speedup"))
+    for name, fast_func, slow_func, x_func, params in models:
+        fast_func(x_func(11), *params)
+        for points in args.points:
+            x = x_func(points)
+            if not np.allclose(fast_func(x, *params), slow_func(x, *params), rtol=1e-6):
+                raise RuntimeError("Tabulated and quad {} disagree for {} points".format(name, points))
+            slow = time_call(slow_func, (x,) + params, args.repeat)
+            fast = time_call(fast_func, (x,) + params, args.repeat)
+            print("{:>18} {:>10} {:>12.5f} {:>14.5f} {:>7.1f}x".format(name, points, slow, fast, slow / fast))
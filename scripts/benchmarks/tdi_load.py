@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""Benchmark loading TDI format files with the bulk (pandas) reader against the old genfromtxt reader.
+
+Usage:
+    python tdi_load.py [size_MB ...] [--columns N] [--repeat N]
+
+Writes a TDI file of (roughly) each size into a temporary directory and times :py:class:`Stoner.Data` loading it.
+The genfromtxt timings are taken by hiding pandas from :py:mod:`Stoner.Core`, which makes the TDI loader fall back to
+the old code path. The largest sizes need a lot of memory and the genfromtxt reader may take several minutes on them.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+import Stoner.Core
+from Stoner import Data
+
+
+def make_file(filename, size, columns):
+    """Write a TDI file of approximately *size* bytes with *columns* columns of random data."""
+    row_bytes = 25 * columns  # repr of a random float is ~20-25 characters plus a tab
+    rows = max(int(size / row_bytes), 1)
+    d = Data(np.random.normal(size=(rows, columns)), column_headers=["Col {}".format(i) for i in range(columns)])
+    for i in range(50):
+        d["Meta {}".format(i)] = i * 1.5
+    d.save(filename)
+    return rows
+
+
+def time_load(filename, repeat, bulk=True):
+    """Return the best of *repeat* times to load *filename*."""
+    pd = Stoner.Core.pd
+    if not bulk:
+        Stoner.Core.pd = None
+    try:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            Data(filename, filetype="DataFile")
+            times.append(time.perf_counter() - start)
+    finally:
+        Stoner.Core.pd = pd
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("sizes", nargs="*", type=float, default=[1, 10, 100, 500], help="File sizes in MB")
+    parser.add_argument("--columns", type=int, default=10, help="Number of data columns")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of times to load each file")
+    args = parser.parse_args()
+
+    if Stoner.Core.pd is None:
+        print("pandas is not available - only the genfromtxt reader can be timed.")
+    print("{:>10} {:>10} {:>14} {:>14} {:>8}".format("Size (MB)", "Rows", "genfromtxt (s)", "bulk (s)", "Speedup"))
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in args.sizes:
+            filename = os.path.join(tmpdir, "bench_{}.txt".format(size))
+            rows = make_file(filename, size * 1024 ** 2, args.columns)
+            real_size = os.path.getsize(filename) / 1024 ** 2
+            slow = time_load(filename, args.repeat, bulk=False)
+            fast = time_load(filename, args.repeat, bulk=True)
+            print("{:>10.1f} {:>10} {:>14.3f} {:>14.3f} {:>7.1f}x".format(real_size, rows, slow, fast, slow / fast))
+            os.remove(filename)
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+"""Benchmark the vectorised weak-localisation model function against the old per-point loop.
+
+Usage:
+    python wlfit.py [points ...] [--repeat N]
+
+Evaluates :py:func:`Stoner.analysis.fitting.models.e_transport.wlfit` and a copy of the old loop implementation on a
+symmetric field sweep (including B=0) of each size, checks that they agree and prints the best of *repeat* timings.
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy.special import digamma
+
+from Stoner.analysis.fitting.models.e_transport import wlfit
+
+
+def wlfit_loop(B, s0, DS, B1, B2):
+    """The original wlfit implementation with a Python loop over the field points."""
+    e = 1.6e-19  # C
+    h = 6.62e-34  # Js
+    cond = np.zeros(len(B))
+    if B2 == B1:
+        B2 = B1 * 1.00001
+    for tt, Bi in enumerate(B):
+        if Bi != 0:
+            WLpt1 = digamma(0.5 + B2 / np.abs(Bi))
+            WLpt2 = digamma(0.5 + B1 / np.abs(Bi))
+        else:
+            WLpt1 = (digamma(0.5 + B2 / np.abs(B[tt - 1])) + digamma(0.5 + B2 / np.abs(B[tt + 1]))) / 2
+            WLpt2 = (digamma(0.5 + B1 / np.abs(B[tt - 1])) + digamma(0.5 + B1 / np.abs(B[tt + 1]))) / 2
+        WLpt3 = np.log(B2 / B1)
+        cond[tt] = (e ** 2 / (h * np.pi)) * (WLpt1 - WLpt2 - WLpt3)
+    return s0 + DS * cond
+
+
+def time_call(func, args, repeat):
+    """Return the best of *repeat* times to call *func* with *args*."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("points", nargs="*", type=int, default=[201, 2001, 20001, 200001], help="Field points")
+    parser.add_argument("--repeat", type=int, default=5, help="Number of times to evaluate each model")
+    args = parser.parse_args()
+
+    params = (1e-3, 2.0, 0.25, 1.4)
+    print("{:>10} {:>12} {:>16} {:>8}".format("Points", "loop (s)", "vectorised (s)", "Speedup"))
+    for points in args.points:
+        B = np.linspace(-8, 8, points | 1)  # an odd number of points puts one exactly at B=0
+        if not np.allclose(wlfit(B, *params), wlfit_loop(B, *params)):
+            raise RuntimeError("Vectorised and loop wlfit disagree for {} points".format(B.size))
+        slow = time_call(wlfit_loop, (B,) + params, args.repeat)
+        fast = time_call(wlfit, (B,) + params, args.repeat)
+        print("{:>10} {:>12.5f} {:>16.5f} {:>7.1f}x".format(B.size, slow, fast, slow / fast))
@@ -45,6 +45,11 @@ class ImageFolderTest(unittest.TestCase):
         c.imarray[0,0,0] = 15.534
         self.assertFalse(np.array_equal(self.ks, c), 'clone failed to create new array')
 
+    def test_iter_prefetch(self):
+        td=ImageFolder(testdir, pattern='*.png')
+        images=list(td.iter_prefetch(depth=2))
+        self.assertEqual(len(images),len(self.td),"iter_prefetch on an ImageFolder missed images.")
+        self.assertTrue(all(np.array_equal(im,td[i]) for i,im in enumerate(images)),"iter_prefetch on an ImageFolder changed images.")
 
 
 if __name__=="__main__":
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the electron transport model functions against direct evaluations of their formulae.
+"""
+import unittest
+import sys
+import os
+import os.path as path
+import tempfile
+import shutil
+import numpy as np
+from scipy.integrate import quad
+from scipy.special import digamma
+
+pth=path.dirname(__file__)
+pth=path.realpath(path.join(pth,"../../"))
+sys.path.insert(0,pth)
+
+from Stoner import set_option
+from Stoner.analysis.fitting.models import e_transport
+from Stoner.analysis.fitting.models.e_transport import wlfit,blochGrueneisen,fluchsSondheimer,BlochGrueneisen
+
+class ETransport_test(unittest.TestCase):
+
+    """Tests for the e_transport model functions."""
+
+    def test_wlfit(self):
+        params=(1e-3,2.0,0.25,1.4)
+        pref=1.6e-19**2/(6.62e-34*np.pi)
+        term=lambda b:pref*(digamma(0.5+1.4/abs(b))-digamma(0.5+0.25/abs(b))-np.log(1.4/0.25))
+        B=np.linspace(-8,8,201)
+        expected=np.array([term(b) if b!=0 else (term(B[i-1])+term(B[i+1]))/2 for i,b in enumerate(B)])
+        self.assertTrue(np.allclose(wlfit(B,*params),1e-3+2.0*expected),"wlfit disagrees with direct evaluation.")
+        B=np.linspace(0,8,11) # Zero field as the first point
+        res=wlfit(B,*params)
+        self.assertTrue(np.all(np.isfinite(res)),"wlfit gave non-finite values with B=0 as the first point.")
+        self.assertAlmostEqual(res[0],1e-3+2.0*(term(B[-1])+term(B[1]))/2,msg="Zero field at the start not handled.")
+        self.assertTrue(np.allclose(wlfit(2.0,*params),1e-3+2.0*term(2.0)),"wlfit failed with a scalar field.")
+
+    def test_blochGrueneisen(self):
+        rng=np.random.RandomState(3)
+        for n in (2.0,3.0,5.0,rng.uniform(1.25,10)):
+            T=np.linspace(0.5,600,57)
+            res=blochGrueneisen(T,265.0,65.0,1.0,n)
+            expected=np.array([65.0+(t/265.0)**n*quad(e_transport._bgintegrand,0,265.0/t,(n,),epsabs=0,epsrel=1E-12)[0]
+                               for t in T])
+            self.assertTrue(np.allclose(res,expected,rtol=1E-6,atol=0),"blochGrueneisen disagrees with quad for n={}".format(n))
+        res=blochGrueneisen(T,265.0,0.0,1.0,12.0) # Exponent outside the table
+        expected=np.array([(t/265.0)**12.0*quad(e_transport._bgintegrand,0,265.0/t,(12.0,))[0] for t in T])
+        self.assertTrue(np.allclose(res,expected,rtol=1E-6),"blochGrueneisen wrong for n outside the table.")
+        jac=BlochGrueneisen().jacobian(T,265.0,65.0,1.0,5.0)
+        step=1E-6*np.array([265.0,65.0,1.0,5.0])
+        for i,h in enumerate(step):
+            p1,p2=np.array([265.0,65.0,1.0,5.0]),np.array([265.0,65.0,1.0,5.0])
+            p1[i]+=h
+            p2[i]-=h
+            numeric=(blochGrueneisen(T,*p1)-blochGrueneisen(T,*p2))/(2*h)
+            self.assertTrue(np.allclose(jac[i],numeric,rtol=1E-4,atol=1E-8),"BlochGrueneisen jacobian wrong for parameter {}".format(i))
+
+    def test_fluchsSondheimer(self):
+        t=np.concatenate([np.geomspace(1E-3,1E4,71),-np.geomspace(1E-2,1E2,5)])
+        res=fluchsSondheimer(t,1.0,0.75,1E3)
+        kernel=lambda x,k:(x-x**3)*np.exp(-k*x)/(1-np.exp(-k*x))
+        expected=np.array([(1+9*(1-0.75)/(8*k))*quad(kernel,0,1,(k,),epsabs=0,epsrel=1E-12,limit=200)[0]/1E3 for k in t])
+        self.assertTrue(np.allclose(res,expected,rtol=1E-6,atol=0),"fluchsSondheimer disagrees with quad.")
+        self.assertAlmostEqual(fluchsSondheimer(t[0],1.0,0.75,1E3),res[0],msg="fluchsSondheimer failed with a scalar thickness.")
+
+    def test_table_cache(self):
+        tmpdir=tempfile.mkdtemp()
+        tables=dict(e_transport._tables)
+        try:
+            set_option("load_cache_dir",tmpdir)
+            e_transport._tables.clear()
+            T=np.linspace(5,300,11)
+            res=blochGrueneisen(T,265.0,65.0,1.0,5.0)
+            self.assertEqual(os.listdir(tmpdir),[],"Table saved to the cache directory with the load cache off.")
+            set_option("load_cache",True)
+            e_transport._tables.clear()
+            self.assertTrue(np.allclose(blochGrueneisen(T,265.0,65.0,1.0,5.0),res),"Table built with the load cache on differs.")
+            self.assertTrue(any(f.startswith("blochgrueneisen") for f in os.listdir(tmpdir)),"Table not saved to the cache directory.")
+            e_transport._tables.clear()
+            self.assertTrue(np.allclose(blochGrueneisen(T,265.0,65.0,1.0,5.0),res),"Table reloaded from the cache gave different results.")
+        finally:
+            set_option("load_cache",False)
+            set_option("load_cache_dir","")
+            e_transport._tables.update(tables)
+            shutil.rmtree(tmpdir,ignore_errors=True)
+
+
+if __name__=="__main__": # Run some tests manually to allow debugging
+    unittest.main()
@@ -19,7 +19,10 @@ pth=path.realpath(path.join(pth,"../../"))
 sys.path.insert(0,pth)
 from Stoner import Data
 
-from Stoner.analysis.fitting.mixins import _curve_fit_result
+from Stoner.analysis.fitting.mixins import _curve_fit_result, MimizerAdaptor
+from Stoner.analysis.fitting.models.generic import Quadratic, StretchedExp
+from Stoner.analysis.fitting.models.thermal import Arrhenius
+from lmfit import Model
 
 def fit(x,a,b,c):
     """Fitting function"""
@@ -63,6 +66,57 @@ class AnalysisMixins_test(unittest.TestCase):
             res=self.data.differential_evolution(fit,p0=[0.02,0.2,2],output=output)
             self.assertTrue(isinstance(res,fmt),"Failed to get expected output from differential_evolution for {} (got {})".format(output,type(res)))
 
+    def test_differential_evolution_vectorized(self):
+        model=Quadratic()
+        adaptor=MimizerAdaptor(model,params=model.make_params(a=0.02,b=0.2,c=2))
+        pop=np.random.uniform([0.0,0.0,-3.0],[0.1,0.5,-1.0],size=(20,3)).T
+        x,y=self.data.x,self.data.y
+        expected=[adaptor.minimize_func(p,x,y,None) for p in pop.T]
+        self.assertTrue(np.allclose(adaptor.population_func(pop,x,y,None),expected),"Population goodness of fit wrong.")
+        self.assertTrue(adaptor.vectorized,"Quadratic not recognised as broadcasting over a population.")
+        adaptor=MimizerAdaptor(Model(lambda x,a,b,c:np.array([a*v**2+b*v+c for v in x])),params=model.make_params(a=0.02,b=0.2,c=2))
+        self.assertTrue(np.allclose(adaptor.population_func(pop,x,y,None),expected),"Goodness of fit wrong for fallback.")
+        self.assertFalse(adaptor.vectorized,"Non-broadcasting model not detected.")
+        serial=self.data.differential_evolution(fit,p0=[0.02,0.2,2],output="row",seed=1)
+        res=self.data.differential_evolution(fit,p0=[0.02,0.2,2],output="row",vectorized=True,seed=1)
+        self.assertTrue(np.allclose(res[::2],serial[::2],rtol=1E-3),"Vectorized differential_evolution gave a different fit.")
+        with self.assertRaises(ValueError):
+            self.data.differential_evolution(fit,p0=[0.02,0.2,2],vectorized=True,workers=2)
+
+    def test_jacobian(self):
+        x=np.linspace(100,300,101)
+        y=3*np.exp(-0.05/(8.617e-5*x))*np.random.normal(loc=1,scale=0.01,size=101)
+        data=Data(x,y,setas="xy")
+        for model,p0 in zip([Arrhenius(),Quadratic(),StretchedExp()],[[3,0.05],[0.5,-1,2],[2.0,0.7,150]]):
+            jac=model.jacobian(x,*p0)
+            step=[1E-6*p for p in p0]
+            num=[(model.func(x,*(p0[:i]+[p+h]+p0[i+1:]))-model.func(x,*(p0[:i]+[p-h]+p0[i+1:])))/(2*h)
+                 for i,(p,h) in enumerate(zip(p0,step))]
+            self.assertTrue(np.allclose(jac,num,rtol=1E-5),"Analytic jacobian of {} wrong.".format(model.name))
+        class NoJacobian(Arrhenius):
+            jacobian=None
+        params=Arrhenius().make_params(A=1.0,DE=0.1)
+        with_jac=data.lmfit(Arrhenius(),p0=params,output="report")
+        without=data.lmfit(NoJacobian(),p0=params,output="report")
+        self.assertTrue(np.allclose(list(with_jac.best_values.values()),list(without.best_values.values()),rtol=1E-5),
+                        "lmfit with the analytic jacobian gave a different result.")
+        self.assertLess(with_jac.nfev,without.nfev,"lmfit did not use the analytic jacobian.")
+        for method in ["curve_fit","odr"]:
+            res=getattr(data,method)(Arrhenius(),p0=[1.0,0.1],output="row")
+            self.assertTrue(np.allclose(res[:4:2],list(with_jac.best_values.values()),rtol=1E-4),
+                            "{} with the analytic jacobian gave a different result.".format(method))
+
+    def test_lmfit_chi2(self):
+        p0=np.column_stack([np.full(10,0.02),np.full(10,0.2),np.linspace(-3,-1,10)])
+        serial=self.data.lmfit(fit,p0=p0,output="row")
+        for executor in ["thread","process"]:
+            progress=[]
+            res=self.data.lmfit(fit,p0=p0,output="row",executor=executor,chunksize=3,progress=lambda done,total:progress.append(done))
+            self.assertTrue(np.allclose(res,serial),"chi^2 mapping with {} executor gave different results.".format(executor))
+            self.assertEqual(sorted(progress),[4,7,10],"Progress not reported for each chunk with {} executor.".format(executor))
+        with self.assertRaises(ValueError):
+            self.data.lmfit(fit,p0=p0,output="row",executor="cluster")
+
 
 
 if __name__=="__main__": # Run some tests manually to allow debugging
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Test the superconductivity model functions against direct evaluations of their formulae.
+"""
+import unittest
+import sys
+import os.path as path
+import numpy as np
+
+pth=path.dirname(__file__)
+pth=path.realpath(path.join(pth,"../../"))
+sys.path.insert(0,pth)
+
+from Stoner.analysis.fitting.models.superconductivity import strijkers
+
+def strijkers_direct(V,omega,delta,P,Z):
+    """Evaluate the Strijkers model with a direct convolution on a freshly built mesh."""
+    mv=np.max(np.abs(V))
+    E=np.linspace(-2*mv,2*mv,V.size*20)
+    gauss=np.exp(-(E**2/(2*omega**2)))
+    gauss/=gauss.sum()
+    with np.errstate(invalid="ignore",divide="ignore"):
+        eps=np.abs(E)/np.sqrt(E**2-delta**2)
+    Au1=delta**2/(E**2+(delta**2-E**2)*(1+2*Z**2)**2)
+    Au2=(eps**2-1)/(eps+1+2*Z**2)**2
+    Bu2=4*Z**2*(1+Z**2)/(eps+1+2*Z**2)**2
+    Bp2=Bu2/(1-Au2)
+    up,pp=(1-P)*(1+Z**2),P*(1+Z**2)
+    G=up+pp+np.where(np.abs(E)<=delta,up*(2*Au1-1)-pp,up*(Au2-Bu2)-Bp2*pp)
+    cond=np.convolve(G,gauss)[E.size//2:3*(E.size//2)]
+    return np.interp(V,E,cond)
+
+class Superconductivity_test(unittest.TestCase):
+
+    """Tests for the superconductivity model functions."""
+
+    def test_strijkers(self):
+        V=np.linspace(-10,10,201)
+        pop=np.array([[0.36,1.5,0.42,0.15],[0.1,1.2,0.1,0.5],[1.0,2.0,0.7,0.0]])
+        for p in pop:
+            self.assertTrue(np.allclose(strijkers(V,*p),strijkers_direct(V,*p)),"strijkers wrong for {}".format(p))
+            self.assertTrue(np.allclose(strijkers(V,*p),strijkers_direct(V,*p)),"Cached strijkers wrong for {}".format(p))
+        expected=np.array([strijkers_direct(V,*p) for p in pop])
+        res=strijkers(V,*pop.T)
+        self.assertEqual(res.shape,(3,201),"Population evaluation gave the wrong shape.")
+        self.assertTrue(np.allclose(res,expected),"Population evaluation of strijkers wrong.")
+        res=strijkers(V,*pop.T[:,:,None])
+        self.assertTrue(np.allclose(res,expected),"Column vector population evaluation of strijkers wrong.")
+
+
+if __name__=="__main__": # Run some tests manually to allow debugging
+    unittest.main()
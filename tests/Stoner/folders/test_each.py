@@ -18,7 +18,8 @@ from Stoner.compat import *
 import Stoner.Folders as SF
 from Stoner.plot.formats import GBPlotStyle
 
-from Stoner import Data,set_option
+from Stoner import Data,set_option,Options
+from Stoner.folders import utils
 import Stoner.HDF5, Stoner.Zip
 from Stoner.Util import hysteresis_correct
 
@@ -56,7 +57,71 @@ class folders_each_test(unittest.TestCase):
         fldr5.each(hysteresis_correct,setas="3.xy",saturated_fraction=0.25)
         self.assertTrue("Hc" in fldr5[0],"Call on DataFolder.each() failed to apply function to folder")
         meths=[x for x in dir(fldr6.each) if not x.startswith("_")]
-        self.assertEqual(len(meths),127,"Dir of folders.each failed ({}).".format(len(meths)))
+        self.assertEqual(len(meths),129,"Dir of folders.each failed ({}).".format(len(meths)))
+
+    def test_persistent_pool(self):
+        fldr=SF.DataFolder(path.join(self.datadir,"NLIV"),pattern="*.txt")
+        names=[d.filename for d in fldr]
+        try:
+            Options.threading=True
+            Options.pool_workers=2
+            Options.pool_chunksize=3
+            res=list(fldr.each.iter(lambda d:d.filename))
+            self.assertEqual(res,names,"Results from the pool not returned in order.")
+            pool=utils._shared_pool["pool"]
+            self.assertIsNotNone(pool,"Persistent pool not created.")
+            fldr.each(lambda d:d.shape)
+            self.assertIs(utils._shared_pool["pool"],pool,"Persistent pool not reused.")
+            Options.pool_workers=3
+            fldr.each(lambda d:d.shape)
+            self.assertIsNot(utils._shared_pool["pool"],pool,"Persistent pool not replaced when the options changed.")
+            Options.pool_persistent=False
+            p,imap=utils.get_pool()
+            self.assertEqual(list(imap(abs,range(-10,0))),list(range(10,0,-1)),"Ordered imap failed.")
+            utils.release_pool(p)
+            self.assertIsNot(p,utils._shared_pool["pool"],"Non-persistent pool was shared.")
+        finally:
+            for option in ("threading","pool_workers","pool_chunksize","pool_persistent"):
+                set_option(option,Options._defaults[option])
+            utils.shutdown_pool()
+        self.assertIsNone(utils._shared_pool["pool"],"Shared pool not shut down.")
+
+    def test_pool_options(self):
+        fldr=SF.DataFolder(path.join(self.datadir,"NLIV"),pattern="*.txt")
+        try:
+            Options.multiprocessing=True
+            Options.threading=False
+            Options.pool_workers=1
+            fldr.each(lambda d:d.shape) # Start the shared pool of processes before changing the option
+            Options.search_index=True
+            res=list(fldr.each.iter(lambda d:__import__("Stoner").tools.get_option("search_index")))
+            self.assertTrue(all(res),"Option set after the pool started not seen by the worker processes.")
+            Options.search_index=False
+            res=list(fldr.each.iter(lambda d:__import__("Stoner").tools.get_option("search_index")))
+            self.assertFalse(any(res),"Option reset after the pool started not seen by the worker processes.")
+        finally:
+            for option in ("multiprocessing","threading","pool_workers","search_index"):
+                set_option(option,Options._defaults[option])
+            utils.shutdown_pool()
+
+    def test_bypath(self):
+        fldr=SF.DataFolder(path.join(self.datadir,"NLIV"),pattern=re.compile(r"(?P<run>\d+)"),read_means=True,setas="yx")
+        ref=SF.DataFolder(path.join(self.datadir,"NLIV"),pattern=re.compile(r"(?P<run>\d+)"),read_means=True,setas="yx")
+        func=lambda d:(d.shape,d["run"],list(d.setas),d["Loaded from"])
+        self.assertEqual(fldr.each(func,_bypath=True),ref.each(func),"Loading the files in the workers changed the results.")
+        self.assertEqual(len(list(fldr.not_loaded)),len(fldr),"Files loaded into the folder with _bypath.")
+        res=fldr.each(lambda d:d.shape[0],_return="npts",_bypath=True)
+        self.assertEqual(len(list(fldr.not_loaded)),len(fldr),"Files loaded into the folder with _bypath and _return.")
+        self.assertEqual(fldr[0]["npts"],res[0],"Return value lost when the file was loaded.")
+        self.assertEqual(fldr[0].shape,ref[0].shape,"Data not loaded after _bypath and _return.")
+        def halve(d):
+            d=d.clone
+            d.data=d.data[::2]
+            return d
+        fldr.each(halve,_bypath=True)
+        self.assertEqual(fldr[1].shape,(51,3),"Returning a new object with _bypath did not replace the member.")
+        res=fldr.each(lambda d:1/0,_bypath=True)
+        self.assertIsInstance(res[0][0],ZeroDivisionError,"Exception not returned from the worker.")
 
     # def test_attr_access(self):
     #     self.fldr=SF.PlotFolder(path.join(self.datadir,"NLIV"),pattern="*.txt",setas="yx")
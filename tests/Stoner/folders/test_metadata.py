@@ -86,6 +86,42 @@ class folders_metadata_test(unittest.TestCase):
         else:
             self.assertTrue(False,"Failed to delete from metadata : {}".format(ret))
 
+    def test_metadata_only(self):
+        fldr=SF.DataFolder(self.datadir,pattern="QD*.dat",metadata_only=True)
+        full=SF.DataFolder(self.datadir,pattern="QD*.dat")
+        self.assertEqual(fldr.metadata.common_keys,full.metadata.common_keys,"Metadata only loading changed the common keys.")
+        self.assertEqual(list(fldr.not_loaded),fldr.__names__(),"Metadata queries loaded the data.")
+        sel=fldr.select({"Loaded as":"QDFile"})
+        self.assertEqual(len(sel),4,"Select on metadata only folder failed.")
+        self.assertEqual(sel[0].shape,full[sel[0].filename].shape,"Data not loaded when metadata only member accessed.")
+        fldr.fetch()
+        self.assertEqual(len(list(fldr.not_loaded)),0,"fetch did not replace metadata only members.")
+
+    def test_metadata_index(self):
+        fldr=SF.DataFolder()
+        for i in range(10):
+            d=Data(filename="Index-{}".format(i))
+            d["i"]=i
+            d["kind"]="even" if i%2==0 else "odd"
+            if i<5:
+                d["low"]=True
+            fldr+=d
+        self.assertEqual(fldr.metadata.common_keys,sorted(["Stoner.class","i","kind"]),"common_keys from the metadata index were wrong.")
+        self.assertEqual(len(fldr.select(i__ge=4,kind="odd")),8,"Indexed select with numeric and string tests failed.")
+        self.assertEqual(len(fldr.select(i__between=(2,5))),2,"Indexed select with between failed.")
+        self.assertEqual(len(fldr.select({"low":True})),5,"Indexed select of a key not in all members failed.")
+        self.assertEqual(list(fldr.metadata.slice("i",output="array")),list(range(10)),"Indexed slice failed.")
+        fldr[3]["i"]=30 # Change metadata in place - index must notice
+        self.assertEqual(len(fldr.select(i__gt=20)),1,"In place change of metadata not seen by the index.")
+        fldr[0]["extra"]=1
+        self.assertIn("extra",list(fldr.metadata.all_keys()),"New key not seen by the index.")
+        del fldr["Index-4"]
+        self.assertEqual(len(fldr.select(kind="even")),4,"Deleted member still in the index.")
+        fldr.__deleter__(0) # Deleting by position must remove the right row
+        self.assertNotIn("Index-0",fldr._metadata_index._rows,"Member deleted by position still in the index.")
+        fldr.group("kind")
+        self.assertEqual(sorted(fldr.groups.keys()),["even","odd"],"Grouping from the metadata index failed.")
+
 
 if __name__=="__main__": # Run some tests manually to allow debugging
     test=folders_metadata_test("test_metadata")
@@ -10,6 +10,10 @@ import sys
 import os, os.path as path
 import numpy as np
 import re
+import shutil
+import tempfile
+import hashlib
+import threading
 from numpy import any,all,sqrt,nan
 
 pth=path.dirname(__file__)
@@ -17,7 +21,8 @@ pth=path.realpath(path.join(pth,"../../../"))
 sys.path.insert(0,pth)
 
 from Stoner import Data,__home__,Options
-from Stoner.Folders import PlotFolder
+from Stoner.Folders import PlotFolder,DataFolder
+from Stoner.folders.utils import FORMAT_CACHE,get_cached_format,shutdown_pool
 from Stoner.plot.formats import TexEngFormatter,DefaultPlotStyle
 import matplotlib.pyplot as plt
 
@@ -53,6 +58,139 @@ class folders_mixins_test(unittest.TestCase):
         plt.close("all")
         Options.multiprocessing=True
 
+    def test_format_cache(self):
+        tmpdir=tempfile.mkdtemp()
+        cachedir=tempfile.mkdtemp()
+        Options.load_cache_dir=cachedir
+        try:
+            for f in ["QD-MH.dat","QD-PPMS.dat","RASOR.dat"]:
+                shutil.copy(path.join(self.datadir,f),path.join(tmpdir,"cache-"+f))
+            key=hashlib.sha1(path.realpath(tmpdir).encode("utf-8")).hexdigest()
+            cache_file=path.join(cachedir,FORMAT_CACHE.format(key))
+            fldr=DataFolder(tmpdir,format_cache=True)
+            fldr.fetch()
+            self.assertTrue(path.exists(cache_file),"Format cache not written to the cache directory.")
+            self.assertEqual(sorted(os.listdir(tmpdir)),["cache-"+f for f in ["QD-MH.dat","QD-PPMS.dat","RASOR.dat"]],
+                             "Format cache wrote into the data directory.")
+            self.assertEqual(get_cached_format(path.join(tmpdir,"cache-QD-MH.dat")),"QDFile","Format cache entry incorrect.")
+            fldr2=DataFolder(tmpdir,format_cache=True)
+            self.assertEqual(len(fldr2),3,"Format cache changed the folder listing.")
+            self.assertEqual([d["Loaded as"] for d in fldr2],[d["Loaded as"] for d in fldr],"Loading with the format cache changed the loaded type.")
+            with open(path.join(tmpdir,"cache-RASOR.dat"),"a") as data:
+                data.write("\n")
+            self.assertIsNone(get_cached_format(path.join(tmpdir,"cache-RASOR.dat")),"Stale format cache entry not invalidated.")
+            os.remove(cache_file)
+            fldr3=DataFolder(tmpdir,format_cache=True)
+            fldr3[0]
+            self.assertFalse(path.exists(cache_file),"Format cache written after loading a single file.")
+            for d in fldr3:
+                pass
+            self.assertTrue(path.exists(cache_file),"Format cache not written after iterating.")
+        finally:
+            Options.load_cache_dir=""
+            shutil.rmtree(tmpdir)
+            shutil.rmtree(cachedir)
+
+    def test_fit_all(self):
+        from Stoner.Fit import Linear
+        fldr=DataFolder()
+        x=np.linspace(0,10,51)
+        for i in range(6):
+            d=Data(x,(1+i)*x+2.0,column_headers=["X","Y"],setas="xy")
+            d.filename="line{}.txt".format(i)
+            fldr+=d
+        multiprocessing=Options.multiprocessing
+        try:
+            Options.multiprocessing=False
+            serial=fldr.fit_all(Linear)
+            self.assertEqual(serial.shape,(6,8),"fit_all results table is the wrong shape.")
+            self.assertEqual(serial["filenames"],["line{}.txt".format(i) for i in range(6)],"fit_all filenames wrong.")
+            self.assertTrue(np.allclose(serial.column("slope"),np.arange(1,7)),"fit_all gave the wrong slopes.")
+            res=fldr.fit_all(Linear,warm_start=True)
+            self.assertTrue(np.allclose(res.column(["slope","intercept"]),serial.column(["slope","intercept"])),
+                            "fit_all with a warm start gave different results.")
+            Options.multiprocessing=True
+            for threading,chunksize in [(True,1),(False,2)]: # Fits run in the shared pool from get_pool
+                Options.threading=threading
+                Options.pool_chunksize=chunksize
+                res=fldr.fit_all(Linear)
+                self.assertTrue(np.allclose(res.column(["slope","intercept"]),serial.column(["slope","intercept"])),
+                                "fit_all with threading={} gave different results.".format(threading))
+        finally:
+            Options.multiprocessing=multiprocessing
+            Options.threading=False
+            Options.pool_chunksize=1
+
+    def test_fetch_processing(self):
+        pattern=re.compile(r"at (?P<Vset>[\-\d\.]+)\.txt$")
+        ref=DataFolder(path.join(self.datadir,"NLIV"),pattern=pattern,read_means=True)
+        expected=[dict(ref[i].metadata) for i in range(len(ref))]
+        try:
+            Options.threading=True
+            Options.pool_workers=2
+            fldr=DataFolder(path.join(self.datadir,"NLIV"),pattern=pattern,read_means=True).fetch()
+        finally:
+            Options.threading=False
+            Options.pool_workers=0
+        self.assertEqual(len(list(fldr.not_loaded)),0,"fetch did not load every file.")
+        for i,d in enumerate(fldr):
+            for k in ["Vset","Loaded from"]+[h for h in d.column_headers]:
+                self.assertEqual(d[k],expected[i][k],"Metadata {} from fetch differs from loading the file.".format(k))
+
+        class CustomFolder(DataFolder):
+            def on_load_process(self,tmp):
+                tmp=super(CustomFolder,self).on_load_process(tmp)
+                tmp["custom"]=True
+                return tmp
+
+        fldr=CustomFolder(path.join(self.datadir,"NLIV"),pattern=pattern).fetch()
+        self.assertTrue(all(fldr.metadata.slice("custom",output="list")),"Subclass on_load_process not run by fetch.")
+        self.assertTrue("Vset" in fldr[0],"Pattern metadata missing with a subclass on_load_process.")
+
+    def test_cache_limits(self):
+        fldr=DataFolder(path.join(self.datadir,"NLIV"),pattern="*.txt",cache_size=3)
+        fldr[0]["note"]="kept"
+        shapes=[d.shape for d in fldr]
+        stats=fldr.cache_stats
+        self.assertEqual(stats["loaded"],3,"cache_size limit not kept.")
+        self.assertEqual((stats["hits"],stats["misses"],stats["evictions"]),(1,len(fldr),len(fldr)-3),"Cache counters wrong.")
+        self.assertEqual(len(list(fldr.not_loaded)),len(fldr)-3,"Evicted files still loaded.")
+        self.assertTrue(fldr.__getter__(fldr.__names__()[0],instantiate=None)._metadata_only,"Evicted file not kept as metadata.")
+        self.assertEqual(fldr[0]["note"],"kept","Metadata lost when an evicted file was reloaded.")
+        self.assertEqual(fldr[0].shape,shapes[0],"Evicted file not reloaded.")
+        self.assertEqual(fldr.cache_stats["misses"],len(fldr)+1,"Reload of an evicted file not counted as a miss.")
+        nbytes=fldr[0].data.nbytes
+        fldr=DataFolder(path.join(self.datadir,"NLIV"),pattern="*.txt",cache_bytes=int(2.5*nbytes)).fetch()
+        self.assertEqual(fldr.cache_stats["loaded"],2,"cache_bytes limit not kept.")
+        self.assertLessEqual(fldr.cache_stats["bytes"],int(2.5*nbytes),"Cached bytes over the limit.")
+
+    def test_iter_prefetch(self):
+        shapes=[d.shape for d in DataFolder(path.join(self.datadir,"NLIV"),pattern="*.txt")]
+        fldr=DataFolder(path.join(self.datadir,"NLIV"),pattern="*.txt")
+        fldr[2]
+        self.assertEqual([d.shape for d in fldr.iter_prefetch(depth=3)],shapes,"iter_prefetch gave different files.")
+        self.assertEqual(len(list(fldr.not_loaded)),0,"iter_prefetch did not keep the files.")
+        self.assertEqual(fldr.cache_stats["misses"],len(fldr),"Files loaded more than once by iter_prefetch.")
+        fldr=DataFolder(path.join(self.datadir,"NLIV"),pattern="*.txt",cache_size=5)
+        self.assertEqual([d.shape for d in fldr.iter_prefetch(depth=3)],shapes,"iter_prefetch with cache_size failed.")
+        self.assertEqual(fldr.cache_stats["loaded"],5,"iter_prefetch did not respect cache_size.")
+        stored=set()
+        class RecordingFolder(DataFolder):
+            def __setter__(self,name,value,force_insert=False):
+                stored.add(threading.current_thread())
+                return super(RecordingFolder,self).__setter__(name,value,force_insert=force_insert)
+        old=(Options.multiprocessing,Options.threading)
+        try:
+            for mp,threads in [(True,True),(True,False),(False,True)]:
+                Options.multiprocessing=mp
+                Options.threading=threads
+                fldr=RecordingFolder(path.join(self.datadir,"NLIV"),pattern="*.txt")
+                self.assertEqual([d.shape for d in fldr.iter_prefetch(depth=2)],shapes,"iter_prefetch failed with multiprocessing={} threading={}.".format(mp,threads))
+                self.assertEqual(fldr.cache_stats["misses"],len(fldr),"Files loaded more than once by iter_prefetch with multiprocessing={} threading={}.".format(mp,threads))
+        finally:
+            Options.multiprocessing,Options.threading=old
+            shutdown_pool()
+        self.assertEqual(stored,{threading.current_thread()},"iter_prefetch stored files from another thread.")
 
 if __name__=="__main__": # Run some tests manually to allow debugging
     test=folders_mixins_test("test_plotting")
@@ -73,6 +73,25 @@ class Analysis_test(unittest.TestCase):
         result=d.threshold(0,interpolate=False,all_vals=True,xcol=False)
         self.assertTrue(np.allclose(result,np.array([[ 24.5,   0. ],[124.5,   0. ],[224.5,   0. ],[324.5,   0. ]])),
                         "Failed threshold with False scol - result was {}".format(result))
+        from Stoner.analysis.utils import threshold
+        x=np.linspace(0,10*np.pi,2001)
+        y=np.sin(x)
+        levels=[-0.5,0.0,0.25,0.9]
+        together=threshold(levels,y,rising=True,falling=True)
+        for level,roots in zip(levels,together):
+            self.assertTrue(np.all(roots==threshold(level,y,rising=True,falling=True)),"Thresholds found together differ.")
+            self.assertTrue(np.allclose(np.sin(np.interp(roots,np.arange(len(x)),x)),level,atol=1E-9),
+                            "Threshold crossing of {} not refined.".format(level))
+        import Stoner.analysis.utils as utils
+        chunk=utils._threshold_chunk
+        try:
+            for utils._threshold_chunk in [1,len(y)*2,len(y)*3+1]: # Thresholds found in blocks
+                blocks=threshold(levels,y,rising=True,falling=True)
+                self.assertTrue(all(np.all(a==b) for a,b in zip(blocks,together)),"Thresholds found in blocks differ.")
+        finally:
+            utils._threshold_chunk=chunk
+        self.assertEqual([len(r) for r in threshold([],y)],[],"Empty list of thresholds failed.")
+        self.assertTrue(np.all(np.isnan(d.threshold([0.0,5.0])[:,1])),"Missing threshold not returned as nan.")
 
     def test_apply(self):
         self.app=Data(np.zeros((100,1)),setas="y")
@@ -83,6 +102,18 @@ class Analysis_test(unittest.TestCase):
         self.app.apply(lambda r:r.__class__([r[1],r[0]]),replace=True,header=["Index","Sin"])
         self.app.setas="xy"
         self.assertAlmostEqual(self.app.integrate(output="result"),18.87616564214,msg="Integrate after aplies failed.")
+        for kargs in [{"vectorized":True},{"batch_size":7}]:
+            fast=self.app.clone.apply(calc,replace=False,header="Sin",_extra={"omega":0.1},**kargs)
+            slow=self.app.clone.apply(calc,replace=False,header="Sin",_extra={"omega":0.1})
+            self.assertTrue(np.allclose(fast.data,slow.data),"Vectorized apply with {} differs.".format(kargs))
+        blocks=[]
+        def count_blocks(r):
+            blocks.append(len(r))
+            return r.y*2
+        self.app.clone.apply(count_blocks,replace=False,batch_size=30)
+        self.assertEqual(blocks,[30,30,30,10],"apply did not pass blocks of batch_size rows.")
+        counter=self.app.clone.apply(lambda r:float(r.i),replace=False,vectorized=True,header="Counter") # Falls back to rows
+        self.assertTrue(np.all(counter.column("Counter")==np.arange(100)),"apply did not fall back to one row at a time.")
 
     def test_scale(self):
         x=np.linspace(-5,5,101)
@@ -148,6 +179,54 @@ class Analysis_test(unittest.TestCase):
         d.y=d.y-np.cos(x)
         self.assertAlmostEqual(d.y[5:-5].mean(), 0,places=2,msg="Failed to differentiate correctly")
 
+    def test_outlier_detection(self):
+        from Stoner.analysis.utils import outlier,poly_outlier
+        def slow_outlier(row,window,metric,ycol=None): # Not recognised, so tested one row at a time
+            return outlier(row,window,metric,ycol=ycol)
+        def slow_poly_outlier(row,window,metric=3.0,ycol=None,xcol=None):
+            return poly_outlier(row,window,metric=metric,ycol=ycol,xcol=xcol)
+        np.random.seed(12345)
+        x=np.linspace(0,10,201)
+        y=np.sin(x)+np.random.normal(size=201,scale=0.05)
+        y[[0,50,120,199]]+=2.0
+        d=Data(x,y,column_headers=["Time","Signal"],setas="xy")
+        for func,slow_func,kargs in [(outlier,slow_outlier,{}),(poly_outlier,slow_poly_outlier,{"certainty":1.0,"window":9,"width":3})]:
+            fast=d.clone.outlier_detection(func=func,**kargs)
+            slow=d.clone.outlier_detection(func=slow_func,**kargs)
+            self.assertEqual(fast["outliers"],slow["outliers"],"Vectorised {} found different outliers.".format(func.__name__))
+        self.assertTrue(set([0,50,120,199])<=set(fast["outliers"]),"Outliers not found.")
+        deleted=d.clone.outlier_detection(action="delete")
+        self.assertEqual(len(deleted),len(d)-len(deleted["outliers"]),"Outliers not deleted.")
+        masked=d.clone.outlier_detection(action="mask row")
+        self.assertTrue(np.all(masked.mask[masked["outliers"]]),"Outlier rows not masked.")
+        windows=list(d.rolling_window(5,wrap=True,exclude_centre=True))
+        self.assertEqual(len(windows),len(d),"rolling_window gave the wrong number of windows.")
+        self.assertTrue(np.all(windows[0].x==d.x[[-2,-1,1,2]]),"Wrapped window with the centre excluded is wrong.")
+
+    def test_bin(self):
+        from Stoner.analysis.utils import BinAccumulator
+        np.random.seed(12345)
+        x=np.random.uniform(0.01,10,1000)
+        y=np.random.normal(size=1000)
+        e=np.random.uniform(0.1,1.0,1000)
+        d=Data(x,y,e,column_headers=["X","Y","dY"],setas="xy.")
+        centres,ybin,ebin,nbins=d.bin(bins=20,mode="lin",clone=False)
+        for i,(l,r) in enumerate(zip(*d.make_bins("X",20,"lin")[:2])):
+            sel=y[(x>l)&(x<=r)]
+            self.assertEqual(nbins[i,0],len(sel),"Wrong number of points in bin {}".format(i))
+            self.assertAlmostEqual(ybin[i,0],sel.mean(),msg="Wrong mean in bin {}".format(i))
+            self.assertAlmostEqual(ebin[i,0],sel.std()/sqrt(len(sel)),msg="Wrong error in bin {}".format(i))
+        d.setas="xye"
+        binned=d.bin(bins=20,mode="lin")
+        self.assertEqual(binned.shape,(20,4),"Binned data has the wrong shape.")
+        weighted=d.bin(bins=20,mode="lin",clone=False)
+        left,right,centres=d.make_bins("X",20,"lin")
+        acc=BinAccumulator(left,right,centres,weighted=True)
+        for start in range(0,1000,150): # Bin in chunks instead
+            acc.add_data(d[start:start+150],"X","Y","dY")
+        for whole,chunked in zip(weighted,acc.result()):
+            self.assertTrue(np.allclose(whole,chunked),"Binning in chunks didn't match binning in one go.")
+
 
 if __name__=="__main__": # Run some tests manually to allow debugging
     test=Analysis_test("test_functions")
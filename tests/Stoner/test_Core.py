@@ -9,6 +9,8 @@ Created on Tue Jan 07 22:05:55 2014
 import unittest
 import sys
 import os, os.path as path
+import shutil
+import tempfile
 import numpy as np
 import re
 from numpy import any,all,sqrt,nan
@@ -17,7 +19,7 @@ from collections import MutableMapping,OrderedDict
 pth=path.dirname(__file__)
 pth=path.realpath(path.join(pth,"../../"))
 sys.path.insert(0,pth)
-from Stoner import Data,__home__
+from Stoner import Data,__home__,set_option
 from Stoner.Core import typeHintedDict,metadataObject
 import Stoner.compat
 
@@ -236,10 +238,10 @@ Stoner.class{String}= Data          0  ...             0  ...             0
                       '__le__', '__lt__', '__reversed__', '__slots__',"_abc_negative_cache","_abc_registry",
                       "_abc_negative_cache_version","_abc_cache","_abc_impl"])
         self.attrs=set(dir(self.d))-bad_keys
-        if len(self.attrs)!=227:
-            expected={'_conv_string', '__str__', 'clear', 'scale', '__add__', 'popitem',  'priority', '_init_single', 'pop', 'reorder_columns', '_col_label', 'subclasses', '__sizeof__', 'rows', 'plot_matrix', '_PlotMixin__SurfPlotter', '_showfig', '__and__', '_repr_html_', '_pop_mask', 'filename', 'smooth', '__weakref__', 'dir', '_PlotMixin__mpl3DQuiver', 'spline', '__format__', 'plot_xy', 'labels', '_fix_kargs', 'span', '__getattr__', '_push_mask', 'normalise', 'mean', 'sort', '_set_mask', 'shape', 'x2', 'clone', 'save', 'setdefault', 'update', 'plot', 'colormap_xyz', 'plot_xyzuvw', '_patterns', 'section', 'count', 'extrapolate', 'fig', 'mime_type', 'find_col', 'SG_Filter', '__isub__', 'clip', '_fix_fig', '_AnalysisMixin__get_math_val', 'get_filename', 'griddata', 'axes', 'setas', '__sub__', '__floordiv__', '_baseclass', '_subplots', '__add_core__', 'max', 'rename', '__setstate__', 'rolling_window', '_labels', '__dict__', 'adjust_setas', 'column', '__mod__', 'xlim', '_repr_table_', '__abstractmethods__', '__call__', '_public_attrs_real', '__eq__', '_pyplot_proxy', 'stitch', 'lmfit', '_filename', '__lshift__', '_fix_titles', 'multiple', '__dir__', 'column_headers', 'header', '_public_attrs', 'swap_column', 'annotate_fit', '_init_many', 'min', '_load', '__sub_core__', 'dtype', '__doc__', '_col_args', 'filter', '__new__', '__len__', 'format', 'ylim', 'ax', '__hash__', '_PlotMixin__figure', 'polyfit', '__repr__', 'subtract', '__iand__', 'debug', 'diffsum', 'split', 'ylabel', '__iter__', '_vector_color', '__invert__', '__repr_core__', 'del_nan', 'y2', '__contains__', '__reduce__', 'plot_xyuv', 'plot_xyuvw', '__delattr__', 'curve_fit', '__module__', '_conv_float', '__getattribute__', 'keys', 'legend', 'quiver_plot', 'metadata', 'plot_xyz', '__regexp_meta__', 'data', 'figure', 'records', '_DataFile__parse_metadata', 'fignum', '__setattr__', 'insert_rows', 'add', 'make_bins', '_DataFile__setattr_col', '_repr_short_', '__getitem__', '_repr_limits', '_data', '_template', 'outlier_detection', 'template', '__imod__', 'image_plot', '__setitem__', '_get_curve_fit_data', '_DataFile__search_index', 'no_fmt', '__class__', '_AnalysisMixin__threshold', 'dims', 'threshold', 'basename', '_AnalysisMixin__lmfit_one', 'del_rows', 'patterns', 'del_column', '_metadata', '__deepcopy__', 'search', '_record_curve_fit_result', 'positional_fmt', '__getstate__', 'interpolate', 'dict_records', '_span_slice', 'columns', 'title', '__delitem__', '_repr_html_private', '_DataFile__file_dialog', '_getattr_col', 'mask', 'add_column', 'subplot', 'subplots', 'peaks', '_MutableMapping__marker', 'subplot2grid', 'get', '_DataFile__read_iterable', 'contour_xyz', 'inset', '__meta__', '_VectorFieldPlot', '__init__', '_masks', 'select', 'unique', 'xlabel', '_Plot', '__iadd__', 'values', 'multiply', '_raise_type_error', 'divide', 'odr', '__reduce_ex__', 'cmap', 'showfig', '__subclasshook__', 'items', '_interesting_cols', '_init_double', '__ne__', '_fix_cols', 'integrate', 'decompose', 'bin', 'closest', '__and_core__', 'T', 'load', 'apply'}
+        if len(self.attrs)!=236:
+            expected={'_conv_string', '__str__', 'clear', 'scale', '__add__', 'popitem',  'priority', '_init_single', 'pop', 'reorder_columns', '_col_label', 'subclasses', '__sizeof__', 'rows', 'plot_matrix', '_PlotMixin__SurfPlotter', '_showfig', '__and__', '_repr_html_', '_pop_mask', 'filename', 'smooth', '__weakref__', 'dir', '_PlotMixin__mpl3DQuiver', 'spline', '__format__', 'plot_xy', 'labels', '_fix_kargs', 'span', '__getattr__', '_push_mask', 'normalise', 'mean', 'sort', '_set_mask', 'shape', 'x2', 'clone', 'save', 'setdefault', 'update', 'plot', 'colormap_xyz', 'plot_xyzuvw', '_patterns', 'section', 'count', 'extrapolate', 'fig', 'mime_type', 'find_col', 'SG_Filter', '__isub__', 'clip', '_fix_fig', '_AnalysisMixin__get_math_val', 'get_filename', 'griddata', 'axes', 'setas', '__sub__', '__floordiv__', '_baseclass', '_subplots', '__add_core__', 'max', 'rename', '__setstate__', 'rolling_window', '_labels', '__dict__', 'adjust_setas', 'column', '__mod__', 'xlim', '_repr_table_', '__abstractmethods__', '__call__', '_public_attrs_real', '__eq__', '_pyplot_proxy', 'stitch', 'lmfit', '_filename', '__lshift__', '_fix_titles', 'multiple', '__dir__', 'column_headers', 'header', '_public_attrs', 'swap_column', 'annotate_fit', '_init_many', 'min', '_load', '__sub_core__', 'dtype', '__doc__', '_col_args', 'filter', '__new__', '__len__', 'format', 'ylim', 'ax', '__hash__', '_PlotMixin__figure', 'polyfit', '__repr__', 'subtract', '__iand__', 'debug', 'diffsum', 'split', 'ylabel', '__iter__', '_vector_color', '__invert__', '__repr_core__', 'del_nan', 'y2', '__contains__', '__reduce__', 'plot_xyuv', 'plot_xyuvw', '__delattr__', 'curve_fit', '__module__', '_conv_float', '__getattribute__', 'keys', 'legend', 'quiver_plot', 'metadata', 'plot_xyz', '__regexp_meta__', 'data', 'figure', 'records', '_DataFile__parse_metadata', 'fignum', '__setattr__', 'insert_rows', 'add', 'make_bins', '_DataFile__setattr_col', '_repr_short_', '__getitem__', '_repr_limits', '_data', '_template', 'outlier_detection', 'template', '__imod__', 'image_plot', '__setitem__', '_get_curve_fit_data', '_DataFile__search_index', 'no_fmt', '__class__', '_AnalysisMixin__threshold', 'dims', 'threshold', 'basename', '_AnalysisMixin__lmfit_one', 'del_rows', 'patterns', 'del_column', '_metadata', '__deepcopy__', 'search', '_record_curve_fit_result', 'positional_fmt', '__getstate__', 'interpolate', 'dict_records', '_span_slice', 'columns', 'title', '__delitem__', '_repr_html_private', '_DataFile__file_dialog', '_getattr_col', 'mask', 'add_column', 'subplot', 'subplots', 'peaks', '_MutableMapping__marker', 'subplot2grid', 'get', '_DataFile__read_iterable', 'contour_xyz', 'inset', '__meta__', '_VectorFieldPlot', '__init__', '_masks', 'select', 'unique', 'xlabel', '_Plot', '__iadd__', 'values', 'multiply', '_raise_type_error', 'divide', 'odr', '__reduce_ex__', 'cmap', 'showfig', '__subclasshook__', 'items', '_interesting_cols', '_init_double', '__ne__', '_fix_cols', 'integrate', 'decompose', 'bin', 'closest', '__and_core__', 'T', 'load', 'apply', 'probe', 'load_stats', '_load_stats', '_probe_size', '_sniff', '_DataFile__probe_subclasses', '_metadata_only', '_header_only', '_DataFile__read_tdi_block'}
             print("="*120,"\n","Warning=====>",self.attrs-expected,expected-self.attrs)
-        self.assertEqual(len(self.attrs),227,"DataFile.__dir__ failed.")
+        self.assertEqual(len(self.attrs),236,"DataFile.__dir__ failed.")
 
     def test_filter(self):
         self.d._push_mask()
@@ -430,6 +432,113 @@ Stoner.class{String}= Data          0  ...             0  ...             0
         os.remove(path.join(local, "mixedmetatest.txt")) #clear up
         os.remove(path.join(local, "mixedmetatest2.txt"))
 
+    def test_tdi_reader(self):
+        local = path.dirname(__file__)
+        filename=path.join(local, "tdireadertest.txt")
+        with open(filename,"w") as tdi:
+            tdi.write("TDI Format 1.5\tA\tB\tC\na{I32}=1\t1\t\t3\nb{String}=abc\t4\tnan\t6\n\t7\t8\t9\n")
+        fast=Data(filename)
+        pd=Stoner.Core.pd
+        try:
+            Stoner.Core.pd=None # Force the genfromtxt reader
+            slow=Data(filename)
+        finally:
+            Stoner.Core.pd=pd
+        os.remove(filename)
+        self.assertEqual(fast.shape,(3,3),"Bulk TDI reader got the wrong shape.")
+        self.assertEqual(fast.metadata["a"],1,"Bulk TDI reader got the metadata wrong.")
+        self.assertTrue(np.all(fast.mask==slow.mask),"Bulk TDI reader masked different cells to genfromtxt.")
+        mask=np.ma.getmaskarray(fast.data)
+        self.assertTrue(mask[0,1] and not mask[1,1],"Empty cells should be masked, but not nans.")
+        self.assertTrue(np.allclose(np.array(fast.data),np.array(slow.data),equal_nan=True),"Bulk TDI reader read different data to genfromtxt.")
+        with open(filename,"w") as tdi: # nan only in the metadata column
+            tdi.write("TDI Format 1.5\tA\tB\na{String}=nan\t1\t\nb{Double}=NaN\t4\t5\n")
+        try:
+            self.assertFalse(Stoner.Core._has_nan_cell(filename),"A nan in the metadata column was taken as a data cell.")
+            meta=Data(filename)
+            self.assertTrue(meta.mask[0,1] and not meta.mask[1,1],"Empty cell not masked when the metadata holds a nan.")
+            with open(filename,"w") as tdi:
+                tdi.write("TDI Format 1.5\tA\tB\n\t1\t\n\t4\tNaN")
+            for chunk in range(1,8): # The token can be split between chunks
+                self.assertTrue(Stoner.Core._has_nan_cell(filename,chunk),"Missed a nan split over chunks of {}".format(chunk))
+            with open(filename,"w") as tdi:
+                tdi.write("TDI Format 1.5\tA\tB\n\t1\tnano\n")
+            for chunk in range(1,8):
+                self.assertFalse(Stoner.Core._has_nan_cell(filename,chunk),"A word starting with nan was taken as a nan.")
+        finally:
+            os.remove(filename)
+
+    def test_load_cache(self):
+        from Stoner.core.cache import trim_cache,_cache_sizes
+        cache_dir=tempfile.mkdtemp()
+        filename=path.join(path.dirname(__file__), "loadcachetest.txt")
+        self.d4.save(filename)
+        set_option("load_cache_dir",cache_dir)
+        set_option("load_cache",True)
+        try:
+            first=Data(filename)
+            second=Data(filename)
+            self.assertEqual(first.load_stats["cached"],0,"File was in the cache before it was loaded.")
+            self.assertEqual(second.load_stats,{"probes":0,"loads":0,"cached":1},"Unchanged file not loaded from the cache.")
+            self.assertEqual(second,first,"Data loaded from the cache is different.")
+            self.assertEqual(second.setas,first.setas,"Setas not restored from the cache.")
+            second.data[0,0]=-1.0 # Changes mustn't get written back to the cache
+            self.assertEqual(Data(filename),first,"Changing cached data altered the cache.")
+            first["Changed"]=True
+            first.save(filename)
+            stat=os.stat(filename)
+            os.utime(filename,(stat.st_atime,stat.st_mtime+10))
+            third=Data(filename)
+            self.assertEqual(third.load_stats["cached"],0,"Changed file loaded from the cache.")
+            self.assertTrue(third["Changed"],"Changed file not reloaded.")
+            csvname=path.join(path.dirname(__file__), "loadcachetest.csv")
+            with open(csvname,"w") as csv:
+                csv.write("A,B\nC,D\n1,2\n3,4\n")
+            try:
+                Data(csvname,filetype="CSVFile")
+                other=Data(csvname,filetype="CSVFile",header_line=1,data_line=2)
+            finally:
+                os.remove(csvname)
+            self.assertEqual(other.load_stats["cached"],0,"Cache ignored the loader arguments.")
+            self.assertEqual(other.column_headers,["C","D"],"Wrong header line used with the cache on.")
+            self.assertEqual(other.shape,(2,2),"Wrong data lines used with the cache on.")
+            trim_cache(0)
+            self.assertEqual(os.listdir(cache_dir),[],"trim_cache did not empty the cache.")
+            Data(filename)
+            used=sum(path.getsize(path.join(cache_dir,f)) for f in os.listdir(cache_dir))
+            self.assertEqual(_cache_sizes[cache_dir],used,"Running total of the cache size is wrong.")
+            set_option("load_cache_size",0)
+            Data(filename,filetype="DataFile")
+            self.assertEqual(os.listdir(cache_dir),[],"Cache not trimmed when the running total passed the limit.")
+        finally:
+            set_option("load_cache",False)
+            set_option("load_cache_dir","")
+            set_option("load_cache_size",1024)
+            os.remove(filename)
+            shutil.rmtree(cache_dir)
+
+    def test_search_index(self):
+        d=self.d2.clone
+        queries=[("Temp",(100,150),0),("Temp",[20,100,150],0.5),("Temp",150.0,2.0)]
+        selects=[{"Temp__gt":150},{"Temp__not__between":(100,200)},{"Temp__ibetween":(50,60),"Temp__lt":10}]
+        expected=[d.search(c,v,accuracy=a) for c,v,a in queries]+[d.select(**s).data for s in selects]+[d.closest(123.4,xcol="Temp")]
+        set_option("search_index",True)
+        try:
+            got=[d.search(c,v,accuracy=a) for c,v,a in queries]+[d.select(**s).data for s in selects]+[d.closest(123.4,xcol="Temp")]
+            for old,new in zip(expected,got):
+                self.assertTrue(np.all(old==new),"Search with the sorted index gave different results.")
+            col=d.find_col("Temp")
+            d.data[5,col]=1000.0
+            self.assertEqual(d.closest(999.0,xcol="Temp").i,5,"Sorted index not cleared when the data changed.")
+            d.column(col)[6]=2000.0
+            self.assertEqual(d.search("Temp",(1500,2500)).shape[0],1,"Sorted index not cleared by writing to a column.")
+            d.data+=100.0
+            self.assertEqual(d.closest(1099.0,xcol="Temp").i,5,"Sorted index not updated by in place arithmetic.")
+            d.data.data[7,col]=5000.0
+            self.assertEqual(d.search("Temp",(4500,5500)).shape[0],1,"Sorted index not updated by writing to the raw data.")
+        finally:
+            set_option("search_index",False)
+
 if __name__=="__main__": # Run some tests manually to allow debugging
     test=Datatest("test_operators")
     test.setUp()
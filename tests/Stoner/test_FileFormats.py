@@ -81,6 +81,24 @@ class FileFormats_test(unittest.TestCase):
         self.csv=Data(path.join(self.datadir,"working","CSVFile_test.dat"),filetype="JustNumbers",column_headers=["Q","I","dI"],setas="xye")
         self.assertEqual(self.csv.shape,(167,3),"Failed to load CSVFile from text")
 
+    def test_probe(self):
+        d=Data(path.join(self.datadir,"QD-PPMS.dat"))
+        self.assertEqual(d["Loaded as"],"QDFile","Probe failed to identify a QD file.")
+        self.assertEqual(d.load_stats["loads"],1,"Probed file format still needed trial loads.")
+        tdi=b"TDI Format 1.5\tX (T)\tY (T)\n"
+        self.assertTrue(DataFile.probe(tdi,"test.txt"),"DataFile.probe failed to recognise a TDI header.")
+        self.assertFalse(DataFile.subclasses["QDFile"].probe(tdi,"test.txt"),"QDFile.probe accepted a TDI header.")
+        self.assertFalse(DataFile.probe(b"","test.txt"),"DataFile.probe accepted an empty file.")
+
+    def test_metadata_only(self):
+        for f in ["QD-PPMS.dat","TDI_Format_RT.txt","VSM-Data.fld","BNL-data.txt","Test_Data.hdf5"]:
+            full=Data(path.join(self.datadir,f))
+            header=Data(path.join(self.datadir,f),metadata_only=True)
+            self.assertEqual(header.shape,(0,full.shape[1]),"Metadata only load of {} read data.".format(f))
+            self.assertEqual(header.column_headers,full.column_headers,"Metadata only load of {} changed the column headers.".format(f))
+            self.assertEqual(header["Loaded as"],full["Loaded as"],"Metadata only load of {} changed the loader.".format(f))
+            self.assertEqual(sorted(header.metadata.keys()),sorted(full.metadata.keys()),"Metadata only load of {} changed the metadata.".format(f))
+
 if __name__=="__main__": # Run some tests manually to allow debugging
     test=FileFormats_test("test_loaders")
     test.setUp()
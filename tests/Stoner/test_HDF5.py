@@ -18,6 +18,7 @@ from Stoner.compat import *
 import Stoner
 from Stoner.tools import isComparable
 import Stoner.HDF5 as SH
+from Stoner.folders.utils import shutdown_pool
 Data=Stoner.Data
 
 pth=path.dirname(__file__)
@@ -54,6 +55,107 @@ class HDF5_test(unittest.TestCase):
         self.h2.metadata["Loaded from"]=self.h1.metadata["Loaded from"] #Corrects a path separator bug on Windows
         self.assertEqual(self.h1,self.h2,"File from loaded HDF5Folder not the same as in memeory HDF5Folder.")
 
+    def test_lazy(self):
+        d=SH.HDF5File(self.fldr[0])
+        d.compression=None # Uncompressed data can be memory mapped
+        filename=path.join(tmpdir,"test-lazy.hdf5")
+        d.save(filename)
+        lazy=SH.HDF5File(filename,lazy=True)
+        data=lazy.data
+        while data is not None and not isinstance(data,np.memmap):
+            data=data.base
+        self.assertIsInstance(data,np.memmap,"Lazy load did not memory map the data.")
+        self.assertTrue(np.all(lazy.data==SH.HDF5File(filename).data),"Memory mapped data differs from data read in.")
+        self.assertFalse(hasattr(lazy,"lazy"),"lazy keyword was set as an attribute.")
+        lazy.data[0,0]=-1.0 # copy on write - mustn't change the file
+        self.assertNotEqual(SH.HDF5File(filename).data[0,0],-1.0,"Changing memory mapped data changed the file.")
+
+        full=SH.HDF5File(self.fldr[0])
+        filename=path.join(tmpdir,"test-lazy-compressed.hdf5")
+        full.save(filename) # Compressed, so the rows are read on demand
+        lazy=SH.HDF5File(filename,lazy=True)
+        self.assertIsNotNone(lazy._lazy,"Compressed data was not loaded lazily.")
+        self.assertEqual(lazy.shape,full.shape,"Lazily loaded shape is wrong.")
+        self.assertEqual(len(lazy),len(full),"Lazily loaded length is wrong.")
+        self.assertTrue(np.all(lazy.column(1)==full.column(1)),"Lazily read column differs.")
+        self.assertTrue(np.all(lazy[2:10]==full.data[2:10]),"Lazily read rows differ.")
+        self.assertTrue(np.all(lazy[-1]==full.data[-1]),"Lazily read last row differs.")
+        self.assertTrue(np.all(lazy[::-2,[0,2]]==full.data[::-2,[0,2]]),"Lazily read reversed rows differ.")
+        self.assertTrue(np.all(lazy[1:5,full.column_headers[1]]==full.data[1:5,1]),"Lazily read named column differs.")
+        self.assertIsNotNone(lazy._lazy,"Reading parts of the data read all of it.")
+        self.assertTrue(np.all(lazy.data==full.data),"Lazily read data differs once read in full.")
+        self.assertIsNone(lazy._lazy,"Reading all of the data left the lazy proxy in place.")
+        lazy=SH.HDF5File(filename,lazy=True,setas="xy")
+        self.assertIsNotNone(lazy._lazy,"Setting setas on a lazy load read the data.")
+        self.assertTrue(np.all(lazy.x==full.column(0)),"Setas x column of lazily loaded data differs.")
+        self.assertTrue(np.all(lazy.y==full.column(1)),"Setas y column of lazily loaded data differs.")
+
+        fldr=SH.HDF5Folder(self.fldr)
+        for f in fldr:
+            f.compression=None
+        HDF5name=path.join(tmpdir,"test-lazy-folder.HDF5")
+        fldr.save(HDF5name)
+        fldr2=SH.HDF5Folder(HDF5name,lazy=True)
+        self.assertEqual(len(fldr2),len(fldr),"Lazy HDF5Folder has the wrong length.")
+        handle=SH._shared_file(HDF5name)
+        for f in fldr2:
+            self.assertTrue(handle.id.valid,"Shared file handle closed while loading members.")
+        self.assertEqual(list(SH._handles.values()).count(handle),1,"HDF5Folder members did not share one file handle.")
+        fldr2.close()
+        self.assertFalse(handle.id.valid,"Closing the HDF5Folder did not close the shared file handle.")
+        HDF5name=path.join(tmpdir,"test-lazy-folder2.HDF5")
+        fldr2.save(HDF5name) # Reading members after closing reopens the shared handle
+        self.assertEqual(len(SH.HDF5Folder(HDF5name)),len(fldr),"Resaving the lazy HDF5Folder lost members.")
+
+    def test_iter_prefetch(self):
+        HDF5name=path.join(tmpdir,"test-prefetch.HDF5")
+        SH.HDF5Folder(self.fldr).save(HDF5name)
+        expected=[d.data for d in SH.HDF5Folder(HDF5name)]
+        handle=SH._shared_file(HDF5name)
+        old=(Stoner.Options.multiprocessing,Stoner.Options.threading)
+        try:
+            for mp,threads in [(True,True),(True,False),(False,True)]:
+                Stoner.Options.multiprocessing=mp
+                Stoner.Options.threading=threads
+                for lazy in (False,True):
+                    fldr=SH.HDF5Folder(HDF5name,lazy=lazy)
+                    self.assertIsNotNone(fldr._prefetch_loader(),"HDF5Folder can't load groups in the background.")
+                    data=[np.array(d.data) for d in fldr.iter_prefetch(depth=2)]
+                    msg="multiprocessing={} threading={} lazy={}".format(mp,threads,lazy)
+                    self.assertEqual(len(data),len(expected),"iter_prefetch on an HDF5Folder missed groups with {}.".format(msg))
+                    self.assertTrue(all(np.all(d==e) for d,e in zip(data,expected)),"iter_prefetch on an HDF5Folder changed the data with {}.".format(msg))
+                    self.assertTrue(handle.id.valid,"iter_prefetch closed the shared file handle with {}.".format(msg))
+        finally:
+            Stoner.Options.multiprocessing,Stoner.Options.threading=old
+            shutdown_pool()
+
+    def test_append_rows(self):
+        filename=path.join(tmpdir,"test-append.hdf5")
+        d=SH.HDF5File(np.arange(12.0).reshape(4,3),column_headers=["A","B","C"])
+        d["Run"]=1
+        d.chunk_rows=2
+        d.save(filename,appendable=True)
+        d.append_rows([12.0,13.0,14.0])
+        d.append_rows(np.arange(15.0,24.0).reshape(3,3))
+        self.assertEqual(d.shape,(8,3),"Appending rows didn't change the shape.")
+        self.assertTrue(np.all(d.data==np.arange(24.0).reshape(8,3)),"Appended rows not read back from the file.")
+        d["Run"]=2
+        d.close() # Writes the changed metadata
+        loaded=SH.HDF5File(filename)
+        self.assertEqual(loaded.shape,(8,3),"Appended rows not saved to the file.")
+        self.assertEqual(loaded["Run"],2,"Metadata not written when the file was closed.")
+        loaded.append_rows([[24.0,25.0,26.0]]) # Files saved as appendable can be added to after loading
+        loaded.close()
+        self.assertEqual(len(SH.HDF5File(filename)),9,"Could not append to a reloaded file.")
+        with self.assertRaises(ValueError):
+            loaded.append_rows([1.0,2.0])
+        loaded.close()
+        fixed=SH.HDF5File(np.ones((2,2)))
+        fixed.save(path.join(tmpdir,"test-fixed.hdf5"))
+        with self.assertRaises(IOError):
+            fixed.append_rows([1.0,2.0])
+        fixed.close()
+
 
 if __name__=="__main__": # Run some tests manually to allow debugging
     test=HDF5_test("test_HDF5folder")
@@ -13,6 +13,8 @@ import tempfile
 from Stoner.compat import *
 import Stoner
 import Stoner.Zip as SZ
+from Stoner.folders.utils import shutdown_pool
+import numpy as np
 Data=Stoner.Data
 
 pth=path.dirname(__file__)
@@ -42,6 +44,24 @@ class Zip_test(unittest.TestCase):
         self.fname=path.basename(self.zipfldr[0].filename)
         self.assertEqual(self.zipfldr[self.fname],self.zipfldr_2[self.fname],"File from loaded ZipFolder not the same as in memeory ZipFolder.")
 
+    def test_iter_prefetch(self):
+        zipname=path.join(tmpdir,"test-prefetch.zip")
+        SZ.ZipFolder(self.fldr).save(zipname)
+        zipfldr=SZ.ZipFolder(zipname)
+        self.assertEqual([d.shape for d in zipfldr.iter_prefetch(depth=2)],[d.shape for d in zipfldr],"iter_prefetch on a ZipFolder failed.")
+        expected=[d.data for d in zipfldr]
+        old=(Stoner.Options.multiprocessing,Stoner.Options.threading)
+        try:
+            for mp,threads in [(True,True),(True,False),(False,True)]:
+                Stoner.Options.multiprocessing=mp
+                Stoner.Options.threading=threads
+                zipfldr=SZ.ZipFolder(zipname)
+                data=[d.data for d in zipfldr.iter_prefetch(depth=2)]
+                self.assertEqual(len(data),len(expected),"iter_prefetch on a ZipFolder missed files with multiprocessing={} threading={}.".format(mp,threads))
+                self.assertTrue(all(np.all(d==e) for d,e in zip(data,expected)),"iter_prefetch on a ZipFolder changed the data with multiprocessing={} threading={}.".format(mp,threads))
+        finally:
+            Stoner.Options.multiprocessing,Stoner.Options.threading=old
+            shutdown_pool()
 
 if __name__=="__main__": # Run some tests manually to allow debugging
     test=Zip_test("test_zipfolder")